@@ -0,0 +1,154 @@
+"""throughput of the main `BaseRowClient` operations against the local `BaserowStub`
+
+run with e.g. `uv run python benchmarks/bench_client.py --rows 10000 100000 1000000`
+
+Reports rows/s and requests/s (requests as counted by the stub) per operation and row\
+count; `--json` additionally writes the results to a file, e.g. to keep them as a CI\
+artifact.
+"""
+
+import argparse
+import csv
+import json
+import os
+import tempfile
+import time
+
+from acdh_baserow_pyutils import BaseRowClient
+from acdh_baserow_pyutils.testing import BaserowStub
+
+GET_OR_CREATE_LOOKUPS = 500
+
+
+def make_rows(n_rows):
+    return (
+        {"Name": f"Person {i}", "Beruf": "Schriftsteller", "Notiz": f"Notiz {i % 97}"}
+        for i in range(n_rows)
+    )
+
+
+def measure(stub, label, n_rows, func, results):
+    start_requests = stub.request_count
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    requests = stub.request_count - start_requests
+    result = {
+        "operation": label,
+        "rows": n_rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(n_rows / elapsed, 1),
+        "requests_per_second": round(requests / elapsed, 1),
+    }
+    results.append(result)
+    print(
+        f"{label:<36} {n_rows:>9} rows {elapsed:>8.2f} s "
+        f"{result['rows_per_second']:>11.1f} rows/s "
+        f"{result['requests_per_second']:>8.1f} requests/s"
+    )
+
+
+def run(n_rows, latency, workers, results):
+    with BaserowStub(latency=latency) as stub:
+        table_id = stub.add_table(
+            "person", ["Name", "Beruf", "Notiz"], make_rows(n_rows)
+        )
+        br_client = BaseRowClient(
+            "user",
+            "pw",
+            "token",
+            br_base_url=stub.base_url,
+            br_db_id=stub.database_id,
+            pool_size=max(workers, 10),
+        )
+        br_client.br_table_dict
+        measure(
+            stub,
+            "yield_rows",
+            n_rows,
+            lambda: sum(1 for _ in br_client.yield_rows(table_id, size=200)),
+            results,
+        )
+        measure(
+            stub,
+            f"yield_rows (workers={workers})",
+            n_rows,
+            lambda: sum(
+                1 for _ in br_client.yield_rows(table_id, size=200, workers=workers)
+            ),
+            results,
+        )
+        with tempfile.TemporaryDirectory() as folder_name:
+            measure(
+                stub,
+                "dump_tables_as_json",
+                n_rows,
+                lambda: br_client.dump_tables_as_json(
+                    stub.database_id, folder_name=folder_name
+                ),
+                results,
+            )
+            measure(
+                stub,
+                "dump_tables_as_json (json_compact)",
+                n_rows,
+                lambda: br_client.dump_tables_as_json(
+                    stub.database_id,
+                    folder_name=folder_name,
+                    output_format="json_compact",
+                ),
+                results,
+            )
+            csv_name = os.path.join(folder_name, "person_import.csv")
+            with open(csv_name, "w", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(f, ["Name", "Beruf", "Notiz"])
+                writer.writeheader()
+                writer.writerows(make_rows(n_rows))
+            measure(
+                stub,
+                f"import_file (workers={workers})",
+                n_rows,
+                lambda: br_client.import_file(csv_name, workers=workers),
+                results,
+            )
+        lookups = min(n_rows, GET_OR_CREATE_LOOKUPS)
+        measure(
+            stub,
+            "get_or_create",
+            lookups,
+            lambda: [
+                br_client.get_or_create(
+                    "person", "Name", br_client.br_table_dict, f"Person {i}"
+                )
+                for i in range(0, n_rows, n_rows // lookups)
+            ],
+            results,
+        )
+        updates = ({"id": i, "Beruf": "Dichter"} for i in range(1, n_rows + 1))
+        measure(
+            stub,
+            f"batch_update_rows (workers={workers})",
+            n_rows,
+            lambda: br_client.batch_update_rows(
+                table_id, updates, workers=workers, ids_only=True
+            ),
+            results,
+        )
+        br_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument(
+        "--latency", type=float, default=0, help="seconds added to each request"
+    )
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+    results = []
+    for n_rows in args.rows:
+        run(n_rows, args.latency, args.workers, results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
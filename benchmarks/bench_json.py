@@ -0,0 +1,55 @@
+"""compares the CPU time of decoding pages and writing dumps with the `json` module and\
+with the backend of `acdh_baserow_pyutils.jsonlib` (orjson if installed)
+
+run with `uv run --extra fast python benchmarks/bench_json.py`
+"""
+
+import io
+import json
+import time
+
+from acdh_baserow_pyutils import jsonlib
+from acdh_baserow_pyutils.writers import write_json
+
+N_PAGES = 200
+PAGE = {
+    "count": N_PAGES * 200,
+    "next": None,
+    "previous": None,
+    "results": [
+        {
+            "id": i,
+            "order": f"{i}.00000000000000000000",
+            "Name": f"Ingeborg Bachmann {i}",
+            "Beruf": "Schriftstellerin, Lyrikerin",
+            "Notiz": "Österreichische Schriftstellerin " * 5,
+            "born_in": [{"id": 1, "value": "Klagenfurt"}],
+            "Geburtsjahr": "1926",
+        }
+        for i in range(200)
+    ],
+}
+
+
+def bench(label, func):
+    start = time.perf_counter()
+    for _ in range(N_PAGES):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {N_PAGES * 200 / elapsed:>12.1f} rows/s")
+    return elapsed
+
+
+if __name__ == "__main__":
+    body = json.dumps(PAGE, ensure_ascii=False).encode("utf-8")
+    rows = PAGE["results"]
+    print(f"backend: {jsonlib.BACKEND}")
+    stdlib = bench("decode page (json)", lambda: json.loads(body))
+    fast = bench(f"decode page ({jsonlib.BACKEND})", lambda: jsonlib.loads(body))
+    print(f"{'':<40} {stdlib / fast:>12.1f} x")
+    stdlib = bench("write_json", lambda: write_json(rows, io.StringIO()))
+    fast = bench(
+        "write_json (compact)",
+        lambda: write_json(rows, io.StringIO(), compact=True),
+    )
+    print(f"{'':<40} {stdlib / fast:>12.1f} x")
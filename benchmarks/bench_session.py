@@ -0,0 +1,37 @@
+"""compares requests/s of one-connection-per-request calls with the pooled session
+
+run with `uv run python benchmarks/bench_session.py`
+"""
+
+import time
+
+import requests
+
+from acdh_baserow_pyutils import BaseRowClient
+from acdh_baserow_pyutils.testing import BaserowStub
+
+N_REQUESTS = 1000
+
+
+def bench(label, send):
+    start = time.perf_counter()
+    for _ in range(N_REQUESTS):
+        send()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<30} {N_REQUESTS / elapsed:>10.1f} requests/s")
+
+
+if __name__ == "__main__":
+    with BaserowStub() as stub:
+        table_id = stub.add_table("person", ["Name"], [{"Name": "Hansi"}])
+        client = BaseRowClient("user", "pw", "token", br_base_url=stub.base_url)
+        url = f"{client.br_base_url}database/fields/table/{table_id}/"
+        bench(
+            "requests.get (no pooling)",
+            lambda: requests.get(url, headers=client.headers, timeout=30),
+        )
+        bench(
+            "BaseRowClient (pooled)",
+            lambda: client.list_fields(table_id),
+        )
+        client.close()
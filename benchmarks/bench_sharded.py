@@ -0,0 +1,86 @@
+"""compares exporting one large table in a single process (`dump_tables_as_json`) with the\
+multi-process `dump_table_sharded`
+
+run with e.g. `uv run python benchmarks/bench_sharded.py --rows 200000 --processes 2 4 8`
+
+The `BaserowStub` is served from a process of its own, so the client processes do not\
+compete with it for the GIL of the benchmark process.
+"""
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+
+from acdh_baserow_pyutils import BaseRowClient
+from acdh_baserow_pyutils.testing import BaserowStub
+
+
+def make_rows(n_rows):
+    return (
+        {
+            "Name": f"Person {i}",
+            "Beruf": "Schriftsteller",
+            "Notiz": f"Österreichische Schriftstellerin {i % 97} " * 5,
+        }
+        for i in range(n_rows)
+    )
+
+
+def serve(n_rows, latency, connection):
+    with BaserowStub(latency=latency, page_size=200) as stub:
+        table_id = stub.add_table(
+            "person", ["Name", "Beruf", "Notiz"], make_rows(n_rows)
+        )
+        connection.send((stub.base_url, stub.database_id, table_id))
+        connection.recv()
+
+
+def measure(label, n_rows, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<40} {n_rows:>9} rows {elapsed:>8.2f} s {n_rows / elapsed:>11.1f} rows/s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument(
+        "--latency", type=float, default=0, help="seconds added to each request"
+    )
+    parser.add_argument("--processes", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--format", default="json", help="the output format")
+    args = parser.parse_args()
+    connection, child_connection = multiprocessing.Pipe()
+    server = multiprocessing.Process(
+        target=serve, args=(args.rows, args.latency, child_connection)
+    )
+    server.start()
+    base_url, database_id, table_id = connection.recv()
+    br_client = BaseRowClient("user", "pw", "token", br_base_url=base_url)
+    with tempfile.TemporaryDirectory() as folder_name:
+        measure(
+            "dump_tables_as_json",
+            args.rows,
+            lambda: br_client.dump_tables_as_json(
+                database_id, folder_name=folder_name, output_format=args.format
+            ),
+        )
+        for processes in args.processes:
+            measure(
+                f"dump_table_sharded (processes={processes})",
+                args.rows,
+                lambda: br_client.dump_table_sharded(
+                    table_id,
+                    "person",
+                    folder_name,
+                    processes=processes,
+                    output_format=args.format,
+                ),
+            )
+    br_client.close()
+    connection.send("stop")
+    server.join()
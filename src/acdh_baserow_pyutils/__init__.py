@@ -1,9 +1,60 @@
-import json
+import hashlib
+import logging
+import math
 import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain
 from typing import Union
+from urllib.parse import quote
 
 import requests
 
+from acdh_baserow_pyutils.async_client import AsyncBaseRowClient  # noqa: F401
+from acdh_baserow_pyutils.auth import TOKEN_CACHE, TokenCache
+from acdh_baserow_pyutils.checkpoint import CHECKPOINT_FILE_NAME, DumpCheckpoint
+from acdh_baserow_pyutils.common import (  # noqa: F401
+    BATCH_SIZE,
+    MAX_PAGE_SIZE,
+    BaseRowApiMixin,
+)
+from acdh_baserow_pyutils.diff import TableDiff
+from acdh_baserow_pyutils.importer import (
+    SAMPLE_SIZE,
+    convert_row,
+    infer_fields,
+    input_format_of,
+    open_input,
+    read_rows,
+)
+from acdh_baserow_pyutils.instrumentation import RequestMetrics, endpoint_template
+from acdh_baserow_pyutils.jsonlib import StreamingPage, dumpb, dumps, loads
+from acdh_baserow_pyutils.migrations import PHASES, SchemaMigration, validate_field
+from acdh_baserow_pyutils.relations import RelationExpander, linked_tables
+from acdh_baserow_pyutils.resultcache import ResultCache, table_of_url
+from acdh_baserow_pyutils.rowtable import RowTable
+from acdh_baserow_pyutils.scheduler import RequestScheduler
+from acdh_baserow_pyutils.schema import (  # noqa: F401
+    SchemaRegistry,
+    load_schema_cache,
+    save_schema_cache,
+)
+from acdh_baserow_pyutils.session import make_session
+from acdh_baserow_pyutils.sharding import merge_shards, page_ranges, shard_rows
+from acdh_baserow_pyutils.writers import (
+    COMPRESSIONS,
+    check_output_options,
+    output_file_name,
+    render_rows,
+    write_rows,
+)
+
+logger = logging.getLogger(__name__)
+STREAM_CHUNK_SIZE = 65536
+# below common request line limits, e.g. gunicorn's 4094 bytes
+MAX_URL_LENGTH = 4000
+
 
 def get_related_table_info(
     table_name: str, field_name: str, table_field_dict: dict
@@ -14,11 +65,16 @@ def get_related_table_info(
         table_name (str): the name of current table e.g. "courses"
         field_name (str): the name of the current field e.g. "university"
         table_field_dict (dict): a dict providing information of the tables and fields of the database\
-        as returned by `br_client.fetch_table_field_dict(BASEROW_DB_ID)`
+        as returned by `br_client.fetch_table_field_dict(BASEROW_DB_ID)`; a `SchemaRegistry`\
+        (like `br_client.br_table_dict`) is looked up without scanning all tables
 
     Returns:
         tuple: returns the ID and the name of the related table
     """
+    if isinstance(table_field_dict, SchemaRegistry):
+        related_table = table_field_dict.link_row_target(table_name, field_name)
+        return related_table["id"], related_table["name"]
+    # indexing a plain dict on every call would cost more than scanning its tables
     field_dict = table_field_dict[table_name]["fields"][field_name]
     related_table_id = field_dict["link_row_table_id"]
     for _, value in table_field_dict.items():
@@ -28,31 +84,138 @@ def get_related_table_info(
     return related_table_id, related_table_name
 
 
-class BaseRowClient:
-    def get_jwt_token(self) -> str:
-        """fetches a baserow auth token
+def _export_shard(client_options: dict, url: str, first: int, stop: int, *args) -> int:
+    """writes the rows on the pages from `first` to `stop` (not included) of `url` into a\
+    file, runs in a worker process of `BaseRowClient.dump_table_sharded` with its own client"""
+    with BaseRowClient(**client_options) as br_client:
+        rows = (
+            row
+            for page in range(first, stop)
+            for row in br_client._fetch_page(f"{url}&page={page}")["results"]
+        )
+        return write_rows(rows, *args, close=False)
 
-        Returns:
-            str: the baserow auth token
-        """
-        url = f"{self.br_base_url}user/token-auth/"
-        payload = {"password": self.br_pw, "username": self.br_user}
-        r = requests.post(url=url, json=payload)
-        return r.json()["token"]
 
-    def url_fixer(self, url: str) -> str:
-        """checks if the passed in URL ends with slash and appends one if not
+class BaseRowClient(BaseRowApiMixin):
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """sends a request through the client's pooled session, once the `scheduler`\
+        admits it
+
+        Every hook in `pre_request_hooks` is called with a dict holding "method",\
+        "endpoint" (the URL path with IDs replaced by `{id}`) and "url"; after the\
+        response arrived the hooks in `post_request_hooks` get the same dict with\
+        "status", "bytes" and "elapsed" (seconds) added; for a request that failed without\
+        a response (e.g. a timeout) "status" is None, then the exception is raised.
+
+        A request authenticated with the client's (shared) JWT which is answered with 401\
+        is sent once more with a renewed token, see `token_cache`.
+        Write requests to a table drop the table's entries of the `result_cache`.
 
         Args:
-            url (str): URL to check (or any other string)
+            method (str): the HTTP method, e.g. "GET"
+            url (str): the URL to send the request to
+            **kwargs: passed on to `requests.Session.request`; a `json` body is\
+            encoded with `jsonlib.dumpb`
 
         Returns:
-            str: URL ending with "/"
+            requests.Response: the response
         """
-        if url.endswith("/"):
-            return url
+        kwargs.setdefault("timeout", self.timeout)
+        if kwargs.get("json") is not None:
+            kwargs["data"] = dumpb(kwargs.pop("json"))
+            kwargs["headers"] = {
+                "Content-Type": "application/json",
+                **(kwargs.get("headers") or {}),
+            }
+        r = self._send(method, url, kwargs)
+        auth = (kwargs.get("headers") or {}).get("Authorization", "")
+        shared_jwt = auth.startswith("JWT ") and self._br_jwt_token is None
+        if r.status_code == 401 and shared_jwt:
+            # expired or revoked meanwhile: renew the shared token and try once more
+            self.token_cache.invalidate(self.token_cache_key, auth[4:])
+            kwargs["headers"] = {
+                **kwargs["headers"],
+                **self.jwt_headers(self.br_jwt_token),
+            }
+            r.close()
+            r = self._send(method, url, kwargs)
+        if self.result_cache is not None and method != "GET":
+            table_id = table_of_url(url)
+            if table_id is not None:
+                self.result_cache.invalidate(table_id)
+        return r
+
+    def _send(self, method: str, url: str, kwargs: dict) -> requests.Response:
+        info = {
+            "method": method,
+            "endpoint": endpoint_template(url, self.br_base_url),
+            "url": url,
+        }
+        for hook in self.pre_request_hooks:
+            hook(info)
+        try:
+            with self.scheduler.slot():
+                start = time.perf_counter()
+                r = self.session.request(method, url, **kwargs)
+                info["elapsed"] = time.perf_counter() - start
+        except requests.exceptions.RequestException:
+            # no response (e.g. a timeout or the retries used up): counted as well
+            info["elapsed"] = time.perf_counter() - start
+            info.update(status=None, bytes=0)
+            self.scheduler.record(None, info["elapsed"])
+            logger.debug("%s %s failed after %.3fs", method, url, info["elapsed"])
+            for hook in self.post_request_hooks:
+                hook(info)
+            raise
+        self.scheduler.record(r.status_code, info["elapsed"])
+        info["status"] = r.status_code
+        if kwargs.get("stream"):
+            info["bytes"] = int(r.headers.get("Content-Length") or 0)
         else:
-            return f"{url}/"
+            info["bytes"] = len(r.content)
+        logger.debug("%s %s %s %.3fs", method, url, r.status_code, info["elapsed"])
+        for hook in self.post_request_hooks:
+            hook(info)
+        return r
+
+    def close(self):
+        """closes the underlying session and all its pooled connections"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_jwt_token(self) -> str:
+        """fetches a baserow auth token
+
+        Returns:
+            str: the baserow auth token
+        """
+        return self._token_auth()["token"]
+
+    def _token_auth(self) -> dict:
+        r = self._request(
+            "POST", url=self.token_auth_url(), json=self.token_auth_payload()
+        )
+        r.raise_for_status()
+        result = loads(r.content)
+        return {
+            "token": result.get("access_token") or result["token"],
+            "refresh_token": result.get("refresh_token"),
+        }
+
+    def _refresh_jwt_token(self, refresh_token: str) -> Union[dict, None]:
+        r = self._request(
+            "POST", url=self.token_refresh_url(), json={"refresh_token": refresh_token}
+        )
+        if r.status_code != 200:
+            logger.debug("token refresh failed with %s", r.status_code)
+            return None
+        result = loads(r.content)
+        return {"token": result.get("access_token") or result["token"]}
 
     def list_tables(self, br_database_id: Union[int, str]) -> list:
         """retuns the baserow api enspoint listing all tables of the given database
@@ -63,11 +226,11 @@ class BaseRowClient:
         Returns:
             list: a list with dicts like `{'id': 100947, 'name': 'place', 'order': 2, 'database_id': 41426}`
         """
-        db_url = f"{self.br_base_url}database/tables/database/{br_database_id}/"
-        r = requests.get(
-            url=db_url, headers={"Authorization": f"JWT {self.br_jwt_token}"}
+        db_url = self.tables_url(br_database_id)
+        r = self._request(
+            "GET", url=db_url, headers=self.jwt_headers(self.br_jwt_token)
         )
-        return r.json()
+        return loads(r.content)
 
     def get_table_by_name(self, br_database_id, br_table_name):
         """
@@ -75,16 +238,26 @@ class BaseRowClient:
         Args:
             br_database_id: The ID of the Baserow database to search in
             br_table_name (str): The name of the table to find
+            If the database is the client's `br_db_id` and `br_table_dict` is already
+            loaded it is looked up first; the tables are only requested for names it
+            doesn't know. A `br_table_dict` not yet loaded is not loaded for this.
         Returns:
             str or False: The table ID as a string if found, False if not found
         """
 
-        tables = self.list_tables(br_database_id)
-        table_id = False
-        for x in tables:
+        own_database = self.br_db_id and str(br_database_id) == str(self.br_db_id)
+        loaded = own_database and self._br_table_dict is not None
+        if loaded:
+            table = self._br_table_dict.table_by_name(br_table_name)
+            if table:
+                return str(table["id"])
+        for x in self.list_tables(br_database_id):
             if x["name"] == br_table_name:
-                table_id = str(x["id"])
-        return table_id
+                if loaded:
+                    # created by someone else meanwhile
+                    self.invalidate_schema_cache()
+                return str(x["id"])
+        return False
 
     def list_fields(self, br_table_id):
         """
@@ -96,11 +269,19 @@ class BaseRowClient:
                   from the Baserow API.
         """
 
-        url = f"{self.br_base_url}database/fields/table/{br_table_id}/"
-        r = requests.get(url, headers={"Authorization": f"JWT {self.br_jwt_token}"})
-        return r.json()
+        url = self.fields_url(br_table_id)
+        r = self._request("GET", url, headers=self.jwt_headers(self.br_jwt_token))
+        return loads(r.content)
 
-    def search_rows(self, br_table_id, q, query_field_id, lookup_type="contains"):
+    def search_rows(
+        self,
+        br_table_id,
+        q,
+        query_field_id,
+        lookup_type="contains",
+        include=None,
+        exclude=None,
+    ):
         """
         Search for rows in a Baserow table based on a query string and field.
         Args:
@@ -110,73 +291,617 @@ class BaseRowClient:
             lookup_type (str, optional): The type of lookup to perform.
                 Defaults to "contains". Other options may include "exact",
                 "starts_with", "ends_with", etc.
+            include (list, optional): the only fields to return, see `yield_rows`.
+            exclude (list, optional): fields to leave out, see `yield_rows`.
         Returns:
             dict: JSON response from the Baserow API containing the search results.
                 Typically includes a list of matching rows and metadata.
+                With a `result_cache` successful responses are reused until they
+                expire or the client writes to the table.
         """
 
-        url = f"{self.br_base_url}database/rows/table/{br_table_id}/?user_field_names=true&filter__field_{query_field_id}__{lookup_type}={q}"  # noqa
-        r = requests.get(url, headers={"Authorization": f"JWT {self.br_jwt_token}"})
-        return r.json()
+        fields = self._field_selection(br_table_id, include, exclude)
+        url = self.search_url(br_table_id, q, query_field_id, lookup_type, *fields)
 
-    def yield_rows(self, br_table_id, filters={}):
-        br_rows_url = f"{self.br_base_url}database/rows/table/{br_table_id}/"
-        url = f"{br_rows_url}?user_field_names=true"
-        if filters:
-            for key, value in filters.items():
-                url += f"&{key}={value}"
+        def load():
+            r = self._request("GET", url, headers=self.jwt_headers(self.br_jwt_token))
+            return r.content, r.status_code == 200
+
+        if self.result_cache is None:
+            return loads(load()[0])
+        key = self._search_key(q, query_field_id, lookup_type, *fields)
+        return loads(self.result_cache.get_or_load(br_table_id, key, load))
+
+    def _search_key(self, q, query_field_id, lookup_type, include=None, exclude=None):
+        fields = [None if x is None else tuple(x) for x in (include, exclude)]
+        return (f"{query_field_id}", lookup_type, f"{q}", *fields)
+
+    def yield_rows(
+        self,
+        br_table_id,
+        filters={},
+        size=None,
+        workers=1,
+        include=None,
+        exclude=None,
+        stream=False,
+    ):
+        """yields all rows of the given table, page by page
+
+        Args:
+            br_table_id (Union[int, str]): The ID of the table
+            filters (dict, optional): query parameters added to each page request,\
+            e.g. `{"filter__field_374371__boolean": "true"}`. Defaults to {}.
+            size (int, optional): rows per page, at most `MAX_PAGE_SIZE`.\
+            Defaults to None (Baserow's default of 100).
+            workers (int, optional): with more than one worker the row count is read from\
+            the first page and the remaining pages are fetched concurrently by page number;\
+            rows are still yielded in order and at most `workers` pages are held in memory.\
+            Defaults to 1.
+            include (list, optional): names or IDs of the only fields to return; the other\
+            fields are left out by Baserow. Defaults to None (all fields).
+            exclude (list, optional): names or IDs of fields to leave out. Defaults to None.
+            stream (bool, optional): decode each page while it is received and yield rows\
+            as they arrive instead of reading the whole body first (with `workers=1`),\
+            see `jsonlib.StreamingPage`. Defaults to False.
+
+        Yields:
+            dict: a row
+        """
+        fields = self._field_selection(br_table_id, include, exclude)
+        url = self.page_url(br_table_id, filters, size, *fields)
+        if workers > 1:
+            yield from self._yield_rows_concurrently(url, size or 100, workers)
+            return
         next_page = True
         while next_page:
-            print(url)
             response = None
             result = None
             x = None
-            response = requests.get(url, headers=self.headers)
-            result = response.json()
+            response = self._request("GET", url, headers=self.headers, stream=stream)
+            response.raise_for_status()
+            if stream:
+                with response:
+                    result = StreamingPage(response.iter_content(STREAM_CHUNK_SIZE))
+                    for x in result:
+                        yield x
+            else:
+                result = loads(response.content)
+                for x in result["results"]:
+                    yield x
             next_page = result["next"]
             url = result["next"]
-            for x in result["results"]:
-                yield x
 
-    def dump_tables_as_json(self, br_table_id, folder_name=None, indent=0):
-        tables = self.list_tables(br_table_id)
-        file_names = []
-        for x in tables:
-            data = {x["id"]: x for x in self.yield_rows(f"{x['id']}")}
-            f_name = f"{x['name']}.json"
-            if folder_name is not None:
-                f_name = os.path.join(folder_name, f_name)
-            with open(f_name, "w", encoding="utf-8") as f:
-                if indent:
-                    json.dump(data, f, ensure_ascii=False, indent=indent)
+    def _field_selection(self, br_table_id, include=None, exclude=None) -> tuple:
+        """returns `include` and `exclude` as field names
+
+        Field IDs are looked up and names are checked in `br_table_dict` if the table is\
+        part of it; otherwise names are passed on as they are and IDs are looked up with\
+        `list_fields` (one request for all IDs).
+
+        Raises:
+            ValueError: for unknown fields or IDs which can't be looked up
+        """
+        if include is None and exclude is None:
+            return None, None
+        table = None
+        if self.br_db_id:
+            table = self.br_table_dict.table_by_id(br_table_id)
+        fields_by_id = None
+        selection = []
+        for field_names in (include, exclude):
+            if field_names is None:
+                selection.append(None)
+                continue
+            names = []
+            for x in field_names:
+                if isinstance(x, str) and not x.startswith("field_"):
+                    name = x
+                    if table is not None and name not in table["fields"]:
+                        raise ValueError(
+                            f"table {table['name']} has no field named {name!r}"
+                        )
+                    names.append(name)
+                    continue
+                field_id = int(f"{x}".replace("field_", ""))
+                if table is not None:
+                    field = table["fields"].get(
+                        (self.br_table_dict.field_by_id(field_id) or {}).get("name")
+                    )
+                    if field is not None and field["id"] != field_id:
+                        field = None  # a field of another table
                 else:
-                    json.dump(data, f, ensure_ascii=False)
-            file_names.append(f_name)
-        return file_names
+                    if fields_by_id is None:
+                        fields = self.list_fields(br_table_id)
+                        if not isinstance(fields, list):  # an error response
+                            fields = []
+                        fields_by_id = {f["id"]: f for f in fields}
+                    field = fields_by_id.get(field_id)
+                if field is None:
+                    raise ValueError(
+                        f"unknown field ID {field_id} of table {br_table_id}"
+                    )
+                names.append(field["name"])
+            selection.append(names)
+        return tuple(selection)
 
-    def fetch_table_field_dict(self, br_db_id):
-        print(f"fetching table and field info for {br_db_id}")
-        br_tables = self.list_tables(br_db_id)
-        table_dict = {}
-        for x in br_tables:
-            field_dict = {}
-            table_dict[x["name"]] = x
-            for f in self.list_fields(x["id"]):
-                field_dict[f["name"]] = f
-            table_dict[x["name"]]["fields"] = field_dict
-        br_table_dict = table_dict
+    def load_row_table(
+        self, br_table_id, filters={}, workers=1, include=None, exclude=None
+    ) -> RowTable:
+        """reads the rows of a table into a column-oriented `RowTable`, which needs far less\
+        memory than a dict per row; the columns are taken from `list_fields`
+
+        Args:
+            br_table_id (Union[int, str]): The ID of the table
+            filters (dict, optional): see `yield_rows`. Defaults to {}.
+            workers (int, optional): see `yield_rows`. Defaults to 1.
+            include (list, optional): see `yield_rows`. Defaults to None.
+            exclude (list, optional): see `yield_rows`. Defaults to None.
+
+        Returns:
+            RowTable: the rows, accessible by row ID
+        """
+        only, leave_out = self._field_selection(br_table_id, include, exclude)
+        field_names = [x["name"] for x in self.list_fields(br_table_id)]
+        if only is not None:
+            field_names = [x for x in field_names if x in only]
+        if leave_out is not None:
+            field_names = [x for x in field_names if x not in leave_out]
+        rows = self.yield_rows(
+            br_table_id,
+            filters,
+            size=MAX_PAGE_SIZE,
+            workers=workers,
+            include=only,
+            exclude=leave_out,
+        )
+        return RowTable.from_rows(rows, field_names)
+
+    def _fetch_page(self, url: str) -> dict:
+        r = self._request("GET", url, headers=self.headers)
+        r.raise_for_status()
+        return loads(r.content)
+
+    def _yield_rows_concurrently(self, url: str, size: int, workers: int):
+        result = self._fetch_page(url)
+        yield from result["results"]
+        if not result["next"]:
+            return
+        pages = math.ceil(result["count"] / size)
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
+                for page in range(2, pages + 1):
+                    pending.append(
+                        executor.submit(self._fetch_page, f"{url}&page={page}")
+                    )
+                    if len(pending) >= workers:
+                        yield from pending.popleft().result()["results"]
+                while pending:
+                    yield from pending.popleft().result()["results"]
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def dump_tables_as_json(
+        self,
+        br_table_id,
+        folder_name=None,
+        indent=0,
+        workers=1,
+        output_format="json",
+        compression=None,
+        checkpoint=None,
+        include=None,
+        exclude=None,
+    ):
+        """writes every table of the given database into a file named after the table
+
+        By default each file holds one JSON object mapping row IDs to rows. Rows are written\
+        as the pages arrive, so only about one page per worker is held in memory.
+
+        Args:
+            br_table_id (Union[int, str]): The ID of the database
+            folder_name (str, optional): folder to write the files into (needs to exist).\
+            Defaults to None (current working directory).
+            indent (int, optional): indentation as in `json.dump`. Defaults to 0.
+            workers (int, optional): number of tables exported concurrently; should not\
+            exceed the client's `pool_size`. Defaults to 1.
+            output_format (str, optional): "json", "json_compact" (no whitespace, fastest\
+            with orjson installed), "ndjson" (one row per line) or "csv" (link_row and\
+            select fields flattened, see `writers.flatten_value`). Defaults to "json".
+            compression (str, optional): "gzip", "bz2" or "xz"; the file name gets the\
+            matching suffix, e.g. `person.ndjson.gz`. Defaults to None.
+            checkpoint (Union[str, bool], optional): path of a checkpoint file (True for\
+            `.baserow_dump_checkpoint.json` in `folder_name`) recording the progress of each\
+            table page by page. A rerun continues an unfinished table after its last written\
+            page and skips finished tables, as long as their row count and newest\
+            "last_modified" value are unchanged; otherwise the table is written anew.\
+            Defaults to None.
+            include (dict, optional): maps table names to the names or IDs of the only\
+            fields to write, see `yield_rows`. Defaults to None (all fields).
+            exclude (dict, optional): maps table names to the names or IDs of fields to\
+            leave out. Defaults to None.
+
+        Returns:
+            list: the names of the written files, in the order of `list_tables`
+        """
+        options = (folder_name, indent, output_format, compression, include, exclude)
+        check_output_options(output_format, compression)
+        dump_table = self._dump_table
+        if checkpoint:
+            if checkpoint is True:
+                checkpoint = os.path.join(folder_name or "", CHECKPOINT_FILE_NAME)
+            options = (DumpCheckpoint(checkpoint), *options)
+            dump_table = self._dump_table_resumable
+        tables = self.list_tables(br_table_id)
+        for table_name in [*(include or {}), *(exclude or {})]:
+            if table_name not in [x["name"] for x in tables]:
+                raise ValueError(f"database {br_table_id} has no table {table_name!r}")
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(dump_table, x, *options) for x in tables]
+                return [future.result() for future in futures]
+        return [dump_table(x, *options) for x in tables]
+
+    def dump_table_sharded(
+        self,
+        br_table_id,
+        table_name=None,
+        folder_name=None,
+        processes=4,
+        shards=None,
+        indent=0,
+        output_format="json",
+        compression=None,
+        filters={},
+        include=None,
+        exclude=None,
+    ) -> str:
+        """writes one (large) table into a file like `dump_tables_as_json`, fetching and\
+        serializing the rows in several processes
+
+        The pages of the (filtered) rows, in Baserow's default order (by "order", then by\
+        ID), are split into `shards` ranges; the row count of the first request gives the\
+        number of pages. Each range is written by a worker process with its own client into\
+        a part file (compressed parts are complete streams); the parts are then\
+        concatenated in order. The file holds the same rows in the same format and order\
+        as `dump_tables_as_json`, as long as the table is not changed meanwhile.
+
+        Args:
+            br_table_id (Union[int, str]): The ID of the table
+            table_name (str, optional): the name of the file (without suffix). Defaults to\
+            None (the table's name in `br_table_dict` if the client has a `br_db_id`,\
+            otherwise the table ID).
+            folder_name (str, optional): see `dump_tables_as_json`. Defaults to None.
+            processes (int, optional): number of worker processes, their clients share\
+            the client's `rate_limit`. Defaults to 4.
+            shards (int, optional): number of page ranges; more ranges than processes even\
+            out slow responses. Defaults to None (4 per process).
+            indent (int, optional): see `dump_tables_as_json`. Defaults to 0.
+            output_format (str, optional): see `dump_tables_as_json`. Defaults to "json".
+            compression (str, optional): see `dump_tables_as_json`. Defaults to None.
+            filters (dict, optional): see `yield_rows`. Defaults to {}.
+            include (list, optional): see `yield_rows`. Defaults to None.
+            exclude (list, optional): see `yield_rows`. Defaults to None.
+
+        Returns:
+            str: the name of the written file
+        """
+        check_output_options(output_format, compression)
+        if table_name is None:
+            table = (
+                self.br_table_dict.table_by_id(br_table_id) if self.br_db_id else None
+            )
+            table_name = table["name"] if table else f"{br_table_id}"
+        f_name = output_file_name(table_name, folder_name, output_format, compression)
+        fields = self._field_selection(br_table_id, include, exclude)
+        count = self._fetch_page(self.page_url(br_table_id, filters, 1))["count"]
+        shard_list = page_ranges(count, MAX_PAGE_SIZE, shards or processes * 4)
+        url = self.page_url(br_table_id, filters, MAX_PAGE_SIZE, *fields)
+        rate_limit = self.scheduler.rate_limit
+        client_options = {
+            "br_user": self.br_user,
+            "br_pw": self.br_pw,
+            "br_token": self.br_token,
+            "br_base_url": self.br_base_url,
+            "timeout": self.timeout,
+            "max_retries": self.max_retries,
+            "backoff_factor": self.backoff_factor,
+            "pool_size": self.pool_size,
+            # the workers share the client's rate limit
+            "rate_limit": rate_limit / processes if rate_limit else None,
+            "target_latency": self.scheduler.target_latency,
+            "token_cache": self.token_cache.path,
+        }
+        part_names = []
+        start = 0
+        try:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                futures = []
+                for i, (first, stop) in enumerate(shard_list):
+                    part_names.append(f"{f_name}.{i}.part")
+                    args = (part_names[-1], output_format, compression, indent, start)
+                    futures.append(
+                        executor.submit(
+                            _export_shard, client_options, url, first, stop, *args
+                        )
+                    )
+                    start += shard_rows(count, MAX_PAGE_SIZE, first, stop)
+                start = sum(future.result() for future in futures)
+            tail = render_rows([], output_format, indent, start, close=True)
+            tail = tail.encode("utf-8")
+            if compression is not None and tail:
+                tail = COMPRESSIONS[compression][2](tail)
+            logger.debug("merging %s shards of table %s", len(part_names), table_name)
+            merge_shards(f_name, part_names, tail)
+        finally:
+            for part_name in part_names:
+                if os.path.exists(part_name):
+                    os.remove(part_name)
+        return f_name
+
+    def _dump_table(
+        self,
+        table: dict,
+        folder_name=None,
+        indent=0,
+        output_format="json",
+        compression=None,
+        include=None,
+        exclude=None,
+    ) -> str:
+        f_name = output_file_name(
+            table["name"], folder_name, output_format, compression
+        )
+        fields = self._field_selection(
+            table["id"],
+            (include or {}).get(table["name"]),
+            (exclude or {}).get(table["name"]),
+        )
+        write_rows(
+            self.yield_rows(f"{table['id']}", include=fields[0], exclude=fields[1]),
+            f_name,
+            output_format,
+            compression,
+            indent,
+        )
+        return f_name
+
+    def _table_marker(self, br_table_id) -> tuple:
+        """returns the row count and the newest value of the table's first "last_modified"\
+        field (None if it has none)"""
+        modified_field = None
+        for x in self.list_fields(br_table_id):
+            if x["type"] == "last_modified":
+                modified_field = x["name"]
+                break
+        url = self.page_url(br_table_id, size=1)
+        if modified_field is not None:
+            url += f"&order_by={quote('-' + modified_field)}"
+        result = self._fetch_page(url)
+        marker = None
+        if modified_field is not None and result["results"]:
+            marker = result["results"][0][modified_field]
+        return result["count"], marker
+
+    def _dump_table_resumable(
+        self,
+        table: dict,
+        checkpoint: DumpCheckpoint,
+        folder_name=None,
+        indent=0,
+        output_format="json",
+        compression=None,
+        include=None,
+        exclude=None,
+    ) -> str:
+        f_name = output_file_name(
+            table["name"], folder_name, output_format, compression
+        )
+        fields = self._field_selection(
+            table["id"],
+            (include or {}).get(table["name"]),
+            (exclude or {}).get(table["name"]),
+        )
+        count, marker = self._table_marker(table["id"])
+        expected = {
+            "file": f_name,
+            "options": [output_format, compression, indent, *fields],
+            "count": count,
+            "marker": marker,
+        }
+        state = checkpoint.get(table["id"])
+        if not checkpoint.resumable(state, expected):
+            state = {**expected, "page": 0, "rows": 0, "offset": 0, "complete": False}
+        elif state["complete"]:
+            logger.debug("skipping unchanged table %s", table["name"])
+            return f_name
+        else:
+            logger.debug(
+                "resuming table %s after page %s", table["name"], state["page"]
+            )
+        compress = COMPRESSIONS[compression][2] if compression else None
+
+        def write_chunk(f, rows, close=False):
+            chunk = render_rows(rows, output_format, indent, state["rows"], close)
+            data = chunk.encode("utf-8")
+            if compress is not None and data:
+                data = compress(data)
+            f.write(data)
+            f.flush()
+            state["rows"] += len(rows)
+            state["offset"] = f.tell()
+
+        with open(f_name, "r+b" if state["offset"] else "wb") as f:
+            f.truncate(state["offset"])
+            f.seek(state["offset"])
+            url = self.page_url(table["id"], {}, MAX_PAGE_SIZE, *fields)
+            url += f"&page={state['page'] + 1}"
+            if state["page"] * MAX_PAGE_SIZE >= count > 0:
+                url = None
+            while url:
+                result = self._fetch_page(url)
+                write_chunk(f, result["results"])
+                state["page"] += 1
+                checkpoint.save(table["id"], state)
+                url = result["next"]
+            write_chunk(f, [], close=True)
+        state["complete"] = True
+        checkpoint.save(table["id"], state)
+        return f_name
+
+    def yield_expanded_rows(self, table_name, depth=1, lookup_dict=None, workers=1):
+        """yields the rows of a table with their link_row fields replaced by the linked rows
+
+        The link_row fields are found by their `link_row_table_id`; every linked table is\
+        read once into a `RowTable` kept in memory, the rows of the table itself are\
+        streamed. E.g. with `depth=1` a "person" row's `born_in` holds the full\
+        "place" rows instead of `[{"id": 1, "value": "Wien"}]`; with `depth=2` the link_row\
+        fields of these places are expanded as well.
+
+        Args:
+            table_name (str): the name of the table, e.g. "person"
+            depth (int, optional): how many levels of links to expand. Defaults to 1.
+            lookup_dict (dict, optional): the table/field dict, see `fetch_table_field_dict`.\
+            Defaults to None (`br_table_dict`).
+            workers (int, optional): see `yield_rows`. Defaults to 1.
+
+        Yields:
+            dict: a row with expanded link_row fields
+        """
+        if lookup_dict is None:
+            lookup_dict = self.br_table_dict
+        if not isinstance(lookup_dict, SchemaRegistry):
+            lookup_dict = SchemaRegistry(lookup_dict)
+        table = lookup_dict[table_name]
+        indexes = {}
+        for x in linked_tables(lookup_dict, table_name, depth):
+            rows = self.yield_rows(x["id"], size=MAX_PAGE_SIZE, workers=workers)
+            indexes[int(x["id"])] = RowTable.from_rows(rows, x["fields"])
+        expander = RelationExpander(lookup_dict, indexes, depth)
+        rows = self.yield_rows(table["id"], size=MAX_PAGE_SIZE, workers=workers)
+        yield from expander.expand_rows(table, rows)
+
+    def dump_expanded_table_as_json(
+        self,
+        table_name,
+        folder_name=None,
+        depth=1,
+        indent=0,
+        lookup_dict=None,
+        workers=1,
+        output_format="json",
+        compression=None,
+    ) -> str:
+        """writes the rows of `yield_expanded_rows` into a file named after the table,\
+        in the formats of `dump_tables_as_json`
+
+        Returns:
+            str: the name of the written file
+        """
+        f_name = output_file_name(table_name, folder_name, output_format, compression)
+        rows = self.yield_expanded_rows(table_name, depth, lookup_dict, workers)
+        write_rows(rows, f_name, output_format, compression, indent)
+        return f_name
+
+    def fetch_table_field_dict(self, br_db_id, br_tables=None, workers=1):
+        logger.debug("fetching table and field info for %s", br_db_id)
+        if br_tables is None:
+            br_tables = self.list_tables(br_db_id)
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            fields = executor.map(self.list_fields, [x["id"] for x in br_tables])
+            table_dict = {}
+            for x, table_fields in zip(br_tables, fields):
+                field_dict = {}
+                table_dict[x["name"]] = x
+                for f in table_fields:
+                    field_dict[f["name"]] = f
+                table_dict[x["name"]]["fields"] = field_dict
+        br_table_dict = SchemaRegistry(table_dict)
         return br_table_dict
 
+    def load_table_field_dict(self, br_db_id) -> dict:
+        """returns the table/field dict of the database, from `schema_cache` if possible
+
+        The cache is used if it is younger than `schema_cache_ttl` and `list_tables` still\
+        returns the same tables; otherwise the dict is fetched with\
+        `fetch_table_field_dict` and the cache is rewritten.
+
+        Args:
+            br_db_id (Union[int, str]): The ID of the database
+
+        Returns:
+            dict: the table/field dict, see `fetch_table_field_dict`
+        """
+        if self.schema_cache is None:
+            return self.fetch_table_field_dict(br_db_id)
+        br_tables = self.list_tables(br_db_id)
+        table_dict = load_schema_cache(
+            self.schema_cache, br_db_id, br_tables, self.schema_cache_ttl
+        )
+        if table_dict is None:
+            table_dict = self.fetch_table_field_dict(br_db_id, br_tables)
+            save_schema_cache(self.schema_cache, br_db_id, br_tables, table_dict)
+        else:
+            logger.debug(
+                "loaded table and field info for %s from %s",
+                br_db_id,
+                self.schema_cache,
+            )
+        return table_dict
+
+    def invalidate_schema_cache(self):
+        """forgets the table/field dict and deletes `schema_cache`; the next access of\
+        `br_table_dict` fetches it again"""
+        self._br_table_dict = None
+        if self.schema_cache is not None:
+            try:
+                os.remove(self.schema_cache)
+            except FileNotFoundError:
+                pass
+
+    @property
+    def br_jwt_token(self) -> str:
+        """the JWT, taken from `token_cache` and renewed there shortly before it expires;\
+        a token set explicitly is used as it is"""
+        if self._br_jwt_token is not None:
+            return self._br_jwt_token
+        return self.token_cache.get(
+            self.token_cache_key, self._token_auth, self._refresh_jwt_token
+        )
+
+    @br_jwt_token.setter
+    def br_jwt_token(self, value):
+        self._br_jwt_token = value
+
+    @property
+    def br_table_dict(self) -> Union[dict, None]:
+        """the table/field dict of `br_db_id`, loaded with `load_table_field_dict` on first\
+        access (None if the client has no `br_db_id`)"""
+        if self._br_table_dict is None and self.br_db_id:
+            self.br_table_dict = self.load_table_field_dict(self.br_db_id)
+        return self._br_table_dict
+
+    @br_table_dict.setter
+    def br_table_dict(self, value):
+        if value is not None and not isinstance(value, SchemaRegistry):
+            value = SchemaRegistry(value)
+        self._br_table_dict = value
+
     def get_or_create(self, table_name, field_name, lookup_dict, q):
         """
         Get an existing row or create a new one in a Baserow table.
         Searches for a row in the specified table where the given field matches the query value.
         If exactly one matching row is found, returns that row. If no matching row is found,
-        creates a new row with the specified field value.
+        creates a new row with the specified field value. With a `result_cache` the lookup
+        is cached and a created row is stored as the result of its value's lookup;
+        concurrent calls for the same value then create the row only once.
         Args:
             table_name (str): Name of the table to search/create in
             field_name (str): Name of the field to search by and set value for
-            lookup_dict (dict): Dictionary containing table and field metadata including IDs
+            lookup_dict (dict): Dictionary containing table and field metadata including IDs;
+                if None the client's `br_table_dict` is used
             q (str): Query value to search for and use when creating new row
         Returns:
             tuple: A tuple containing:
@@ -184,35 +909,126 @@ class BaseRowClient:
                 - created (bool): True if a new row was created, False if existing row was found
         """
 
+        if lookup_dict is None:
+            lookup_dict = self.br_table_dict
         br_table_id = lookup_dict[table_name]["id"]
         query_field_id = lookup_dict[table_name]["fields"][field_name]["id"]
+        if self.result_cache is None:
+            return self._get_or_create(br_table_id, field_name, query_field_id, q)
+        # concurrent calls for the same value wait, then find the row created by the first
+        key = ("get_or_create", *self._search_key(q, query_field_id, "equal"))
+        with self.result_cache.key_lock(br_table_id, key):
+            return self._get_or_create(br_table_id, field_name, query_field_id, q)
+
+    def _get_or_create(self, br_table_id, field_name, query_field_id, q) -> tuple:
         match = self.search_rows(br_table_id, q, query_field_id, lookup_type="equal")
         if match["count"] == 1:
             object, created = match["results"][0], False
         else:
-            create_url = f"{self.br_base_url}database/rows/table/{br_table_id}/?user_field_names=true"
+            create_url = self.rows_url(br_table_id)
             item = {field_name: q}
-            r = requests.post(
-                create_url,
-                headers={
-                    "Authorization": f"Token {self.br_token}",
-                    "Content-Type": "application/json",
-                },
-                json=item,
+            r = self._request(
+                "POST", create_url, headers=self.token_headers(), json=item
             )
-            object, created = r.json(), True
+            object, created = loads(r.content), True
+            if self.result_cache is not None and r.status_code == 200:
+                # the next lookup of the value finds the new row
+                page = {"count": 1, "next": None, "previous": None, "results": [object]}
+                key = self._search_key(q, query_field_id, "equal")
+                self.result_cache.put(br_table_id, key, dumpb(page))
         return object, created
 
-    def delete_table(self, table_id):
-        url = f"{self.br_base_url}database/tables/{table_id}/"
-        r = requests.delete(
-            url,
-            headers={
-                "Authorization": f"JWT {self.br_jwt_token}",
-                "Content-Type": "application/json",
-            },
+    def bulk_get_or_create(
+        self,
+        table_name,
+        field_name,
+        values,
+        lookup_dict=None,
+        chunk_size=50,
+        scan=False,
+    ) -> dict:
+        """`get_or_create` for many values at once
+
+        Existing rows are looked up with one OR-filtered request per `chunk_size` values\
+        (fewer if the URL would get longer than `MAX_URL_LENGTH`) or, with `scan=True`, by\
+        reading the whole table once; missing rows are created with the batch endpoint in\
+        chunks of `MAX_PAGE_SIZE`.
+
+        Args:
+            table_name (str): Name of the table to search/create in
+            field_name (str): Name of the field to search by and set value for
+            values (Iterable): the values to look up; duplicates are looked up once
+            lookup_dict (dict, optional): Dictionary containing table and field metadata\
+            including IDs. Defaults to None (the client's `br_table_dict`).
+            chunk_size (int, optional): max. values per lookup request. Defaults to 50.
+            scan (bool, optional): read the whole table instead of filtering; faster when\
+            looking up a large part of a table. Defaults to False.
+
+        Returns:
+            dict: maps each value to a tuple of the found or created row and a bool telling\
+            if the row was created. If several rows match a value the first one is returned,\
+            if creating a row failed the tuple is `({"error": ...}, False)`.
+        """
+        if lookup_dict is None:
+            lookup_dict = self.br_table_dict
+        br_table_id = lookup_dict[table_name]["id"]
+        query_field_id = lookup_dict[table_name]["fields"][field_name]["id"]
+        wanted = {f"{x}": x for x in values}
+        found = {}
+        if scan:
+            rows = self.yield_rows(br_table_id, size=MAX_PAGE_SIZE)
+        else:
+            rows = self._yield_rows_matching(
+                br_table_id, query_field_id, wanted, chunk_size
+            )
+        for row in rows:
+            key = f"{row[field_name]}"
+            if key in wanted and key not in found:
+                found[key] = row
+        result = {wanted[key]: (row, False) for key, row in found.items()}
+        missing = [key for key in wanted if key not in found]
+        url = self.rows_url(br_table_id, batch=True)
+        items = ({field_name: wanted[key]} for key in missing)
+        for batch in self._send_batches("POST", url, items, MAX_PAGE_SIZE, 1):
+            for item, row in zip(batch["items"], batch["rows"]):
+                result[item[field_name]] = (row, True)
+            if batch["error"] is not None:
+                for item in batch["items"]:
+                    result[item[field_name]] = ({"error": batch["error"]}, False)
+        return {wanted[key]: result[wanted[key]] for key in wanted}
+
+    def _yield_rows_matching(self, br_table_id, query_field_id, values, chunk_size):
+        """yields the rows whose field equals one of `values`, with OR-filtered requests\
+        of at most `chunk_size` values whose URLs stay below `MAX_URL_LENGTH`"""
+        group = {"filter_type": "OR", "filters": []}
+        url = self.page_url(
+            br_table_id, {"filters": quote(dumps(group))}, MAX_PAGE_SIZE
+        )
+        # leaves room for the "&page=..." of the following pages
+        budget = MAX_URL_LENGTH - len(url) - 16
+        size = 0
+        for value in values:
+            condition = {"type": "equal", "field": query_field_id, "value": value}
+            length = len(quote(dumps(condition))) + len(quote(","))
+            full = len(group["filters"]) >= chunk_size or size + length > budget
+            if group["filters"] and full:
+                yield from self._yield_rows_filtered(br_table_id, group)
+                group["filters"], size = [], 0
+            group["filters"].append(condition)
+            size += length
+        if group["filters"]:
+            yield from self._yield_rows_filtered(br_table_id, group)
+
+    def _yield_rows_filtered(self, br_table_id, group: dict):
+        yield from self.yield_rows(
+            br_table_id, filters={"filters": quote(dumps(group))}, size=MAX_PAGE_SIZE
         )
+
+    def delete_table(self, table_id):
+        url = self.table_url(table_id)
+        r = self._request("DELETE", url, headers=self.jwt_headers(self.br_jwt_token))
         if r.status_code == 204:
+            self.invalidate_schema_cache()
             object, deleted = {"status": f"table {table_id} deleted"}, True
         else:
             object, deleted = {"error": r.status_code}, False
@@ -220,21 +1036,17 @@ class BaseRowClient:
 
     def create_table(self, table_name, fields=None):
         database_id = self.br_db_id
-        url = f"{self.br_base_url}database/tables/database/{database_id}/"
+        url = self.tables_url(database_id)
         payload = {"name": table_name}
         if fields is not None:
             payload["data"] = fields
             payload["first_row_header"] = True
-        r = requests.post(
-            url=url,
-            headers={
-                "Authorization": f"JWT {self.br_jwt_token}",
-                "Content-Type": "application/json",
-            },
-            json=payload,
+        r = self._request(
+            "POST", url=url, headers=self.jwt_headers(self.br_jwt_token), json=payload
         )
         if r.status_code == 200:
-            object, created = r.json(), True
+            self.invalidate_schema_cache()
+            object, created = loads(r.content), True
         else:
             object, created = {"error": r.status_code}, False
         return object, created
@@ -243,86 +1055,179 @@ class BaseRowClient:
         object, deleted = {"status": "no fields to delete"}, True
         for f in self.list_fields(br_table_id):
             if f["name"] in field_names:
-                print("Deleting field... ", f["name"], f["id"])
-                url = f"{self.br_base_url}database/fields/{f['id']}/"
-                r = requests.delete(
-                    url,
-                    headers={
-                        "Authorization": f"JWT {self.br_jwt_token}",
-                        "Content-Type": "application/json",
-                    },
+                logger.debug("deleting field %s (%s)", f["name"], f["id"])
+                url = self.field_url(f["id"])
+                r = self._request(
+                    "DELETE", url, headers=self.jwt_headers(self.br_jwt_token)
                 )
                 if r.status_code == 200:
-                    print(
-                        f"Deleted field {f['name']} with id: {f['id']} in {br_table_id}"
+                    logger.debug(
+                        "deleted field %s with id: %s in %s",
+                        f["name"],
+                        f["id"],
+                        br_table_id,
                     )
-                    object, deleted = r.json(), True
+                    object, deleted = loads(r.content), True
                 else:
-                    print(f"Error {r.status_code} with {br_table_id} in delete_fields")
+                    logger.warning(
+                        "error %s with %s in delete_fields", r.status_code, br_table_id
+                    )
                     object, deleted = {"error": r.status_code}, False
         return object, deleted
 
     def create_table_fields(self, br_table_id, br_table_fields):
-        url = f"{self.br_base_url}database/fields/table/{br_table_id}/"
+        url = self.fields_url(br_table_id)
         payload, valid = self.validate_table_fields_type(br_table_fields)
         if valid:
             for field in payload:
-                r = requests.post(
+                r = self._request(
+                    "POST",
                     url=url,
-                    headers={
-                        "Authorization": f"JWT {self.br_jwt_token}",
-                        "Content-Type": "application/json",
-                    },
+                    headers=self.jwt_headers(self.br_jwt_token),
                     json=field,
                 )
                 if r.status_code == 200:
-                    object, created = r.json(), True
+                    object, created = loads(r.content), True
                 else:
                     object, created = {"error": r.status_code}, False
         else:
             object, created = {"error": "Field type schema wrong."}, valid
-            print(
+            logger.warning(
+                "%s Visit https://api.baserow.io/api/redoc/ to learn more.",
                 object["error"],
-                "Visit https://api.baserow.io/api/redoc/ to learn more.",
             )
         return object, created
 
     def validate_table_fields_type(self, br_table_fields):
-        valid = True
-        required_keys = ["name", "type"]
-        for f in br_table_fields:
-            for k in required_keys:
-                if k not in f.keys():
-                    valid = False
-                    raise KeyError(f"missing required key: {k}")
-        valid_types = [
-            "text",
-            "long_text",
-            "number",
-            "date",
-            "boolean",
-            "link_row",
-            "formula",
-        ]
+        """checks field declarations, see `migrations.validate_field` for the field types\
+        and the keys they need
+
+        Raises:
+            KeyError: for missing keys and unknown field types
+            ValueError: for values of the wrong type
+        """
         for f in br_table_fields:
-            if f["type"] not in valid_types:
-                valid = False
-                raise KeyError(f"invalid field type: {f['type']}")
-            if f["type"] == "formula":
-                if "formula" not in f.keys():
-                    valid = False
-                    raise KeyError("formula field missing 'formula' key")
-                elif not isinstance(f["formula"], str):
-                    valid = False
-                    raise ValueError("formula field must be a string")
-            if f["type"] == "link_row":
-                if "link_row_table_id" not in f.keys():
-                    valid = False
-                    raise KeyError("link_row field missing 'link_row_table_id' key")
-                elif not isinstance(f["link_row_table_id"], int):
-                    valid = False
-                    raise ValueError("link_row_table_id field must be a integer")
-        return br_table_fields, valid
+            validate_field(f)
+        return br_table_fields, True
+
+    def migrate_schema(
+        self, tables: dict, delete=False, dry_run=False, workers=4, current=None
+    ):
+        """creates, updates and deletes tables and fields of the client's database so that\
+        they match the declared ones; operations already done are skipped, so running it\
+        again changes nothing
+
+        The database is read with `fetch_table_field_dict` and compared with the\
+        declaration, see `migrations.SchemaMigration`. Missing tables are created first,\
+        then fields are deleted, created and updated; link_row fields follow once all\
+        other fields exist and count, rollup and lookup fields last. The operations of\
+        each of these steps are sent concurrently.
+
+        ```python
+        br_client.migrate_schema({
+            "place": [{"name": "Name", "type": "text"}, {"name": "GND", "type": "url"}],
+            "person": [
+                {"name": "Name", "type": "text"},
+                {"name": "born_in", "type": "link_row", "link_row_table": "place"},
+            ],
+        })
+        ```
+
+        Args:
+            tables (dict): maps table names to lists of field declarations (as for\
+            `create_table_fields`); the first field of a new table is its primary field,\
+            link_row fields can name the linked table with `link_row_table`
+            delete (bool, optional): delete fields which are not declared (but primary\
+            fields and the related fields of declared link_row fields). Defaults to False.
+            dry_run (bool, optional): only return the operations. Defaults to False.
+            workers (int, optional): max. number of concurrent requests. Defaults to 4.
+            current (dict, optional): the table/field dict of the database if it was just\
+            fetched with `fetch_table_field_dict`. Defaults to None (fetched).
+
+        Returns:
+            dict: "created_tables" (names), "created_fields", "updated_fields" and\
+            "deleted_fields" (`(table name, field name)` tuples), "errors" (the failed\
+            operations with the "error" returned by Baserow) and "table_ids" (the IDs of\
+            the declared tables which exist)
+        """
+        if not self.br_db_id:
+            raise ValueError("migrate_schema needs a client with br_db_id")
+        if current is None:
+            current = self.fetch_table_field_dict(self.br_db_id, workers=workers)
+        current = dict(current)
+        migration = SchemaMigration(tables, current, delete)
+        summary = {
+            "created_tables": migration.new_tables(),
+            "created_fields": [],
+            "updated_fields": [],
+            "deleted_fields": [],
+            "errors": [],
+        }
+        table_ids = {name: current[name]["id"] for name in tables if name in current}
+        if not dry_run:
+
+            def create_table(table_name):
+                primary = tables[table_name][0]["name"]
+                table, created = self.create_table(table_name, fields=[[primary]])
+                if created:
+                    table["fields"] = {
+                        x["name"]: x for x in self.list_fields(table["id"])
+                    }
+                return table_name, table, created
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(create_table, summary["created_tables"])
+                for table_name, table, created in list(results):
+                    if created:
+                        current[table_name] = table
+                        table_ids[table_name] = table["id"]
+                    else:
+                        error = {"action": "create_table", "table": table_name}
+                        summary["errors"].append({**error, **table})
+            summary["created_tables"] = [
+                x for x in summary["created_tables"] if x in table_ids
+            ]
+        operations = migration.operations(table_ids)
+        for phase in PHASES[1:]:
+            batch = [x for x in operations if x["action"] == phase]
+            if not batch:
+                continue
+            logger.debug("%s: %s operations", phase, len(batch))
+            if dry_run:
+                results = [(x, None) for x in batch]
+            else:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(self._apply_field_operation, batch))
+            for operation, error in results:
+                if error is not None:
+                    summary["errors"].append({**operation, "error": error})
+                    continue
+                key = f"{operation['action'].split('_')[0]}d_fields"
+                summary[key].append((operation["table"], operation["field"]))
+        if not dry_run:
+            self.invalidate_schema_cache()
+        summary["table_ids"] = table_ids
+        return summary
+
+    def _apply_field_operation(self, operation: dict) -> tuple:
+        action = operation["action"]
+        headers = self.jwt_headers(self.br_jwt_token)
+        if action == "delete_field":
+            url = self.field_url(operation["field_id"])
+            r = self._request("DELETE", url, headers=headers)
+        elif action.startswith("create"):
+            url = self.fields_url(operation["table_id"])
+            r = self._request("POST", url, headers=headers, json=operation["payload"])
+        else:
+            url = self.field_url(operation["field_id"])
+            r = self._request("PATCH", url, headers=headers, json=operation["payload"])
+        if r.status_code in (200, 204):
+            return operation, None
+        try:
+            error = loads(r.content)
+        except ValueError:
+            error = r.status_code
+        return operation, error
 
     def patch_row(self, table_id: str, row_id: str, payload: dict) -> dict:
         """sends a PATCH request for the given row
@@ -336,56 +1241,373 @@ class BaseRowClient:
             dict: The JSON response of the updated row
         """  # noqa:
 
-        url = f"{self.br_base_url}database/rows/table/{table_id}/{row_id}/?user_field_names=true"
-        print(url)
-        r = requests.patch(
+        url = self.rows_url(table_id, row_id)
+        r = self._request("PATCH", url, headers=self.token_headers(), json=payload)
+        return loads(r.content)
+
+    def _send_batches(
+        self,
+        method: str,
+        url: str,
+        payload,
+        batch_size: int,
+        workers: int,
+        ids_only: bool = False,
+    ):
+        """sends `payload` in chunks of `batch_size` with up to `workers` chunks in flight
+
+        Yields:
+            dict: per chunk (in input order) `{"items": [...], "rows": [...], "error": ...}`\
+            with the sent items, the returned rows and the error (or None); with `ids_only`\
+            "items" is None and "rows" holds only the row IDs
+        """
+
+        def send(batch):
+            r = self._request(method, url, headers=self.token_headers(), json=batch)
+            rows, error = self.parse_batch_response(r)
+            if ids_only:
+                return {
+                    "items": None,
+                    "rows": [x["id"] for x in rows or []],
+                    "error": error,
+                }
+            return {"items": batch["items"], "rows": rows or [], "error": error}
+
+        batches = self.batch_payloads(payload, batch_size)
+        if workers <= 1:
+            for batch in batches:
+                yield send(batch)
+            return
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
+                for batch in batches:
+                    pending.append(executor.submit(send, batch))
+                    if len(pending) >= workers:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _iter_batch_results(self, key: str, *args):
+        for result in self._send_batches(*args):
+            errors = [] if result["error"] is None else [result["error"]]
+            yield {key: result["rows"], "errors": errors}
+
+    def _collect_batches(self, key: str, *args, callback=None) -> dict:
+        rows = []
+        errors = []
+        for result in self._iter_batch_results(key, *args):
+            errors.extend(result["errors"])
+            if callback is None:
+                rows.extend(result[key])
+            else:
+                callback(result)
+        return {key: rows, "errors": errors}
+
+    def batch_update_rows(
+        self,
+        table_id: str,
+        payload: list,
+        batch_size=BATCH_SIZE,
+        workers=1,
+        ids_only=False,
+        callback=None,
+    ) -> dict:
+        """Sends PATCH requests for the given rows in batches of 199.
+
+        Args:
+            table_id (str): The ID of the table
+            payload (list): The patch-data for multiple rows, any iterable (e.g. a generator)
+            batch_size (int, optional): rows per request, at most 200. Defaults to 199.
+            workers (int, optional): number of batches sent concurrently. Defaults to 1.
+            ids_only (bool, optional): keep only the IDs of the updated rows instead of\
+            the returned row objects. Defaults to False.
+            callback (callable, optional): called with the result of each batch (a dict like\
+            the one returned) as soon as it completes; the updated rows are then passed\
+            only to the callback and not collected. Defaults to None.
+
+        Returns:
+            dict: A dict with keys "updated_rows" with updated row objects and "errors".
+        """
+        url = self.rows_url(table_id, batch=True)
+        logger.debug("start updating rows of table %s", table_id)
+        return self._collect_batches(
+            "updated_rows",
+            "PATCH",
             url,
-            headers={
-                "Authorization": f"Token {self.br_token}",
-                "Content-Type": "application/json",
-            },
-            json=payload,
+            payload,
+            batch_size,
+            workers,
+            ids_only,
+            callback=callback,
         )
-        return r.json()
 
-    def batch_update_rows(self, table_id: str, payload: list) -> dict:
-        """Sends PATCH requests for the given rows in batches of 190.
+    def iter_batch_update_rows(
+        self, table_id: str, payload, batch_size=BATCH_SIZE, workers=1, ids_only=False
+    ):
+        """streaming variant of `batch_update_rows`, neither input nor output is held in memory
+
+        Yields:
+            dict: per batch (in input order) a dict with keys "updated_rows" and "errors"
+        """
+        url = self.rows_url(table_id, batch=True)
+        yield from self._iter_batch_results(
+            "updated_rows", "PATCH", url, payload, batch_size, workers, ids_only
+        )
+
+    def batch_create_rows(
+        self,
+        table_id: str,
+        payload: list,
+        batch_size=BATCH_SIZE,
+        workers=1,
+        ids_only=False,
+        callback=None,
+    ) -> dict:
+        """Creates the given rows with POST requests in batches of 199.
 
         Args:
             table_id (str): The ID of the table
-            payload (list): The patch-data for multiple rows
+            payload (list): The data of the new rows, any iterable (e.g. a generator)
+            batch_size (int, optional): rows per request, at most 200. Defaults to 199.
+            workers (int, optional): number of batches sent concurrently. Defaults to 1.
+            ids_only (bool, optional): keep only the IDs of the new rows. Defaults to False.
+            callback (callable, optional): see `batch_update_rows`. Defaults to None.
 
         Returns:
-            dict: A dict with keys "updated_rows" with updated row objects and "errors".
+            dict: A dict with keys "created_rows" with the new row objects (in input order)\
+            and "errors".
+        """
+        url = self.rows_url(table_id, batch=True)
+        return self._collect_batches(
+            "created_rows",
+            "POST",
+            url,
+            payload,
+            batch_size,
+            workers,
+            ids_only,
+            callback=callback,
+        )
+
+    def batch_delete_rows(
+        self, table_id: str, row_ids: list, batch_size=BATCH_SIZE, workers=1
+    ) -> dict:
+        """Deletes the given rows with POST requests in batches of 199.
+
+        Args:
+            table_id (str): The ID of the table
+            row_ids (list): The IDs of the rows to delete, any iterable (e.g. a generator)
+            batch_size (int, optional): rows per request, at most 200. Defaults to 199.
+            workers (int, optional): number of batches sent concurrently. Defaults to 1.
+
+        Returns:
+            dict: A dict with keys "deleted_rows" with the IDs of the deleted rows and "errors".
         """
-        url = f"{self.br_base_url}database/rows/table/{table_id}/batch/?user_field_names=true"
-        batch_size = 199
-        updated_rows = []
+        url = self.rows_url(table_id, batch="delete")
+        deleted_rows = []
         errors = []
-        print(f"start updating {len(payload)} rows")
-        for i in range(0, len(payload), batch_size):
-            batch = payload[i : i + batch_size]  # noqa
-            r = requests.patch(
-                url,
-                headers={
-                    "Authorization": f"Token {self.br_token}",
-                    "Content-Type": "application/json",
-                },
-                json={"items": batch},
+        for result in self._send_batches("POST", url, row_ids, batch_size, workers):
+            if result["error"] is None:
+                deleted_rows.extend(result["items"])
+            else:
+                errors.append(result["error"])
+        return {"deleted_rows": deleted_rows, "errors": errors}
+
+    def sync_table(
+        self,
+        table_id: str,
+        rows,
+        key="id",
+        delete=False,
+        batch_size=BATCH_SIZE,
+        workers=1,
+        dry_run=False,
+    ) -> dict:
+        """makes a table hold the given rows, sending only the needed creates, updates\
+        and deletes
+
+        The table is streamed with `yield_rows` (only the fields used by `rows`) and each\
+        row is compared with its desired row by a hash of the desired row's fields;\
+        link_row and select values are compared by their IDs, number and date values by\
+        their value (e.g. "3.50" matches 3.5). Unchanged rows cost no write requests.
+
+        Args:
+            table_id (str): The ID of the table
+            rows (Iterable[dict]): the desired rows, e.g. `[{"id": 3, "Name": "Wien"}]`
+            key (str, optional): "id" to match rows by row ID or the name of a field\
+            holding a natural key, e.g. "GND". Defaults to "id".
+            delete (bool, optional): delete rows not among `rows` (and duplicates of a key).\
+            Defaults to False.
+            batch_size (int, optional): rows per request, at most 200. Defaults to 199.
+            workers (int, optional): number of batches sent concurrently. Defaults to 1.
+            dry_run (bool, optional): only compare, don't write. Defaults to False.
+
+        Returns:
+            dict: the IDs of the "created", "updated" and "deleted" rows, the number of\
+            "unchanged" rows and the "errors"; with `dry_run` "created" holds the rows to\
+            create and "updated"/"deleted" the IDs of the rows to update/delete.
+        """
+        field_types = {x["name"]: x["type"] for x in self.list_fields(table_id)}
+        diff = TableDiff(rows, key, field_types)
+        include = diff.field_names()
+        if key != "id":
+            include.add(key)
+        for row in self.yield_rows(
+            table_id,
+            size=MAX_PAGE_SIZE,
+            workers=workers,
+            include=sorted(include) or None,
+        ):
+            diff.compare(row)
+        creates = diff.creates()
+        summary = {
+            "created": creates,
+            "updated": [x["id"] for x in diff.updates],
+            "deleted": diff.deletes if delete else [],
+            "unchanged": diff.unchanged,
+            "errors": [],
+        }
+        if dry_run:
+            return summary
+        if creates:
+            result = self.batch_create_rows(
+                table_id, creates, batch_size, workers, ids_only=True
             )
-            try:
-                resp = r.json()
-            except Exception:
-                errors.append(
-                    {"error": "Invalid JSON response", "status_code": r.status_code}
+            summary["created"] = result["created_rows"]
+            summary["errors"] += result["errors"]
+        if diff.updates:
+            result = self.batch_update_rows(
+                table_id, diff.updates, batch_size, workers, ids_only=True
+            )
+            summary["updated"] = result["updated_rows"]
+            summary["errors"] += result["errors"]
+        if summary["deleted"]:
+            result = self.batch_delete_rows(
+                table_id, summary["deleted"], batch_size, workers
+            )
+            summary["deleted"] = result["deleted_rows"]
+            summary["errors"] += result["errors"]
+        logger.debug(
+            "synced table %s: %s created, %s updated, %s deleted, %s unchanged",
+            table_id,
+            len(summary["created"]),
+            len(summary["updated"]),
+            len(summary["deleted"]),
+            summary["unchanged"],
+        )
+        return summary
+
+    def import_file(
+        self,
+        f_name: str,
+        table_name=None,
+        fields=None,
+        input_format=None,
+        delimiter=",",
+        sample_size=SAMPLE_SIZE,
+        batch_size=BATCH_SIZE,
+        workers=4,
+        progress=None,
+    ) -> dict:
+        """imports the rows of a CSV (with a header line) or JSONL file into a table of the\
+        client's database, creating the table and missing fields first
+
+        The file is read as a stream: only the first `sample_size` rows (from which the\
+        field types are inferred, see `importer.infer_field`) and the batches in flight\
+        are held in memory. Rows are created with batch requests, up to `workers` of them\
+        concurrently. Fields of an existing table keep their types, the values are\
+        converted for them; columns without a field in the table are left out, like the\
+        "id" and "order" columns of files written by `dump_tables_as_json`.
+
+        ```python
+        br_client.import_file("persons.csv.gz", "person", fields=[{"name": "GND", "type": "url"}])
+        ```
+
+        Args:
+            f_name (str): the file, ".gz", ".bz2" and ".xz" files are decompressed
+            table_name (str, optional): the table, created if missing. Defaults to the\
+            file name without suffixes.
+            fields (list, optional): field declarations (as for `migrate_schema`) used\
+            instead of the inferred ones of the same name. Defaults to None.
+            input_format (str, optional): "csv" or "jsonl". Defaults to None (from the\
+            suffix of `f_name`).
+            delimiter (str, optional): the CSV delimiter. Defaults to ",".
+            sample_size (int, optional): rows used to infer field types. Defaults to 1000.
+            batch_size (int, optional): rows per request, at most 200. Defaults to 199.
+            workers (int, optional): number of batches sent concurrently. Defaults to 4.
+            progress (callable, optional): called after each batch with a dict like the\
+            returned one. Defaults to None.
+
+        Returns:
+            dict: the "table_id", the "created_fields" (names), the numbers of "rows" read,\
+            rows "created" and "failed", the "errors", the "seconds" taken and\
+            "rows_per_second"
+        """
+        if not self.br_db_id:
+            raise ValueError("import_file needs a client with br_db_id")
+        input_format = input_format or input_format_of(f_name)
+        if table_name is None:
+            table_name = os.path.basename(f_name).split(".")[0]
+        start = time.perf_counter()
+        with open_input(f_name) as f:
+            rows = read_rows(f, input_format, delimiter)
+            inferred, sample = infer_fields(rows, sample_size)
+            declared = {x["name"]: x for x in inferred}
+            declared.update({x["name"]: x for x in fields or []})
+            tables = self.fetch_table_field_dict(self.br_db_id)
+            current = tables.get(table_name)
+            existing = current["fields"] if current else {}
+            missing = [x for x in declared.values() if x["name"] not in existing]
+            if current is None and not missing:
+                raise ValueError(
+                    f"{f_name} has no columns to create table {table_name!r} from"
                 )
-                continue
-            try:
-                updated_rows.extend(resp["items"])
-            except KeyError:
-                updated_rows.extend([])
-                errors.append(resp["error"])
-        return {"updated_rows": updated_rows, "errors": errors}
+            summary = {
+                "table_id": current["id"] if current else None,
+                "created_fields": [],
+                "rows": 0,
+                "created": 0,
+                "failed": 0,
+                "errors": [],
+                "seconds": 0,
+                "rows_per_second": 0,
+            }
+            if missing:
+                migration = self.migrate_schema(
+                    {table_name: missing}, workers=workers, current=tables
+                )
+                summary["created_fields"] = [x[1] for x in migration["created_fields"]]
+                summary["errors"] += migration["errors"]
+                if table_name not in migration["table_ids"]:
+                    raise ValueError(f"table {table_name!r} could not be created")
+                summary["table_id"] = migration["table_ids"][table_name]
+            table_id = summary["table_id"]
+            field_types = {x["name"]: x["type"] for x in self.list_fields(table_id)}
+            logger.debug("importing %s into table %s", f_name, table_name)
+            payload = (convert_row(x, field_types) for x in chain(sample, rows))
+            url = self.rows_url(table_id, batch=True)
+            for result in self._send_batches("POST", url, payload, batch_size, workers):
+                summary["rows"] += len(result["items"])
+                summary["created"] += len(result["rows"])
+                summary["failed"] += len(result["items"]) - len(result["rows"])
+                if result["error"] is not None:
+                    summary["errors"].append(result["error"])
+                summary["seconds"] = time.perf_counter() - start
+                summary["rows_per_second"] = summary["rows"] / summary["seconds"]
+                logger.debug(
+                    "%s rows imported (%.1f rows/s)",
+                    summary["rows"],
+                    summary["rows_per_second"],
+                )
+                if progress is not None:
+                    progress(dict(summary))
+        summary["seconds"] = time.perf_counter() - start
+        summary["rows_per_second"] = summary["rows"] / summary["seconds"]
+        return summary
 
     def __init__(
         self,
@@ -394,20 +1616,62 @@ class BaseRowClient:
         br_token,
         br_base_url="https://api.baserow.io/api/",
         br_db_id=None,
+        pool_size=10,
+        timeout=30,
+        max_retries=3,
+        backoff_factor=0.5,
+        session=None,
+        schema_cache=None,
+        schema_cache_ttl=86400,
+        rate_limit=None,
+        target_latency=None,
+        scheduler=None,
+        token_cache=None,
+        result_cache=None,
     ):
         self.br_user = br_user
         self.br_pw = br_pw
         self.br_token = br_token
         self.br_base_url = self.url_fixer(br_base_url)
-        self.br_jwt_token = self.get_jwt_token()
-        self.headers = {
-            "Authorization": f"Token {self.br_token}",
-            "Content-Type": "application/json",
-        }
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.pool_size = pool_size
+        if scheduler is None:
+            scheduler = RequestScheduler(
+                max_concurrency=pool_size,
+                rate_limit=rate_limit,
+                target_latency=target_latency,
+            )
+        self.scheduler = scheduler
+        if session is None:
+            session = make_session(
+                pool_size=pool_size,
+                max_retries=max_retries,
+                backoff_factor=backoff_factor,
+                scheduler=scheduler,
+            )
+        self.session = session
+        self.metrics = RequestMetrics()
+        self.pre_request_hooks = []
+        self.post_request_hooks = [self.metrics]
+        self.schema_cache = schema_cache
+        self.schema_cache_ttl = schema_cache_ttl
+        if token_cache is None:
+            token_cache = TOKEN_CACHE
+        elif isinstance(token_cache, str):
+            token_cache = TokenCache(token_cache)
+        self.token_cache = token_cache
+        # with a hash of the password, so wrong credentials never get a cached token
+        pw_hash = hashlib.sha256(f"{br_pw}".encode("utf-8")).hexdigest()[:16]
+        self.token_cache_key = f"{self.br_base_url}|{br_user}|{pw_hash}"
+        if result_cache is True:
+            result_cache = ResultCache()
+        self.result_cache = result_cache
+        self.br_jwt_token = None
+        self.headers = self.token_headers()
+        self.br_table_dict = None
         if br_db_id:
             self.br_db_id = br_db_id
-            self.br_table_dict = self.fetch_table_field_dict(self.br_db_id)
-
         else:
             self.br_db_id = None
-            self.br_table_dict = None
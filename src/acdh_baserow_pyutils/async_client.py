@@ -0,0 +1,250 @@
+import asyncio
+import math
+from typing import Union
+
+from acdh_baserow_pyutils.common import BATCH_SIZE, BaseRowApiMixin
+from acdh_baserow_pyutils.jsonlib import dumpb, loads
+from acdh_baserow_pyutils.schema import SchemaRegistry
+from acdh_baserow_pyutils.session import retryable
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+
+class AsyncBaseRowClient(BaseRowApiMixin):
+    """asyncio counterpart of `BaseRowClient`, needs `httpx` (`pip install acdh-baserow-pyutils[async]`)
+
+    All requests share one `httpx.AsyncClient` connection pool and at most\
+    `concurrency` requests are in flight at once. The JWT is fetched on first use.
+
+    ```python
+    async with AsyncBaseRowClient(BASEROW_USER, BASEROW_PW, BASEROW_TOKEN) as br_client:
+        table_dict = await br_client.fetch_table_field_dict(DATABASE_ID)
+        results = await asyncio.gather(
+            *[br_client.get_or_create("person", "Name", table_dict, x) for x in names]
+        )
+    ```
+    """
+
+    async def _request(self, method: str, url: str, **kwargs):
+        """sends a request through the shared connection pool, retrying on\
+        `RETRY_STATUS_CODES` with exponential backoff (or as told by `Retry-After`);\
+        POST and PATCH requests only on 429, see `session.retryable`
+
+        Args:
+            method (str): the HTTP method, e.g. "GET"
+            url (str): the URL to send the request to
+            **kwargs: passed on to `httpx.AsyncClient.request`; a `json` body is\
+            encoded with `jsonlib.dumpb`
+
+        Returns:
+            httpx.Response: the response
+        """
+        if kwargs.get("json") is not None:
+            kwargs["content"] = dumpb(kwargs.pop("json"))
+            kwargs["headers"] = {
+                "Content-Type": "application/json",
+                **(kwargs.get("headers") or {}),
+            }
+        for attempt in range(self.max_retries + 1):
+            async with self._get_semaphore():
+                r = await self.client.request(method, url, **kwargs)
+            if not retryable(method, r.status_code) or attempt == self.max_retries:
+                return r
+            try:
+                delay = float(r.headers["Retry-After"])
+            except (KeyError, ValueError):
+                delay = self.backoff_factor * 2**attempt
+            await asyncio.sleep(delay)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # created lazily so that it is bound to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._jwt_lock = asyncio.Lock()
+        return self._semaphore
+
+    async def aclose(self):
+        """closes the shared connection pool"""
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    async def get_jwt_token(self) -> str:
+        """fetches a baserow auth token
+
+        Returns:
+            str: the baserow auth token
+        """
+        r = await self._request(
+            "POST", self.token_auth_url(), json=self.token_auth_payload()
+        )
+        return loads(r.content)["token"]
+
+    async def _jwt_headers(self) -> dict:
+        self._get_semaphore()
+        async with self._jwt_lock:
+            if self.br_jwt_token is None:
+                self.br_jwt_token = await self.get_jwt_token()
+        return self.jwt_headers(self.br_jwt_token)
+
+    async def list_tables(self, br_database_id: Union[int, str]) -> list:
+        """returns all tables of the given database, see `BaseRowClient.list_tables`"""
+        headers = await self._jwt_headers()
+        r = await self._request("GET", self.tables_url(br_database_id), headers=headers)
+        return loads(r.content)
+
+    async def list_fields(self, br_table_id) -> list:
+        """returns all fields of the given table, see `BaseRowClient.list_fields`"""
+        headers = await self._jwt_headers()
+        r = await self._request("GET", self.fields_url(br_table_id), headers=headers)
+        return loads(r.content)
+
+    async def search_rows(
+        self, br_table_id, q, query_field_id, lookup_type="contains"
+    ) -> dict:
+        """searches rows of a table, see `BaseRowClient.search_rows`"""
+        headers = await self._jwt_headers()
+        url = self.search_url(br_table_id, q, query_field_id, lookup_type)
+        r = await self._request("GET", url, headers=headers)
+        return loads(r.content)
+
+    async def yield_rows(self, br_table_id, filters={}, size=None, workers=1):
+        """yields all rows of the given table, see `BaseRowClient.yield_rows`
+
+        With `workers` > 1 up to `workers` pages are requested concurrently.
+        """
+        url = self.page_url(br_table_id, filters, size)
+        r = await self._request("GET", url, headers=self.token_headers())
+        result = loads(r.content)
+        for x in result["results"]:
+            yield x
+        if workers > 1 and result["next"]:
+            pages = range(2, math.ceil(result["count"] / (size or 100)) + 1)
+            for i in range(0, len(pages), workers):
+                responses = await asyncio.gather(
+                    *[
+                        self._request(
+                            "GET", f"{url}&page={page}", headers=self.token_headers()
+                        )
+                        for page in pages[i : i + workers]  # noqa
+                    ]
+                )
+                for r in responses:
+                    for x in loads(r.content)["results"]:
+                        yield x
+            return
+        while result["next"]:
+            r = await self._request("GET", result["next"], headers=self.token_headers())
+            result = loads(r.content)
+            for x in result["results"]:
+                yield x
+
+    async def fetch_table_field_dict(self, br_db_id) -> dict:
+        """see `BaseRowClient.fetch_table_field_dict`, fields are listed concurrently"""
+        br_tables = await self.list_tables(br_db_id)
+        fields = await asyncio.gather(*[self.list_fields(x["id"]) for x in br_tables])
+        table_dict = {}
+        for x, table_fields in zip(br_tables, fields):
+            table_dict[x["name"]] = x
+            table_dict[x["name"]]["fields"] = {f["name"]: f for f in table_fields}
+        return SchemaRegistry(table_dict)
+
+    async def get_or_create(self, table_name, field_name, lookup_dict, q) -> tuple:
+        """gets an existing row or creates a new one, see `BaseRowClient.get_or_create`
+
+        Returns:
+            tuple: the found or created row and a bool telling if it was created
+        """
+        br_table_id = lookup_dict[table_name]["id"]
+        query_field_id = lookup_dict[table_name]["fields"][field_name]["id"]
+        match = await self.search_rows(
+            br_table_id, q, query_field_id, lookup_type="equal"
+        )
+        if match["count"] == 1:
+            return match["results"][0], False
+        r = await self._request(
+            "POST",
+            self.rows_url(br_table_id),
+            headers=self.token_headers(),
+            json={field_name: q},
+        )
+        return loads(r.content), True
+
+    async def patch_row(self, table_id: str, row_id: str, payload: dict) -> dict:
+        """sends a PATCH request for the given row, see `BaseRowClient.patch_row`"""
+        r = await self._request(
+            "PATCH",
+            self.rows_url(table_id, row_id),
+            headers=self.token_headers(),
+            json=payload,
+        )
+        return loads(r.content)
+
+    async def batch_update_rows(self, table_id: str, payload: list) -> dict:
+        """sends the rows to the batch endpoint in concurrent chunks,\
+        see `BaseRowClient.batch_update_rows`
+
+        Returns:
+            dict: A dict with keys "updated_rows" with updated row objects and "errors".
+        """
+        url = self.rows_url(table_id, batch=True)
+        responses = await asyncio.gather(
+            *[
+                self._request("PATCH", url, headers=self.token_headers(), json=batch)
+                for batch in self.batch_payloads(payload, BATCH_SIZE)
+            ]
+        )
+        updated_rows = []
+        errors = []
+        for r in responses:
+            rows, error = self.parse_batch_response(r)
+            if error is None:
+                updated_rows.extend(rows)
+            else:
+                errors.append(error)
+        return {"updated_rows": updated_rows, "errors": errors}
+
+    def __init__(
+        self,
+        br_user,
+        br_pw,
+        br_token,
+        br_base_url="https://api.baserow.io/api/",
+        br_db_id=None,
+        concurrency=10,
+        pool_size=10,
+        timeout=30,
+        max_retries=3,
+        backoff_factor=0.5,
+        client=None,
+    ):
+        if httpx is None:
+            raise ImportError(
+                "AsyncBaseRowClient needs httpx: pip install acdh-baserow-pyutils[async]"
+            )
+        self.br_user = br_user
+        self.br_pw = br_pw
+        self.br_token = br_token
+        self.br_base_url = self.url_fixer(br_base_url)
+        self.br_db_id = br_db_id
+        self.br_jwt_token = None
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        if client is None:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=pool_size, max_keepalive_connections=pool_size
+                ),
+                timeout=timeout,
+            )
+        self.client = client
+        self.concurrency = concurrency
+        self._semaphore = None
+        self._jwt_lock = None
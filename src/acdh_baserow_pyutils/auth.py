@@ -0,0 +1,139 @@
+import base64
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # e.g. Windows: the file is shared, but not locked
+
+JWT_LIFETIME = 600  # Baserow's default for access tokens, used if `exp` can't be read
+REFRESH_MARGIN = 60
+
+
+def token_expiry(token: str) -> Union[float, None]:
+    """returns the expiry time (the `exp` claim, seconds since the epoch) of a JWT or None\
+    if the token can't be decoded"""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+        return float(claims["exp"])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class TokenCache:
+    """JWTs (and their refresh tokens) shared by all clients using the cache
+
+    Tokens are kept per key (base URL and user) in memory and, with a `path`, in a JSON\
+    file, so clients in other processes (e.g. parallel export workers) reuse them instead\
+    of authenticating on their own. The file is locked while a token is renewed, so only\
+    one process does the round trip. A token is renewed `margin` seconds before it expires,\
+    with its refresh token if there is one, otherwise (or if that fails) by a new token-auth.
+
+    Args:
+        path (str, optional): a JSON file shared by processes. Defaults to None (memory only).
+        margin (float, optional): seconds before the expiry a token is renewed.\
+        Defaults to `REFRESH_MARGIN`.
+    """
+
+    def __init__(self, path: Union[str, None] = None, margin: float = REFRESH_MARGIN):
+        self.path = path
+        self.margin = margin
+        self.lock = threading.Lock()
+        self.tokens = {}
+
+    def valid(self, entry: Union[dict, None]) -> bool:
+        return entry is not None and entry["expires"] - self.margin > time.time()
+
+    def get(
+        self,
+        key: str,
+        fetch: Callable[[], dict],
+        refresh: Union[Callable[[str], Union[dict, None]], None] = None,
+    ) -> str:
+        """returns a valid token for `key`, renewing it if needed
+
+        Args:
+            key (str): identifies the account, e.g. base URL, user name and password hash
+            fetch (Callable): returns a new `{"token": ..., "refresh_token": ...}`
+            refresh (Callable, optional): gets the refresh token and returns a new\
+            `{"token": ...}` or None if it failed. Defaults to None.
+
+        Returns:
+            str: the token
+        """
+        entry = self.tokens.get(key)
+        if self.valid(entry):
+            return entry["token"]
+        with self.lock, self._file_lock():
+            entries = self._read()
+            candidates = [x for x in (self.tokens.get(key), entries.get(key)) if x]
+            entry = max(candidates, key=lambda x: x["expires"], default=None)
+            if not self.valid(entry):
+                new = None
+                if refresh is not None and entry and entry.get("refresh_token"):
+                    new = refresh(entry["refresh_token"])
+                    if new is not None:
+                        new.setdefault("refresh_token", entry["refresh_token"])
+                if new is None:
+                    new = fetch()
+                entry = {
+                    "token": new["token"],
+                    "refresh_token": new.get("refresh_token"),
+                    "expires": token_expiry(new["token"]) or time.time() + JWT_LIFETIME,
+                }
+                entries[key] = entry
+                self._write(entries)
+            self.tokens[key] = entry
+        return entry["token"]
+
+    def invalidate(self, key: str, token: str):
+        """marks a token as expired (e.g. after a 401), keeping its refresh token; a token\
+        renewed meanwhile by another client is left alone"""
+        with self.lock, self._file_lock():
+            entries = self._read()
+            for cache in (self.tokens, entries):
+                entry = cache.get(key)
+                if entry and entry["token"] == token:
+                    cache[key] = {**entry, "expires": 0}
+            self._write(entries)
+
+    @contextmanager
+    def _file_lock(self):
+        if self.path is None or fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read(self) -> dict:
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, entries: dict):
+        if self.path is None:
+            return
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
+
+
+TOKEN_CACHE = TokenCache()
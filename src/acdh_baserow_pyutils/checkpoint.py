@@ -0,0 +1,55 @@
+import json
+import os
+import threading
+from typing import Union
+
+CHECKPOINT_FILE_NAME = ".baserow_dump_checkpoint.json"
+
+
+class DumpCheckpoint:
+    """the progress of `BaseRowClient.dump_tables_as_json(..., checkpoint=...)`, kept in a\
+    JSON file
+
+    For every table it records the written file, the dump options, the row count and\
+    last-modified marker the dump started with, the number of written pages and rows and\
+    the size of the file after the last complete page. The file is rewritten (atomically)\
+    after each page.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.tables = json.load(f)
+        except (OSError, ValueError):
+            self.tables = {}
+
+    def get(self, br_table_id: Union[int, str]) -> Union[dict, None]:
+        """returns the recorded state of a table or None"""
+        with self.lock:
+            state = self.tables.get(str(br_table_id))
+        return dict(state) if state else None
+
+    def save(self, br_table_id: Union[int, str], state: dict):
+        """records the state of a table and rewrites the checkpoint file"""
+        with self.lock:
+            self.tables[str(br_table_id)] = dict(state)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.tables, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    def resumable(self, state: Union[dict, None], expected: dict) -> bool:
+        """tells if a dump can continue from `state`: it was made with the same file,\
+        options, row count and marker as `expected` and the file still holds at least\
+        the recorded bytes"""
+        if state is None:
+            return False
+        for key in ("file", "options", "count", "marker"):
+            if state.get(key) != expected[key]:
+                return False
+        try:
+            return os.path.getsize(state["file"]) >= state["offset"]
+        except OSError:
+            return False
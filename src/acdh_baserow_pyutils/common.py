@@ -0,0 +1,190 @@
+from itertools import islice
+from typing import Iterable, Union
+from urllib.parse import quote
+
+from acdh_baserow_pyutils.jsonlib import loads
+
+MAX_PAGE_SIZE = 200
+BATCH_SIZE = 199
+
+
+def field_selection_query(include: Iterable = None, exclude: Iterable = None) -> str:
+    """returns the `include`/`exclude` query parameters selecting fields by name
+
+    Names holding a comma are put in double quotes, double quotes are escaped with a\
+    backslash as expected by Baserow.
+
+    Args:
+        include (Iterable, optional): names of the only fields to return. Defaults to None.
+        exclude (Iterable, optional): names of fields to leave out. Defaults to None.
+
+    Returns:
+        str: e.g. `&include=Name,Beruf`, empty if neither is given
+    """
+    query = ""
+    for key, field_names in (("include", include), ("exclude", exclude)):
+        if field_names is None:
+            continue
+        values = []
+        for name in field_names:
+            name = name.replace('"', '\\"')
+            values.append(f'"{name}"' if "," in name else name)
+        query += f"&{key}={quote(','.join(values), safe=',')}"
+    return query
+
+
+class BaseRowApiMixin:
+    """URL, header and payload building shared by `BaseRowClient` and `AsyncBaseRowClient`
+
+    Expects `br_base_url`, `br_user`, `br_pw` and `br_token` to be set on the instance.
+    """
+
+    def url_fixer(self, url: str) -> str:
+        """checks if the passed in URL ends with slash and appends one if not
+
+        Args:
+            url (str): URL to check (or any other string)
+
+        Returns:
+            str: URL ending with "/"
+        """
+        if url.endswith("/"):
+            return url
+        else:
+            return f"{url}/"
+
+    def jwt_headers(self, jwt_token: str) -> dict:
+        """returns the headers for endpoints authenticated with a JWT"""
+        return {
+            "Authorization": f"JWT {jwt_token}",
+            "Content-Type": "application/json",
+        }
+
+    def token_headers(self) -> dict:
+        """returns the headers for endpoints authenticated with the database token"""
+        return {
+            "Authorization": f"Token {self.br_token}",
+            "Content-Type": "application/json",
+        }
+
+    def token_auth_url(self) -> str:
+        return f"{self.br_base_url}user/token-auth/"
+
+    def token_refresh_url(self) -> str:
+        return f"{self.br_base_url}user/token-refresh/"
+
+    def token_auth_payload(self) -> dict:
+        return {"password": self.br_pw, "username": self.br_user}
+
+    def tables_url(self, br_database_id: Union[int, str]) -> str:
+        return f"{self.br_base_url}database/tables/database/{br_database_id}/"
+
+    def table_url(self, br_table_id: Union[int, str]) -> str:
+        return f"{self.br_base_url}database/tables/{br_table_id}/"
+
+    def fields_url(self, br_table_id: Union[int, str]) -> str:
+        return f"{self.br_base_url}database/fields/table/{br_table_id}/"
+
+    def field_url(self, br_field_id: Union[int, str]) -> str:
+        return f"{self.br_base_url}database/fields/{br_field_id}/"
+
+    def rows_url(
+        self,
+        br_table_id: Union[int, str],
+        row_id: Union[int, str, None] = None,
+        batch: Union[bool, str] = False,
+    ) -> str:
+        """returns the URL of the rows of a table, of a single row or of the batch endpoint
+
+        Args:
+            br_table_id (Union[int, str]): The ID of the table
+            row_id (Union[int, str, None], optional): The ID of a row. Defaults to None.
+            batch (Union[bool, str], optional): return the batch endpoint, "delete" for the\
+            batch delete endpoint. Defaults to False.
+
+        Returns:
+            str: the URL, always with `user_field_names=true`
+        """
+        url = f"{self.br_base_url}database/rows/table/{br_table_id}/"
+        if row_id is not None:
+            url = f"{url}{row_id}/"
+        elif batch == "delete":
+            url = f"{url}batch-delete/"
+        elif batch:
+            url = f"{url}batch/"
+        return f"{url}?user_field_names=true"
+
+    def search_url(
+        self,
+        br_table_id,
+        q,
+        query_field_id,
+        lookup_type: str = "contains",
+        include: Iterable = None,
+        exclude: Iterable = None,
+    ) -> str:
+        url = f"{self.rows_url(br_table_id)}&filter__field_{query_field_id}__{lookup_type}={q}"  # noqa
+        return url + field_selection_query(include, exclude)
+
+    def page_url(
+        self,
+        br_table_id,
+        filters: dict = {},
+        size: int = None,
+        include: Iterable = None,
+        exclude: Iterable = None,
+    ) -> str:
+        """returns the URL of the first page of (filtered) rows of a table
+
+        Args:
+            br_table_id (Union[int, str]): The ID of the table
+            filters (dict, optional): query parameters added to the URL. Defaults to {}.
+            size (int, optional): rows per page, at most `MAX_PAGE_SIZE`. Defaults to None.
+            include (Iterable, optional): names of the only fields to return. Defaults to None.
+            exclude (Iterable, optional): names of fields to leave out. Defaults to None.
+
+        Returns:
+            str: the URL
+        """
+        if size is not None and not 0 < size <= MAX_PAGE_SIZE:
+            raise ValueError(f"size must be between 1 and {MAX_PAGE_SIZE}")
+        url = self.rows_url(br_table_id)
+        if filters:
+            for key, value in filters.items():
+                url += f"&{key}={value}"
+        if size:
+            url += f"&size={size}"
+        return url + field_selection_query(include, exclude)
+
+    def batch_payloads(self, payload: Iterable, batch_size: int = BATCH_SIZE):
+        """splits the given rows into request bodies for the batch endpoints
+
+        Args:
+            payload (Iterable): the rows (or row IDs), any iterable; it is consumed lazily
+            batch_size (int, optional): rows per request body. Defaults to `BATCH_SIZE`.
+
+        Yields:
+            dict: `{"items": [...]}` with at most `batch_size` rows
+        """
+        payload = iter(payload)
+        while True:
+            batch = list(islice(payload, batch_size))
+            if not batch:
+                return
+            yield {"items": batch}
+
+    def parse_batch_response(self, r) -> tuple:
+        """returns the rows and the error (one of them None) of a batch endpoint response"""
+        if r.status_code == 204:
+            return [], None
+        try:
+            resp = loads(r.content)
+        except Exception:
+            return None, {
+                "error": "Invalid JSON response",
+                "status_code": r.status_code,
+            }
+        try:
+            return resp["items"], None
+        except KeyError:
+            return None, resp["error"]
@@ -0,0 +1,151 @@
+import hashlib
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Iterable, Union
+
+
+def normalize_number(value) -> str:
+    """returns a number (or a number field value, which Baserow returns as a string like\
+    "3.50") as its shortest decimal string, e.g. "3.5"; other values are kept"""
+    try:
+        number = Decimal(f"{value}")
+    except InvalidOperation:
+        return value
+    if not number.is_finite():
+        return value
+    text = format(number.normalize(), "f")
+    return "0" if text == "-0" else text
+
+
+def normalize_date(value) -> str:
+    """returns a date (or a date field value) as ISO string, date-times in UTC (naive ones\
+    are taken as UTC, like Baserow does); other values are kept"""
+    if isinstance(value, str):
+        try:
+            if len(value) == 10:
+                value = date.fromisoformat(value)
+            else:
+                value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return value
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        value = value.astimezone(timezone.utc)
+    return value.isoformat()
+
+
+def normalize_value(value, field_type: Union[str, None] = None):
+    """returns a value as it is written to Baserow: link_row and select values\
+    (`{"id": ..., "value": ...}` as returned by Baserow) become their IDs, numbers and\
+    dates (and the strings of number and date fields) canonical strings"""
+    if isinstance(value, dict) and "id" in value:
+        return normalize_value(value["id"])
+    if isinstance(value, list):
+        return [normalize_value(x) for x in value]
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float, Decimal)):
+        return normalize_number(value)
+    if isinstance(value, (date, datetime)):
+        return normalize_date(value)
+    if field_type == "number":
+        return normalize_number(value)
+    if field_type == "date":
+        return normalize_date(value)
+    return value
+
+
+def content_hash(
+    row: dict, field_names: Iterable, field_types: Union[dict, None] = None
+) -> bytes:
+    """returns a hash of the (normalized) values of the given fields of a row
+
+    Args:
+        row (dict): the row
+        field_names (Iterable): the fields to hash
+        field_types (dict, optional): maps field names to their types, see\
+        `normalize_value`. Defaults to None.
+    """
+    field_types = field_types or {}
+    values = [
+        [x, normalize_value(row.get(x), field_types.get(x))]
+        for x in sorted(field_names)
+    ]
+    data = json.dumps(values, ensure_ascii=False, default=str)
+    return hashlib.sha1(data.encode("utf-8")).digest()
+
+
+def row_key(value, field_type: Union[str, None] = None) -> str:
+    """returns a hashable key for a (normalized) key field value"""
+    return json.dumps(
+        normalize_value(value, field_type), ensure_ascii=False, default=str
+    )
+
+
+class TableDiff:
+    """compares a desired dataset with the rows of a table, one current row at a time
+
+    The desired rows are held in memory with a content hash each; the current rows can be\
+    streamed (e.g. from `BaseRowClient.yield_rows`) and are not kept.
+
+    Args:
+        desired (Iterable[dict]): the rows the table should hold
+        key (str, optional): "id" to match rows by row ID or the name of a field holding\
+        a natural key. Defaults to "id".
+        field_types (dict, optional): maps field names to their types, so that e.g. the\
+        strings Baserow returns for number fields match numbers. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        desired: Iterable[dict],
+        key: str = "id",
+        field_types: Union[dict, None] = None,
+    ):
+        self.key = key
+        self.field_types = field_types or {}
+        self.desired = {}
+        for row in desired:
+            fields = [x for x in row if x != "id"]
+            row_hash = content_hash(row, fields, self.field_types)
+            self.desired[self.row_key(row)] = (row, fields, row_hash)
+        self.seen = set()
+        self.updates = []
+        self.deletes = []
+        self.unchanged = 0
+
+    def row_key(self, row: dict):
+        if self.key == "id":
+            return int(row["id"])
+        return row_key(row.get(self.key), self.field_types.get(self.key))
+
+    def field_names(self) -> set:
+        """returns the names of all fields of the desired rows"""
+        names = set()
+        for _, fields, _ in self.desired.values():
+            names.update(fields)
+        return names
+
+    def compare(self, current: dict):
+        """compares a current row of the table with its desired row"""
+        key = self.row_key(current)
+        match = self.desired.get(key)
+        if match is None or key in self.seen:
+            self.deletes.append(current["id"])
+            return
+        self.seen.add(key)
+        row, fields, desired_hash = match
+        if content_hash(current, fields, self.field_types) == desired_hash:
+            self.unchanged += 1
+        else:
+            self.updates.append({"id": current["id"], **{x: row[x] for x in fields}})
+
+    def creates(self) -> list:
+        """returns the desired rows without a current row, once all rows are compared"""
+        return [
+            {x: row[x] for x in fields}
+            for key, (row, fields, _) in self.desired.items()
+            if key not in self.seen
+        ]
@@ -0,0 +1,204 @@
+import csv
+import os
+import re
+from itertools import islice
+from typing import Iterable, Iterator, Union
+
+from acdh_baserow_pyutils.jsonlib import dumps, loads
+from acdh_baserow_pyutils.writers import COMPRESSIONS
+
+INPUT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+SAMPLE_SIZE = 1000
+# columns of dumped rows which are no fields (and reserved field names in Baserow)
+RESERVED_NAMES = ("id", "order")
+# text values longer than this (or holding line breaks) make a long_text field
+MAX_TEXT_LENGTH = 255
+# no leading zeros, so codes like "007" or postal codes stay text
+NUMBER = re.compile(r"^-?(?:0|[1-9]\d{0,14})(?:\.(\d{1,10}))?$")
+DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+DATETIME = re.compile(
+    r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?$"
+)
+URL = re.compile(r"^https?://\S+$")
+EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+BOOLEANS = {"true": True, "false": False}
+TRUE_VALUES = ("true", "1", "yes", "y", "ja", "x")
+
+
+def input_format_of(f_name: str) -> str:
+    """returns "csv" or "jsonl" for a file name like "persons.csv" or "persons.jsonl.gz"
+
+    Raises:
+        ValueError: for other suffixes
+    """
+    stem, suffix = os.path.splitext(f_name)
+    if any(suffix == x[0] for x in COMPRESSIONS.values()):
+        suffix = os.path.splitext(stem)[1]
+    if suffix.lower() not in INPUT_FORMATS:
+        raise ValueError(f"can't tell the input format of {f_name}, use csv or jsonl")
+    return INPUT_FORMATS[suffix.lower()]
+
+
+def open_input(f_name: str):
+    """opens a file for reading text, decompressing ".gz", ".bz2" and ".xz" files"""
+    for suffix, opener, _ in COMPRESSIONS.values():
+        if f_name.endswith(suffix):
+            return opener(f_name, "rt", encoding="utf-8-sig", newline="")
+    return open(f_name, encoding="utf-8-sig", newline="")
+
+
+def read_rows(f, input_format: str = "csv", delimiter: str = ",") -> Iterator[dict]:
+    """returns an iterator over the rows of an open CSV (with a header line) or JSONL file
+
+    Args:
+        f: a text file object
+        input_format (str, optional): "csv" or "jsonl". Defaults to "csv".
+        delimiter (str, optional): the CSV delimiter. Defaults to ",".
+
+    Returns:
+        Iterator[dict]: the rows read one by one, for CSV a `csv.DictReader` (with the\
+        column names as `fieldnames`) yielding the values as strings
+    """
+    if input_format == "csv":
+        return csv.DictReader(f, delimiter=delimiter)
+    if input_format == "jsonl":
+        return read_jsonl(f)
+    raise ValueError(
+        f"input_format must be one of {', '.join(sorted(set(INPUT_FORMATS.values())))}"
+    )
+
+
+def read_jsonl(f) -> Iterator[dict]:
+    """yields the JSON objects of an open JSONL file, skipping blank lines"""
+    for line_no, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        row = loads(line)
+        if not isinstance(row, dict):
+            raise ValueError(f"line {line_no} holds no JSON object")
+        yield row
+
+
+def value_kind(value) -> Union[tuple, None]:
+    """returns the kind of a value (e.g. "number", "date") and its decimal places, None\
+    for empty values"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        return "boolean", 0
+    if isinstance(value, int):
+        return "number", 0
+    if isinstance(value, float):
+        places = repr(value).partition(".")[2]
+        return "number", 0 if places == "0" or "e" in places else len(places)
+    if not isinstance(value, str):
+        return "long_text", 0
+    match = NUMBER.match(value)
+    if match:
+        return "number", len(match.group(1) or "")
+    if value.lower() in BOOLEANS:
+        return "boolean", 0
+    if DATE.match(value):
+        return "date", 0
+    if DATETIME.match(value):
+        return "datetime", 0
+    if URL.match(value):
+        return "url", 0
+    if EMAIL.match(value):
+        return "email", 0
+    if "\n" in value or len(value) > MAX_TEXT_LENGTH:
+        return "long_text", 0
+    return "text", 0
+
+
+def infer_field(name: str, values: Iterable) -> dict:
+    """returns the declaration of a field holding the given values
+
+    A field is a number, boolean, date, url or email field if all its non-empty values\
+    are of that kind (dates and date-times make a date field including the time), a\
+    long_text field if a value is long, has line breaks or is a JSON list or object, and a\
+    text field otherwise.
+    """
+    kinds = set()
+    places = 0
+    negative = False
+    for value in values:
+        kind = value_kind(value)
+        if kind is None:
+            continue
+        kinds.add(kind[0])
+        places = max(places, kind[1])
+        if kind[0] == "number":
+            negative = negative or f"{value}".startswith("-")
+    if kinds == {"number"}:
+        return {
+            "name": name,
+            "type": "number",
+            "number_decimal_places": min(places, 10),
+            "number_negative": negative,
+        }
+    if kinds and kinds <= {"date", "datetime"}:
+        return {
+            "name": name,
+            "type": "date",
+            "date_format": "ISO",
+            "date_include_time": "datetime" in kinds,
+        }
+    if len(kinds) == 1 and kinds <= {"boolean", "url", "email", "long_text"}:
+        return {"name": name, "type": kinds.pop()}
+    if "long_text" in kinds:
+        return {"name": name, "type": "long_text"}
+    return {"name": name, "type": "text"}
+
+
+def infer_fields(rows: Iterator[dict], sample_size: int = SAMPLE_SIZE) -> tuple:
+    """infers the fields from the first `sample_size` rows
+
+    Args:
+        rows (Iterator[dict]): the rows, e.g. from `read_rows`; the columns of a\
+        `csv.DictReader` get a field even if no sampled row has a value for them
+        sample_size (int, optional): the number of rows looked at. Defaults to 1000.
+
+    Returns:
+        tuple: the field declarations (in the order the names first appear, without\
+        `RESERVED_NAMES`) and the sampled rows, which are to be imported before the\
+        remaining ones
+    """
+    sample = list(islice(rows, sample_size))
+    names = dict.fromkeys(getattr(rows, "fieldnames", None) or [])
+    for row in sample:
+        names.update(dict.fromkeys(row))
+    fields = [
+        infer_field(name, (row.get(name) for row in sample))
+        for name in names
+        if name and name not in RESERVED_NAMES
+    ]
+    return fields, sample
+
+
+def convert_value(value, field_type: str):
+    """turns a value read from CSV or JSONL into one accepted by a field of the given type"""
+    if value is None or value == "":
+        return None
+    if field_type == "boolean":
+        if isinstance(value, str):
+            return value.strip().lower() in TRUE_VALUES
+        return bool(value)
+    if field_type == "number" and isinstance(value, str):
+        return value.strip()
+    if field_type in ("text", "long_text") and isinstance(value, (list, dict)):
+        return dumps(value)
+    if field_type in ("text", "long_text", "url", "email") and not isinstance(
+        value, str
+    ):
+        return f"{value}"
+    return value
+
+
+def convert_row(row: dict, field_types: dict) -> dict:
+    """returns the values of a row for the known fields, converted for their types"""
+    return {
+        name: convert_value(value, field_types[name])
+        for name, value in row.items()
+        if name in field_types
+    }
@@ -0,0 +1,84 @@
+import re
+import threading
+from urllib.parse import urlsplit
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    float("inf"),
+)
+ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_template(url: str, base_url: str = "") -> str:
+    """returns the endpoint of a URL with IDs replaced, e.g.\
+    `database/rows/table/{id}/batch/` for `.../api/database/rows/table/100948/batch/?user_field_names=true`
+    """
+    path = urlsplit(url).path
+    base_path = urlsplit(base_url).path
+    if base_path and path.startswith(base_path):
+        path = path[len(base_path) :]  # noqa
+    return ID_SEGMENT.sub("/{id}", f"/{path.lstrip('/')}").lstrip("/")
+
+
+class RequestMetrics:
+    """request counters and latency histograms per endpoint
+
+    Used as post request hook of `BaseRowClient` (see `br_client.metrics`); `snapshot()`\
+    returns per `"<METHOD> <endpoint>"` the number of requests and errors (status >= 400\
+    or no response), the received bytes, the total and max. seconds and a latency histogram\
+    with the upper bounds of `LATENCY_BUCKETS` as keys.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = {}
+
+    def __call__(self, info: dict):
+        key = f"{info['method']} {info['endpoint']}"
+        with self.lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = {
+                    "count": 0,
+                    "errors": 0,
+                    "bytes": 0,
+                    "seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "histogram": [0] * len(LATENCY_BUCKETS),
+                }
+                self.endpoints[key] = stats
+            stats["count"] += 1
+            if info["status"] is None or info["status"] >= 400:
+                stats["errors"] += 1
+            stats["bytes"] += info["bytes"]
+            stats["seconds"] += info["elapsed"]
+            stats["max_seconds"] = max(stats["max_seconds"], info["elapsed"])
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if info["elapsed"] <= bound:
+                    stats["histogram"][i] += 1
+                    break
+
+    def snapshot(self) -> dict:
+        """returns a copy of the collected metrics"""
+        with self.lock:
+            return {
+                key: {
+                    **stats,
+                    "histogram": dict(zip(LATENCY_BUCKETS, stats["histogram"])),
+                }
+                for key, stats in self.endpoints.items()
+            }
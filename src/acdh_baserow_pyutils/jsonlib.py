@@ -0,0 +1,150 @@
+import codecs
+import json
+import re
+from typing import Iterable, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+BACKEND = "json" if orjson is None else "orjson"
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+decoder = json.JSONDecoder()
+
+
+def loads(data: Union[bytes, str]):
+    """decodes JSON with orjson if it is installed (`pip install acdh-baserow-pyutils[fast]`),\
+    with the `json` module otherwise"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN, which only json accepts
+    return json.loads(data)
+
+
+def dumps(obj) -> str:
+    """encodes JSON without whitespace and with non-ASCII characters as they are, with orjson\
+    if it is installed; both backends return the same text"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            pass  # e.g. non-string keys, let json decide
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def dumpb(obj) -> bytes:
+    """like `dumps`, but returns UTF-8 encoded bytes, e.g. for request bodies"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            pass
+    return dumps(obj).encode("utf-8")
+
+
+class StreamingPage:
+    """decodes a page of rows (`{"count": ..., "next": ..., "results": [...]}`) from a\
+    stream of bytes, yielding each row as soon as it is complete
+
+    The other members are available by key (e.g. `page["next"]`) after iterating.
+
+    ```python
+    r = session.get(url, stream=True)
+    page = StreamingPage(r.iter_content(65536))
+    for row in page:
+        ...
+    next_url = page["next"]
+    ```
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = iter(chunks)
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.exhausted = False
+        self.members = {}
+        self.rows = self._rows()
+
+    def __getitem__(self, key: str):
+        return self.members[key]
+
+    def get(self, key: str, default=None):
+        return self.members.get(key, default)
+
+    def __iter__(self):
+        return self.rows
+
+    def _fill(self) -> bool:
+        if self.exhausted:
+            return False
+        if self.pos > 65536:
+            self.buf = self.buf[self.pos :]  # noqa
+            self.pos = 0
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.buf += self.text_decoder.decode(b"", final=True)
+            self.exhausted = True
+            return False
+        self.buf += self.text_decoder.decode(chunk)
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            self.pos = WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str):
+        if self._peek() != char:
+            raise ValueError(f"invalid page: expected {char!r} at {self.pos}")
+        self.pos += 1
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buf, self.pos)
+                # a number at the end of the buffer may continue in the next chunk
+                if end < len(self.buf) or self.exhausted:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.exhausted:
+                    raise
+            self._fill()
+
+    def _rows(self):
+        self._expect("{")
+        while True:
+            char = self._peek()
+            if char == "}":
+                self.pos += 1
+                return
+            if char == "":
+                raise ValueError("invalid page: unexpected end")
+            if char == ",":
+                self.pos += 1
+                continue
+            key = self._value()
+            self._expect(":")
+            if key != "results":
+                self.members[key] = self._value()
+                continue
+            self._expect("[")
+            while True:
+                char = self._peek()
+                if char == "]":
+                    self.pos += 1
+                    break
+                if char == ",":
+                    self.pos += 1
+                    continue
+                if char == "":
+                    raise ValueError("invalid page: unexpected end")
+                yield self._value()
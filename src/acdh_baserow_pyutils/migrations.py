@@ -0,0 +1,236 @@
+from typing import Union
+
+FIELD_TYPES = [
+    "text",
+    "long_text",
+    "url",
+    "email",
+    "phone_number",
+    "number",
+    "rating",
+    "boolean",
+    "date",
+    "duration",
+    "last_modified",
+    "last_modified_by",
+    "created_on",
+    "created_by",
+    "autonumber",
+    "uuid",
+    "file",
+    "single_select",
+    "multiple_select",
+    "link_row",
+    "formula",
+    "count",
+    "rollup",
+    "lookup",
+]
+# fields of these types need a link_row field of the same table (`through_field_...`)
+THROUGH_TYPES = ("count", "rollup", "lookup")
+# keys of a field declaration which only matter when the field is created
+CREATE_ONLY_KEYS = ("name", "link_row_table", "has_related_field")
+# the order operations are applied in; the operations of one phase are independent
+PHASES = (
+    "create_table",
+    "delete_field",
+    "create_field",
+    "update_field",
+    "create_link_row",
+    "update_link_row",
+    "create_through_field",
+    "update_through_field",
+)
+
+
+def validate_field(field: dict, table_names: bool = False):
+    """checks a field declaration for `BaseRowClient.create_table_fields` or\
+    `BaseRowClient.migrate_schema`
+
+    Args:
+        field (dict): the field declaration
+        table_names (bool, optional): allow link_row fields naming the linked table with\
+        `link_row_table`, which only `SchemaMigration` resolves. Defaults to False.
+
+    Raises:
+        KeyError: for missing keys and unknown field types
+        ValueError: for values of the wrong type
+    """
+    for key in ("name", "type"):
+        if key not in field:
+            raise KeyError(f"missing required key: {key}")
+    field_type = field["type"]
+    if field_type not in FIELD_TYPES:
+        raise KeyError(f"invalid field type: {field_type}")
+    if field_type == "formula":
+        if "formula" not in field:
+            raise KeyError("formula field missing 'formula' key")
+        if not isinstance(field["formula"], str):
+            raise ValueError("formula field must be a string")
+    if field_type == "link_row":
+        if "link_row_table_id" in field:
+            if not isinstance(field["link_row_table_id"], int):
+                raise ValueError("link_row_table_id field must be a integer")
+        elif table_names and "link_row_table" in field:
+            if not isinstance(field["link_row_table"], str):
+                raise ValueError("link_row_table must be the name of a table")
+        else:
+            raise KeyError("link_row field missing 'link_row_table_id' key")
+    if field_type in ("single_select", "multiple_select"):
+        options = field.get("select_options", [])
+        if not isinstance(options, list) or not all(
+            isinstance(x, dict) and "value" in x for x in options
+        ):
+            raise ValueError("select_options must be a list of dicts with a 'value'")
+    if field_type == "number":
+        places = field.get("number_decimal_places", 0)
+        if not isinstance(places, int) or not 0 <= places <= 10:
+            raise ValueError("number_decimal_places must be an integer from 0 to 10")
+    if field_type == "rating":
+        max_value = field.get("max_value", 5)
+        if not isinstance(max_value, int) or not 1 <= max_value <= 10:
+            raise ValueError("max_value must be an integer from 1 to 10")
+    if field_type in THROUGH_TYPES:
+        if "through_field_id" not in field and "through_field_name" not in field:
+            raise KeyError(f"{field_type} field missing 'through_field_name' key")
+
+
+def field_changes(declared: dict, current: dict) -> dict:
+    """returns the keys of a field declaration whose values differ from the existing\
+    field; select options are compared by the keys given in the declaration"""
+    changes = {}
+    for key, value in declared.items():
+        if key in CREATE_ONLY_KEYS:
+            continue
+        existing = current.get(key)
+        if key == "select_options" and isinstance(existing, list):
+            if len(existing) == len(value):
+                existing = [
+                    {k: option.get(k) for k in wanted}
+                    for option, wanted in zip(existing, value)
+                ]
+        if existing != value:
+            changes[key] = value
+    if changes:
+        changes["type"] = declared["type"]
+    return changes
+
+
+def field_phase(field: dict) -> str:
+    if field["type"] == "link_row":
+        return "link_row"
+    if field["type"] in THROUGH_TYPES:
+        return "through_field"
+    return "field"
+
+
+class SchemaMigration:
+    """the operations turning the tables of a database into the declared ones
+
+    Tables missing in the database are created (with the first declared field as\
+    primary field), missing fields are created and fields whose declared keys differ are\
+    updated. With `delete` fields which are not declared are deleted, except primary\
+    fields and the related fields Baserow adds for declared link_row fields. Tables which\
+    are not declared are left alone.
+
+    Args:
+        tables (dict): maps table names to lists of field declarations (as for\
+        `BaseRowClient.create_table_fields`); link_row fields can name the linked table\
+        with `link_row_table` instead of `link_row_table_id`
+        current (dict): the table/field dict, see `BaseRowClient.fetch_table_field_dict`
+        delete (bool, optional): delete fields which are not declared. Defaults to False.
+    """
+
+    def __init__(self, tables: dict, current: dict, delete: bool = False):
+        for table_name, fields in tables.items():
+            if not fields:
+                raise ValueError(f"table {table_name!r} declares no fields")
+            for field in fields:
+                validate_field(field, table_names=True)
+                target = field.get("link_row_table")
+                known = target is None or target in tables or target in current
+                if not known:
+                    raise ValueError(
+                        f"{table_name}.{field['name']} links to unknown {target!r}"
+                    )
+        self.tables = tables
+        self.current = current
+        self.delete = delete
+
+    def new_tables(self) -> list:
+        return [x for x in self.tables if x not in self.current]
+
+    def link_row_table_id(self, field: dict, table_ids: dict) -> Union[int, None]:
+        if "link_row_table_id" in field:
+            return field["link_row_table_id"]
+        return table_ids.get(field["link_row_table"])
+
+    def related_field_ids(self) -> set:
+        """returns the IDs of the existing related fields of declared link_row fields"""
+        declared = set()
+        for table_name, fields in self.tables.items():
+            current_fields = self.current.get(table_name, {}).get("fields", {})
+            for field in fields:
+                if field["name"] in current_fields:
+                    declared.add(current_fields[field["name"]]["id"])
+        return {
+            x.get("link_row_related_field_id")
+            for table in self.current.values()
+            for x in table["fields"].values()
+            if x["id"] in declared
+        }
+
+    def operations(self, table_ids: dict) -> list:
+        """returns the field operations, each a dict with "action" (see `PHASES`),\
+        "table", "table_id", "field", "field_id" and (but for deletes) "payload"
+
+        Args:
+            table_ids (dict): maps the names of the declared tables to their IDs (None\
+            for tables not created yet)
+        """
+        operations = []
+        related_ids = self.related_field_ids() if self.delete else set()
+        for table_name, fields in self.tables.items():
+            current_fields = self.current.get(table_name, {}).get("fields", {})
+            for field in fields:
+                payload = {k: v for k, v in field.items() if k != "link_row_table"}
+                if field["type"] == "link_row":
+                    payload["link_row_table_id"] = self.link_row_table_id(
+                        field, table_ids
+                    )
+                phase = field_phase(field)
+                existing = current_fields.get(field["name"])
+                if existing is None:
+                    action, field_id = f"create_{phase}", None
+                else:
+                    payload = field_changes(payload, existing)
+                    action, field_id = f"update_{phase}", existing["id"]
+                if payload:
+                    operations.append(
+                        {
+                            "action": action,
+                            "table": table_name,
+                            "table_id": table_ids.get(table_name),
+                            "field": field["name"],
+                            "field_id": field_id,
+                            "payload": payload,
+                        }
+                    )
+            if not self.delete:
+                continue
+            declared_names = {x["name"] for x in fields}
+            for name, existing in current_fields.items():
+                if name in declared_names or existing.get("primary"):
+                    continue
+                if existing["id"] in related_ids:
+                    continue
+                operations.append(
+                    {
+                        "action": "delete_field",
+                        "table": table_name,
+                        "table_id": table_ids.get(table_name),
+                        "field": name,
+                        "field_id": existing["id"],
+                    }
+                )
+        return operations
@@ -0,0 +1,94 @@
+from typing import Iterable
+
+from acdh_baserow_pyutils.schema import SchemaRegistry
+
+
+def link_row_fields(registry: SchemaRegistry, table: dict) -> list:
+    """returns `(field name, linked table)` of the link_row fields of a table whose\
+    linked table is part of the registry"""
+    links = []
+    for field in table.get("fields", {}).values():
+        target = registry.link_row_targets.get(int(field["id"]))
+        if target is not None:
+            links.append((field["name"], target))
+    return links
+
+
+def linked_tables(registry: SchemaRegistry, table_name: str, depth: int = 1) -> list:
+    """returns the tables reachable from a table by following at most `depth` link_row fields
+
+    Args:
+        registry (SchemaRegistry): the table/field info, e.g. `br_client.br_table_dict`
+        table_name (str): the name of the table to start from, e.g. "person"
+        depth (int, optional): how many link_row fields to follow. Defaults to 1.
+
+    Returns:
+        list: the linked tables, each one once (it may include the table itself)
+    """
+    found = {}
+    current = [registry[table_name]]
+    for _ in range(depth):
+        following = []
+        for table in current:
+            for _, target in link_row_fields(registry, table):
+                if int(target["id"]) not in found:
+                    found[int(target["id"])] = target
+                    following.append(target)
+        current = following
+    return list(found.values())
+
+
+class RelationExpander:
+    """replaces the `[{"id": ..., "value": ...}]` references of link_row fields by the\
+    linked rows
+
+    Args:
+        registry (SchemaRegistry): the table/field info
+        indexes (dict): maps the IDs of (at least) the tables returned by `linked_tables`\
+        to their rows keyed by row ID (dicts or `RowTable`s)
+        depth (int, optional): how many levels of links to expand; references below\
+        are kept as returned by Baserow. Defaults to 1.
+    """
+
+    def __init__(self, registry: SchemaRegistry, indexes: dict, depth: int = 1):
+        self.registry = registry
+        self.indexes = indexes
+        self.depth = depth
+        self.links = {}
+        # expanded linked rows are built once and shared by all rows referencing them
+        self.expanded = {}
+
+    def _links(self, table: dict) -> list:
+        table_id = int(table["id"])
+        if table_id not in self.links:
+            self.links[table_id] = link_row_fields(self.registry, table)
+        return self.links[table_id]
+
+    def expand(self, table: dict, row: dict, depth: int = None) -> dict:
+        """returns a copy of the row with its link_row fields expanded"""
+        if depth is None:
+            depth = self.depth
+        links = self._links(table)
+        if depth < 1 or not links:
+            return row
+        row = dict(row)
+        for field_name, target in links:
+            refs = row.get(field_name)
+            if refs:
+                row[field_name] = [self._linked_row(target, x, depth - 1) for x in refs]
+        return row
+
+    def _linked_row(self, table: dict, ref: dict, depth: int) -> dict:
+        key = (int(table["id"]), ref["id"], depth)
+        if key not in self.expanded:
+            linked = self.indexes.get(int(table["id"]), {}).get(ref["id"])
+            if linked is None:
+                # deleted meanwhile or not readable, keep the reference
+                return ref
+            self.expanded[key] = self.expand(table, dict(linked), depth)
+        return self.expanded[key]
+
+    def expand_rows(self, table: dict, rows: Iterable[dict]):
+        """yields the given rows of the table expanded"""
+        for row in rows:
+            yield self.expand(table, row)
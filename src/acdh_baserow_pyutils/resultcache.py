@@ -0,0 +1,152 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Union
+
+TABLE_URL = re.compile(r"database/(?:rows/table|fields/table|tables)/(\d+)/")
+
+
+def table_of_url(url: str) -> Union[str, None]:
+    """returns the ID of the table a rows, fields or table URL refers to, else None"""
+    match = TABLE_URL.search(url)
+    return match.group(1) if match else None
+
+
+class ResultCache:
+    """a size-bounded LRU cache with expiry for lookups like `BaseRowClient.search_rows`
+
+    Entries belong to a table and are dropped by `invalidate`, which the client calls\
+    after each of its write requests to the table. Concurrent lookups of the same key\
+    are coalesced: the first one sends the request, the others wait for its result.\
+    `key_lock` makes a lookup and a write depending on it atomic per key.
+
+    Args:
+        max_size (int, optional): max. number of entries, the least recently used ones\
+        are evicted. Defaults to 10000.
+        ttl (float, optional): seconds an entry is used. Defaults to 300.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.in_flight = {}
+        self.key_locks = {}
+        self.generation = 0
+        self.table_generations = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _generation(self, table_id: str) -> tuple:
+        return self.generation, self.table_generations.get(table_id, 0)
+
+    def get_or_load(self, table_id, key: tuple, load: Callable[[], tuple]):
+        """returns the cached value of `key` or the value returned by `load`
+
+        Args:
+            table_id (Union[int, str]): the table the value is read from
+            key (tuple): the lookup, e.g. field, lookup type and query
+            load (Callable): returns the value and a bool telling if it may be cached,\
+            e.g. False for error responses
+
+        Returns:
+            the value
+        """
+        table_id = f"{table_id}"
+        key = (table_id, *key)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            future = self.in_flight.get(key)
+            leader = future is None
+            if leader:
+                self.misses += 1
+                future = self.in_flight[key] = Future()
+                generation = self._generation(table_id)
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            value, cacheable = load()
+        except BaseException as e:
+            with self.lock:
+                del self.in_flight[key]
+            future.set_exception(e)
+            raise
+        with self.lock:
+            del self.in_flight[key]
+            # a write to the table meanwhile may have changed the result
+            if cacheable and self._generation(table_id) == generation:
+                self._store(key, value)
+        future.set_result(value)
+        return value
+
+    def put(self, table_id, key: tuple, value):
+        """stores a value, e.g. a lookup result known from a write"""
+        with self.lock:
+            self._store((f"{table_id}", *key), value)
+
+    def _store(self, key: tuple, value):
+        self.entries[key] = (time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    @contextmanager
+    def key_lock(self, table_id, key: tuple):
+        """serializes a lookup and the write depending on its result (like the create of\
+        `BaseRowClient.get_or_create`) per key among the threads using the cache"""
+        key = (f"{table_id}", *key)
+        with self.lock:
+            entry = self.key_locks.get(key)
+            if entry is None:
+                entry = self.key_locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self.lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self.key_locks[key]
+
+    def invalidate(self, table_id=None):
+        """drops the entries of a table (or all entries)"""
+        with self.lock:
+            self.invalidations += 1
+            if table_id is None:
+                self.generation += 1
+                self.entries.clear()
+                return
+            table_id = f"{table_id}"
+            self.table_generations[table_id] = (
+                self.table_generations.get(table_id, 0) + 1
+            )
+            for key in [x for x in self.entries if x[0] == table_id]:
+                del self.entries[key]
+
+    def stats(self) -> dict:
+        """returns the numbers of hits, misses, coalesced lookups, evictions and\
+        invalidations and the current size"""
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self.entries),
+            }
@@ -0,0 +1,195 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Union
+
+from acdh_baserow_pyutils.common import MAX_PAGE_SIZE
+from acdh_baserow_pyutils.jsonlib import dumps, loads
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rows (
+    table_id TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (table_id, row_id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    table_id TEXT PRIMARY KEY,
+    modified_field TEXT,
+    high_water_mark TEXT,
+    synced_at REAL
+);
+"""
+
+
+class RowStore:
+    """a local SQLite copy of Baserow tables, kept up to date incrementally
+
+    The first `sync` of a table reads all rows with `yield_rows`. Later syncs only fetch\
+    rows whose last modified field (a Baserow field of type "last_modified") is not older\
+    than the newest value seen so far. Rows deleted in Baserow are only noticed by a\
+    `sync(..., full=True)`.
+
+    ```python
+    store = RowStore(br_client, "rows.sqlite")
+    store.sync(TABLE_ID, modified_field="Last modified")
+    store.search_rows(TABLE_ID, "Name", "Hansi")
+    ```
+    """
+
+    def __init__(self, br_client, path: str = "baserow_rows.sqlite"):
+        self.br_client = br_client
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _field_expression(self, field_name: str) -> str:
+        path = '$."' + field_name.replace('"', '\\"') + '"'
+        return "json_extract(data, '{}')".format(path.replace("'", "''"))
+
+    def _ensure_index(self, field_name: str) -> str:
+        expression = self._field_expression(field_name)
+        name = hashlib.sha1(field_name.encode("utf-8")).hexdigest()[:16]
+        self.conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{name} ON rows (table_id, {expression})"
+        )
+        return expression
+
+    def sync_state(self, br_table_id: Union[int, str]) -> Union[dict, None]:
+        """returns `modified_field`, `high_water_mark` and `synced_at` of the last sync"""
+        cur = self.conn.execute(
+            "SELECT modified_field, high_water_mark, synced_at FROM sync_state WHERE table_id = ?",
+            (str(br_table_id),),
+        )
+        row = cur.fetchone()
+        if row is None:
+            return None
+        return dict(zip(("modified_field", "high_water_mark", "synced_at"), row))
+
+    def sync(
+        self,
+        br_table_id: Union[int, str],
+        modified_field: str = None,
+        full: bool = False,
+        filter_type: str = "date_after_or_equal",
+    ) -> dict:
+        """copies the rows of a table into the store
+
+        Args:
+            br_table_id (Union[int, str]): The ID of the table
+            modified_field (str, optional): name of the table's "last_modified" field; without\
+            it every sync reads the whole table. Defaults to None.
+            full (bool, optional): replace all stored rows of the table, also drops rows\
+            deleted in Baserow. Defaults to False.
+            filter_type (str, optional): Baserow filter used to select rows modified since\
+            the last sync; `date_after_or_equal` compares by day, so rows of the day of the\
+            last sync are fetched again. Defaults to "date_after_or_equal".
+
+        Returns:
+            dict: `{"fetched": <number of fetched rows>, "full": <bool>, "high_water_mark": ...}`
+        """
+        table_id = str(br_table_id)
+        state = self.sync_state(table_id)
+        full = full or modified_field is None or state is None
+        filters = {}
+        high_water_mark = None if full else state["high_water_mark"]
+        if high_water_mark:
+            filters[f"filter__{modified_field}__{filter_type}"] = high_water_mark
+        fetched = 0
+        batch = []
+        # one transaction: a failed sync leaves the stored rows and the sync state as they were
+        with self.lock, self.conn:
+            if full:
+                self.conn.execute("DELETE FROM rows WHERE table_id = ?", (table_id,))
+            for row in self.br_client.yield_rows(
+                table_id, filters=filters, size=MAX_PAGE_SIZE
+            ):
+                if modified_field is not None and row.get(modified_field):
+                    high_water_mark = max(high_water_mark or "", row[modified_field])
+                batch.append((table_id, row["id"], dumps(row)))
+                if len(batch) >= MAX_PAGE_SIZE:
+                    fetched += self._upsert(batch)
+            fetched += self._upsert(batch)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)",
+                (table_id, modified_field, high_water_mark, time.time()),
+            )
+        return {"fetched": fetched, "full": full, "high_water_mark": high_water_mark}
+
+    def _upsert(self, batch: list) -> int:
+        count = len(batch)
+        self.conn.executemany("INSERT OR REPLACE INTO rows VALUES (?, ?, ?)", batch)
+        batch.clear()
+        return count
+
+    def store_rows(self, br_table_id: Union[int, str], rows: list):
+        """adds or replaces rows, e.g. rows returned by create or update requests"""
+        with self.lock, self.conn:
+            self._upsert([(str(br_table_id), x["id"], dumps(x)) for x in rows])
+
+    def get(self, br_table_id: Union[int, str], row_id: Union[int, str]) -> dict:
+        """returns the stored row or None"""
+        with self.lock:
+            cur = self.conn.execute(
+                "SELECT data FROM rows WHERE table_id = ? AND row_id = ?",
+                (str(br_table_id), int(row_id)),
+            )
+            row = cur.fetchone()
+        return loads(row[0]) if row else None
+
+    def yield_rows(self, br_table_id: Union[int, str]):
+        """yields the stored rows of a table ordered by ID"""
+        cur = self.conn.execute(
+            "SELECT data FROM rows WHERE table_id = ? ORDER BY row_id",
+            (str(br_table_id),),
+        )
+        for (data,) in cur:
+            yield loads(data)
+
+    def search_rows(self, br_table_id: Union[int, str], field_name: str, q) -> dict:
+        """exact lookup of rows by a field value, like `BaseRowClient.search_rows` with\
+        `lookup_type="equal"` but answered from the store
+
+        Returns:
+            dict: `{"count": ..., "results": [...]}`
+        """
+        with self.lock:
+            expression = self._ensure_index(field_name)
+            cur = self.conn.execute(
+                f"SELECT data FROM rows WHERE table_id = ? AND {expression} = ? ORDER BY row_id",
+                (str(br_table_id), q),
+            )
+            results = [loads(data) for (data,) in cur]
+        return {"count": len(results), "results": results}
+
+    def get_or_create(self, table_name, field_name, lookup_dict, q) -> tuple:
+        """like `BaseRowClient.get_or_create`, but checks the store instead of Baserow;\
+        created rows are added to the store
+
+        Returns:
+            tuple: the found or created row and a bool telling if it was created
+        """
+        if lookup_dict is None:
+            lookup_dict = self.br_client.br_table_dict
+        br_table_id = lookup_dict[table_name]["id"]
+        match = self.search_rows(br_table_id, field_name, q)
+        if match["count"] == 1:
+            return match["results"][0], False
+        result = self.br_client.batch_create_rows(br_table_id, [{field_name: q}])
+        if result["errors"]:
+            return {"error": result["errors"][0]}, False
+        row = result["created_rows"][0]
+        self.store_rows(br_table_id, [row])
+        return row, True
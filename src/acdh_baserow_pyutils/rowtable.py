@@ -0,0 +1,111 @@
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Iterable, Union
+
+
+class RowView(Mapping):
+    """a read-only, dict-like view of one row of a `RowTable`; `dict(view)` (or\
+    `view.to_dict()`) materializes the row"""
+
+    __slots__ = ("table", "pos")
+
+    def __init__(self, table: "RowTable", pos: int):
+        self.table = table
+        self.pos = pos
+
+    def __getitem__(self, field_name: str):
+        return self.table.columns[field_name][self.pos]
+
+    def __iter__(self):
+        return iter(self.table.columns)
+
+    def __len__(self) -> int:
+        return len(self.table.columns)
+
+    def __repr__(self) -> str:
+        return f"RowView({self.to_dict()!r})"
+
+    def to_dict(self) -> dict:
+        return {name: column[self.pos] for name, column in self.table.columns.items()}
+
+
+class RowTable:
+    """rows of a table kept column by column instead of as one dict per row
+
+    Every field name is stored once (interned) and every row is a position in the\
+    columns; the row IDs are kept in an `array` with a dict mapping them to positions.\
+    Rows are accessed by ID as `RowView`s which read the columns only when asked.
+
+    ```python
+    places = br_client.load_row_table(PLACE_TABLE_ID)
+    places[12]["Name"]
+    places.column("Name")
+    dict(places[12])
+    ```
+
+    Args:
+        field_names (Iterable[str]): the fields of the table, e.g. from `list_fields`;\
+        "id" and "order" are added and fields found in added rows are appended.
+    """
+
+    def __init__(self, field_names: Iterable[str] = ()):
+        self.ids = array("q")
+        self.positions = {}
+        self.columns = {}
+        for name in ["id", "order", *field_names]:
+            self._add_column(name)
+
+    def _add_column(self, name: str):
+        if name not in self.columns:
+            self.columns[sys.intern(name)] = [None] * len(self.ids)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict], field_names: Iterable[str] = ()):
+        """returns a table holding the given rows, e.g. from `BaseRowClient.yield_rows`"""
+        table = cls(field_names)
+        table.extend(rows)
+        return table
+
+    def append(self, row: dict):
+        """adds a row (replacing the stored row with the same ID)"""
+        row_id = row["id"]
+        pos = self.positions.get(row_id)
+        if pos is None:
+            pos = len(self.ids)
+            self.ids.append(row_id)
+            self.positions[row_id] = pos
+            for column in self.columns.values():
+                column.append(None)
+        for name, value in row.items():
+            if name not in self.columns:
+                self._add_column(name)
+            self.columns[name][pos] = value
+
+    def extend(self, rows: Iterable[dict]):
+        for row in rows:
+            self.append(row)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, row_id) -> bool:
+        return row_id in self.positions
+
+    def __getitem__(self, row_id: int) -> RowView:
+        return RowView(self, self.positions[row_id])
+
+    def get(self, row_id: int, default=None) -> Union[RowView, None]:
+        pos = self.positions.get(row_id)
+        return default if pos is None else RowView(self, pos)
+
+    def __iter__(self):
+        """yields the rows (as `RowView`s) in the order they were added"""
+        return (RowView(self, pos) for pos in range(len(self.ids)))
+
+    def field_names(self) -> list:
+        return list(self.columns)
+
+    def column(self, field_name: str) -> list:
+        """returns the values of a field, in the order of the rows"""
+        return self.columns[field_name]
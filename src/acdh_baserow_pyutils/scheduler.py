@@ -0,0 +1,145 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Union
+
+from acdh_baserow_pyutils.session import RETRY_STATUS_CODES
+
+
+class RequestScheduler:
+    """client-wide admission control for requests: a token bucket, a global pause and an\
+    adaptive concurrency limit
+
+    Every request of a `BaseRowClient` waits for a free slot (at most `limit` requests\
+    are in flight) and, with a `rate_limit`, for a token of the bucket. When the server\
+    throttles (429, 502, 503, 504) all requests are paused for the `Retry-After` time\
+    (or the backoff), the concurrency limit is halved and the rate lowered. Fast\
+    successful responses raise the limit by one after `limit` requests in a row, up to\
+    `max_concurrency`, and restore the rate; responses slower than `target_latency`\
+    lower the limit by one.
+
+    Args:
+        max_concurrency (int, optional): upper bound (and start value) of the concurrency\
+        limit, e.g. the client's `pool_size`. Defaults to 10.
+        min_concurrency (int, optional): lower bound of the concurrency limit. Defaults to 1.
+        rate_limit (float, optional): max. requests per second. Defaults to None (no limit).
+        burst (int, optional): size of the token bucket. Defaults to None (`rate_limit`).
+        target_latency (float, optional): seconds; slower responses lower the concurrency\
+        limit. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 10,
+        min_concurrency: int = 1,
+        rate_limit: Union[float, None] = None,
+        burst: Union[int, None] = None,
+        target_latency: Union[float, None] = None,
+    ):
+        self.cond = threading.Condition()
+        self.max_concurrency = max(max_concurrency, 1)
+        self.min_concurrency = max(min(min_concurrency, self.max_concurrency), 1)
+        self.limit = self.max_concurrency
+        self.in_flight = 0
+        self.rate_limit = rate_limit
+        self.rate = rate_limit
+        self.burst = max(burst or rate_limit or 1, 1)
+        self.tokens = self.burst
+        self.refilled = time.monotonic()
+        self.target_latency = target_latency
+        self.pause_until = 0.0
+        self.successes = 0
+        self.throttled = 0
+
+    def _refill(self, now: float):
+        if self.rate:
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.refilled) * self.rate
+            )
+        self.refilled = now
+
+    def acquire(self):
+        """blocks until a request may be sent"""
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.pause_until - now
+                if wait <= 0 and self.rate and self.tokens < 1:
+                    wait = (1 - self.tokens) / self.rate
+                if self.in_flight >= self.limit:
+                    self.cond.wait()
+                elif wait > 0:
+                    self.cond.wait(wait)
+                else:
+                    if self.rate:
+                        self.tokens -= 1
+                    self.in_flight += 1
+                    return
+
+    def release(self):
+        with self.cond:
+            self.in_flight -= 1
+            self.cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """holds a slot while the request is sent, see `acquire`"""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def throttle(self, delay: float = 0):
+        """pauses all requests for `delay` seconds and lowers concurrency and rate"""
+        with self.cond:
+            self.throttled += 1
+            self.successes = 0
+            self.pause_until = max(self.pause_until, time.monotonic() + delay)
+            self.limit = max(self.min_concurrency, self.limit // 2)
+            if self.rate:
+                self.rate = max(self.rate / 2, self.rate_limit / 10)
+            self.cond.notify_all()
+
+    def wait(self):
+        """blocks until a pause set by `throttle` is over"""
+        with self.cond:
+            while True:
+                wait = self.pause_until - time.monotonic()
+                if wait <= 0:
+                    return
+                self.cond.wait(wait)
+
+    def record(self, status: Union[int, None], elapsed: float):
+        """adapts the concurrency limit (and rate) to a response's status and latency,\
+        a status of None (no response, e.g. a timeout) lowers the limit like a slow one"""
+        if status in RETRY_STATUS_CODES:
+            # the retries are used up; no pause, the next request is someone else's
+            self.throttle()
+            return
+        with self.cond:
+            slow = self.target_latency is not None and elapsed > self.target_latency
+            if status is None or slow:
+                self.successes = 0
+                self.limit = max(self.min_concurrency, self.limit - 1)
+                return
+            self.successes += 1
+            if self.successes < self.limit:
+                return
+            self.successes = 0
+            self.limit = min(self.max_concurrency, self.limit + 1)
+            if self.rate:
+                self.rate = min(self.rate_limit, self.rate + self.rate_limit / 10)
+            self.cond.notify_all()
+
+    def stats(self) -> dict:
+        """returns the current concurrency limit, requests in flight, rate and the number\
+        of throttled responses"""
+        with self.cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "rate": self.rate,
+                "throttled": self.throttled,
+            }
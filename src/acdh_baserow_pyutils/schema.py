@@ -0,0 +1,107 @@
+import json
+import os
+import time
+from typing import Union
+
+
+def tables_signature(br_tables: list) -> list:
+    """returns the ID, name and order of each table as returned by `BaseRowClient.list_tables`"""
+    return [[x["id"], x["name"], x["order"]] for x in br_tables]
+
+
+def load_schema_cache(
+    path: str, br_db_id: Union[int, str], br_tables: list, ttl: float
+) -> Union[dict, None]:
+    """loads a table/field dict written by `save_schema_cache`
+
+    Args:
+        path (str): the cache file
+        br_db_id (Union[int, str]): The ID of the database
+        br_tables (list): the current tables of the database, as returned by `list_tables`
+        ttl (float): max. age of the cache in seconds
+
+    Returns:
+        Union[dict, None]: the cached table/field dict or None if the file is missing, older\
+        than `ttl`, written for another database or the tables have changed since
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cache.get("br_db_id") != str(br_db_id):
+        return None
+    if time.time() - cache.get("created", 0) > ttl:
+        return None
+    if cache.get("tables") != tables_signature(br_tables):
+        return None
+    return cache["table_dict"]
+
+
+def save_schema_cache(
+    path: str, br_db_id: Union[int, str], br_tables: list, table_dict: dict
+):
+    """writes a table/field dict together with the table signature it was built from"""
+    cache = {
+        "br_db_id": str(br_db_id),
+        "created": time.time(),
+        "tables": tables_signature(br_tables),
+        "table_dict": table_dict,
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class SchemaRegistry(dict):
+    """a table/field dict (as returned by `BaseRowClient.fetch_table_field_dict`) with indexes
+
+    It is a plain `dict` mapping table names to tables, so it can be used wherever such a\
+    dict is expected, but also looks up tables and fields by ID and link_row targets\
+    without scanning all tables. Call `reindex` after changing it.
+    """
+
+    def __init__(self, table_field_dict: Union[dict, None] = None):
+        super().__init__(table_field_dict or {})
+        self.reindex()
+
+    def reindex(self):
+        """(re)builds the indexes from the current content"""
+        self.tables_by_id = {}
+        self.fields_by_id = {}
+        self.link_row_targets = {}
+        for table in self.values():
+            self.tables_by_id[int(table["id"])] = table
+        for table in self.values():
+            for field in table.get("fields", {}).values():
+                self.fields_by_id[int(field["id"])] = field
+                if field.get("link_row_table_id") is not None:
+                    self.link_row_targets[int(field["id"])] = self.tables_by_id.get(
+                        int(field["link_row_table_id"])
+                    )
+
+    def table_by_name(self, table_name: str) -> Union[dict, None]:
+        return self.get(table_name)
+
+    def table_by_id(self, table_id: Union[int, str]) -> Union[dict, None]:
+        return self.tables_by_id.get(int(table_id))
+
+    def field_by_name(self, table_name: str, field_name: str) -> Union[dict, None]:
+        return self.get(table_name, {}).get("fields", {}).get(field_name)
+
+    def field_by_id(self, field_id: Union[int, str]) -> Union[dict, None]:
+        return self.fields_by_id.get(int(field_id))
+
+    def link_row_target(self, table_name: str, field_name: str) -> Union[dict, None]:
+        """returns the table a link_row field points to
+
+        Args:
+            table_name (str): the name of the table, e.g. "person"
+            field_name (str): the name of the link_row field, e.g. "born_in"
+
+        Returns:
+            Union[dict, None]: the linked table or None if it is not part of the registry
+        """
+        field = self[table_name]["fields"][field_name]
+        return self.link_row_targets.get(int(field["id"]))
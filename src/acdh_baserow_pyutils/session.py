@@ -0,0 +1,89 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+# answers telling that the request was not processed, so any method may be resent
+NOT_PROCESSED_STATUS_CODES = (429,)
+IDEMPOTENT_METHODS = Retry.DEFAULT_ALLOWED_METHODS
+
+
+def retryable(method: str, status_code: int) -> bool:
+    """tells if a request answered with `status_code` may be resent; POST and PATCH\
+    requests only if the answer tells that they were not processed"""
+    if status_code not in RETRY_STATUS_CODES:
+        return False
+    if status_code in NOT_PROCESSED_STATUS_CODES:
+        return True
+    return method.upper() in IDEMPOTENT_METHODS
+
+
+class ScheduledRetry(Retry):
+    """`Retry` reporting each retry to a `scheduler.RequestScheduler`, so that a `Retry-After` (or\
+    the backoff) pauses all requests of the client instead of just the retried one"""
+
+    scheduler = None
+
+    def is_retry(self, method, status_code, has_retry_after=False) -> bool:
+        """retries non-idempotent methods (POST, PATCH) only on `NOT_PROCESSED_STATUS_CODES`;\
+        like connect errors (which urllib3 retries for every method) these guarantee that\
+        the request did not create or change rows"""
+        if status_code in NOT_PROCESSED_STATUS_CODES and self.status_forcelist:
+            return status_code in self.status_forcelist
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.scheduler = self.scheduler
+        return retry
+
+    def sleep(self, response=None):
+        if self.scheduler is None:
+            return super().sleep(response)
+        delay = None
+        if self.respect_retry_after_header and response is not None:
+            delay = self.get_retry_after(response)
+        if delay is None:
+            delay = self.get_backoff_time()
+        self.scheduler.throttle(delay)
+        self.scheduler.wait()
+
+
+def make_session(
+    pool_size: int = 10,
+    max_retries: int = 3,
+    backoff_factor: float = 0.5,
+    scheduler=None,
+) -> requests.Session:
+    """creates a `requests.Session` with a keep-alive connection pool and retries
+
+    Args:
+        pool_size (int, optional): max. number of connections kept open per host. Defaults to 10.
+        max_retries (int, optional): how often a request answered with one of\
+        `RETRY_STATUS_CODES` (or failing to connect or to read the response) is retried;\
+        POST and PATCH requests, which are not idempotent, only on 429 and connect\
+        errors. Defaults to 3.
+        backoff_factor (float, optional): exponential backoff between retries in seconds;\
+        a `Retry-After` header sent by the server takes precedence. Defaults to 0.5.
+        scheduler (RequestScheduler, optional): told about every retry, see\
+        `ScheduledRetry`. Defaults to None.
+
+    Returns:
+        requests.Session: the configured session
+    """
+    retry = ScheduledRetry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=IDEMPOTENT_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    retry.scheduler = scheduler
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
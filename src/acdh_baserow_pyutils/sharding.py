@@ -0,0 +1,36 @@
+import math
+import os
+import shutil
+from typing import Iterable
+
+
+def page_ranges(count: int, page_size: int, shards: int) -> list:
+    """splits the pages of a listing of `count` rows into at most `shards` ranges of\
+    about the same number of pages
+
+    Returns:
+        list: `(first, stop)` tuples of page numbers (starting at 1), `stop` not included
+    """
+    pages = math.ceil(count / page_size)
+    shards = max(1, min(shards, pages))
+    bounds = [1 + pages * i // shards for i in range(shards + 1)]
+    return [x for x in zip(bounds, bounds[1:]) if x[0] < x[1]] if pages else []
+
+
+def shard_rows(count: int, page_size: int, first: int, stop: int) -> int:
+    """returns the number of rows on the pages from `first` to `stop` (not included)"""
+    return max(0, min(count, (stop - 1) * page_size) - (first - 1) * page_size)
+
+
+def merge_shards(f_name: str, part_names: Iterable[str], tail: bytes = b""):
+    """concatenates the shard files (deleting them) and `tail` into `f_name`
+
+    Compressed shards are complete gzip/bz2/xz streams; their concatenation is a valid\
+    file of the same format.
+    """
+    with open(f_name, "wb") as f:
+        for part_name in part_names:
+            with open(part_name, "rb") as part:
+                shutil.copyfileobj(part, f)
+            os.remove(part_name)
+        f.write(tail)
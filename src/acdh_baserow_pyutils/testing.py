@@ -0,0 +1,696 @@
+import base64
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Union
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+ROUTES = [
+    ("POST", re.compile(r"^/api/user/token-auth/$"), "token_auth"),
+    ("POST", re.compile(r"^/api/user/token-refresh/$"), "token_refresh"),
+    ("GET", re.compile(r"^/api/database/tables/database/(\d+)/$"), "list_tables"),
+    ("POST", re.compile(r"^/api/database/tables/database/(\d+)/$"), "create_table"),
+    ("DELETE", re.compile(r"^/api/database/tables/(\d+)/$"), "delete_table"),
+    ("GET", re.compile(r"^/api/database/fields/table/(\d+)/$"), "list_fields"),
+    ("POST", re.compile(r"^/api/database/fields/table/(\d+)/$"), "create_field"),
+    ("PATCH", re.compile(r"^/api/database/fields/(\d+)/$"), "update_field"),
+    ("DELETE", re.compile(r"^/api/database/fields/(\d+)/$"), "delete_field"),
+    ("GET", re.compile(r"^/api/database/rows/table/(\d+)/$"), "list_rows"),
+    ("POST", re.compile(r"^/api/database/rows/table/(\d+)/$"), "create_row"),
+    ("PATCH", re.compile(r"^/api/database/rows/table/(\d+)/(\d+)/$"), "update_row"),
+    ("PATCH", re.compile(r"^/api/database/rows/table/(\d+)/batch/$"), "update_rows"),
+    ("POST", re.compile(r"^/api/database/rows/table/(\d+)/batch/$"), "create_rows"),
+    (
+        "POST",
+        re.compile(r"^/api/database/rows/table/(\d+)/batch-delete/$"),
+        "delete_rows",
+    ),
+]
+
+FILTERS = {
+    "equal": lambda value, wanted: f"{value}" == wanted,
+    "not_equal": lambda value, wanted: f"{value}" != wanted,
+    "contains": lambda value, wanted: wanted.lower() in f"{value}".lower(),
+    "boolean": lambda value, wanted: bool(value) == (wanted in ("1", "true")),
+    "higher_than": lambda value, wanted: (
+        value is not None and float(value) > float(wanted)
+    ),
+    "lower_than": lambda value, wanted: (
+        value is not None and float(value) < float(wanted)
+    ),
+    "date_after_or_equal": lambda value, wanted: (
+        value is not None and value[:10] >= wanted[:10]
+    ),
+}
+
+FIELD_NAMES = re.compile(r'"((?:[^"\\]|\\.)*)"|([^,]+)')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _dispatch(self, method):
+        stub = self.server.stub
+        parts = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        for route_method, pattern, name in ROUTES:
+            match = pattern.match(parts.path)
+            if route_method == method and match:
+                with stub.lock:
+                    stub.request_count += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                status = stub.injected_error()
+                if status:
+                    data = {"error": "ERROR_INJECTED", "detail": "injected by the stub"}
+                    break
+                if not stub.authorized(self.headers.get("Authorization", "")):
+                    status, data = 401, {"error": "ERROR_INVALID_ACCESS_TOKEN"}
+                    break
+                status, data = getattr(stub, name)(
+                    *match.groups(), query=parse_qs(parts.query), body=body
+                )
+                break
+        else:
+            status, data = 404, {"error": "ERROR_NOT_FOUND"}
+        payload = b"" if data is None else json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        if status in (429, 503) and stub.retry_after is not None:
+            self.send_header("Retry-After", str(stub.retry_after))
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+
+class BaserowStub:
+    """an in-process stand-in for the parts of the Baserow REST API used by `BaseRowClient`
+
+    Meant for tests and benchmarks, e.g.
+
+    ```python
+    with BaserowStub(latency=0.01) as stub:
+        stub.add_table("person", ["Name"], [{"Name": "Hansi"}])
+        client = BaseRowClient("user", "pw", "token", br_base_url=stub.base_url)
+    ```
+
+    Args:
+        database_id (int, optional): the ID of the one database. Defaults to 1.
+        host (str, optional): Defaults to "127.0.0.1".
+        port (int, optional): Defaults to 0 (any free port).
+        latency (float, optional): seconds each request is delayed. Defaults to 0.
+        page_size (int, optional): rows per page if a request has no `size`. Defaults to 100.
+        error_rate (float, optional): share of requests answered with `error_status`.\
+        Defaults to 0.
+        error_status (int, optional): status of injected errors. Defaults to 503.
+        retry_after (int, optional): `Retry-After` sent with injected 429/503 errors.\
+        Defaults to None.
+        seed (int, optional): seed for the error injection. Defaults to None.
+        jwt_lifetime (float, optional): seconds issued JWTs are valid; requests with an\
+        expired or revoked JWT are answered with 401. Defaults to None (one fixed token\
+        which is never checked).
+    """
+
+    def __init__(
+        self,
+        database_id: int = 1,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0,
+        page_size: int = 100,
+        error_rate: float = 0,
+        error_status: int = 503,
+        retry_after: int = None,
+        seed: int = None,
+        jwt_lifetime: float = None,
+    ):
+        self.database_id = database_id
+        self.latency = latency
+        self.page_size = page_size
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.tables = {}
+        self.request_count = 0
+        self.error_count = 0
+        self.jwt_lifetime = jwt_lifetime
+        self.jwt_tokens = {}
+        self.refresh_tokens = set()
+        self.token_auth_count = 0
+        self.token_refresh_count = 0
+        self._fail_next = deque()
+        self._row_lists = {}
+        self.lock = threading.Lock()
+        self._next_id = 1
+        self.server = ThreadingHTTPServer((host, port), StubHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self._thread = None
+        self.clock = lambda: datetime.now(timezone.utc).isoformat()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api/"
+
+    def fail_next(self, count: int = 1, status: int = 503):
+        """answers the next `count` requests with `status`"""
+        with self.lock:
+            self._fail_next.extend([status] * count)
+
+    def injected_error(self):
+        with self.lock:
+            if self._fail_next:
+                status = self._fail_next.popleft()
+            elif self.error_rate and self.random.random() < self.error_rate:
+                status = self.error_status
+            else:
+                return None
+            self.error_count += 1
+        return status
+
+    def authorized(self, authorization: str) -> bool:
+        if self.jwt_lifetime is None or not authorization.startswith("JWT "):
+            return True
+        with self.lock:
+            return self.jwt_tokens.get(authorization[4:], 0) > time.time()
+
+    def issue_jwt(self) -> str:
+        """returns a new (unsigned) JWT valid for `jwt_lifetime` seconds"""
+        expires = time.time() + self.jwt_lifetime
+        parts = [{"alg": "none", "typ": "JWT"}, {"exp": expires, "jti": self.new_id()}]
+        token = ".".join(
+            base64.urlsafe_b64encode(json.dumps(x).encode("utf-8")).decode("ascii")
+            for x in parts
+        )
+        token = f"{token}.stub"
+        with self.lock:
+            self.jwt_tokens[token] = expires
+        return token
+
+    def revoke_jwts(self):
+        """invalidates all issued JWTs, their refresh tokens stay valid"""
+        with self.lock:
+            self.jwt_tokens.clear()
+
+    def new_id(self) -> int:
+        with self.lock:
+            new_id = self._next_id
+            self._next_id += 1
+        return new_id
+
+    def add_table(
+        self,
+        name: str,
+        field_names: list,
+        rows: list = None,
+        last_modified: str = None,
+        link_rows: dict = None,
+    ) -> int:
+        """adds a table with text fields and (optionally) rows
+
+        Args:
+            name (str): the name of the table
+            field_names (list): the names of the fields, the first one is the primary field
+            rows (list, optional): dicts mapping field names to values. Defaults to None.
+            last_modified (str, optional): name of an additional "last_modified" field the\
+            stub sets to `clock()` whenever a row is created or updated. Defaults to None.
+            link_rows (dict, optional): names of additional "link_row" fields mapped to the\
+            IDs of the linked tables; their values are lists like `[{"id": 1, "value": "Wien"}]`.\
+            Defaults to None.
+
+        Returns:
+            int: the ID of the new table
+        """
+        table_id = self.new_id()
+        fields = [
+            {
+                "id": self.new_id(),
+                "table_id": table_id,
+                "name": field_name,
+                "order": i,
+                "type": "text",
+                "primary": i == 0,
+            }
+            for i, field_name in enumerate(field_names)
+        ]
+        if last_modified is not None:
+            fields.append(
+                {
+                    "id": self.new_id(),
+                    "table_id": table_id,
+                    "name": last_modified,
+                    "order": len(fields),
+                    "type": "last_modified",
+                    "primary": False,
+                }
+            )
+        for field_name, link_row_table_id in (link_rows or {}).items():
+            fields.append(
+                {
+                    "id": self.new_id(),
+                    "table_id": table_id,
+                    "name": field_name,
+                    "order": len(fields),
+                    "type": "link_row",
+                    "primary": False,
+                    "link_row_table_id": link_row_table_id,
+                }
+            )
+        self.tables[table_id] = {
+            "id": table_id,
+            "name": name,
+            "order": len(self.tables),
+            "database_id": self.database_id,
+            "fields": fields,
+            "rows": {},
+            "last_modified": last_modified,
+            "next_row_id": 1,
+            "version": 0,
+        }
+        for row in rows or []:
+            self.insert_row(self.tables[table_id], row)
+        return table_id
+
+    def insert_row(self, table: dict, values: dict) -> dict:
+        row_id = table["next_row_id"]
+        table["next_row_id"] += 1
+        table["version"] += 1
+        row = {"id": row_id, "order": f"{row_id}.00000000000000000000"}
+        row.update({x["name"]: None for x in table["fields"]})
+        row.update(values)
+        table["rows"][row_id] = row
+        self.touch(table, row)
+        return row
+
+    def touch(self, table: dict, row: dict):
+        table["version"] += 1
+        if table["last_modified"] is not None:
+            row[table["last_modified"]] = self.clock()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def row_list(self, table: dict, query: dict) -> list:
+        """returns the rows matching the filters of `query` sorted by its `order_by`,\
+        cached until the table changes"""
+        key = (
+            table["id"],
+            tuple(
+                sorted(
+                    (k, tuple(v))
+                    for k, v in query.items()
+                    if "filter" in k or k == "order_by"
+                )
+            ),
+        )
+        cached = self._row_lists.get(key)
+        if cached is None or cached[0] != table["version"]:
+            matches = self.row_filter(table["fields"], query)
+            field_names = self.field_names(table["fields"])
+            rows = [row for row in table["rows"].values() if matches(row)]
+            for field_name in reversed(query.get("order_by", [""])[0].split(",")):
+                if field_name:
+                    name = field_names.get(field_name.lstrip("-+"))
+                    rows.sort(
+                        key=lambda row: (
+                            row.get(name) is not None,
+                            "" if row.get(name) is None else row.get(name),
+                        ),
+                        reverse=field_name.startswith("-"),
+                    )
+            cached = (table["version"], rows)
+            self._row_lists[key] = cached
+        return cached[1]
+
+    def field_names(self, fields: list) -> dict:
+        """maps the ways a field can be referred to (`field_<id>`, ID and name) to its name"""
+        field_names = {f"field_{x['id']}": x["name"] for x in fields}
+        field_names.update({str(x["id"]): x["name"] for x in fields})
+        field_names.update({x["name"]: x["name"] for x in fields})
+        return field_names
+
+    def query_error(self, fields: list, query: dict) -> Union[dict, None]:
+        """returns the error Baserow answers for filters or an `order_by` referring to\
+        fields the table does not have (e.g. the row ID), else None"""
+        field_names = self.field_names(fields)
+        filtered = [
+            key[len("filter__") :].rsplit("__", 1)[0]  # noqa
+            for key in query
+            if key.startswith("filter__")
+        ]
+        groups = [json.loads(query["filters"][0])] if "filters" in query else []
+        while groups:
+            group = groups.pop()
+            filtered += [f"{x['field']}" for x in group.get("filters", [])]
+            groups += group.get("groups", [])
+        unknown = [x for x in filtered if x not in field_names]
+        if unknown:
+            return {
+                "error": "ERROR_FILTER_FIELD_NOT_FOUND",
+                "detail": f"The fields {unknown} were not found.",
+            }
+        ordered = [x.lstrip("-+") for x in query.get("order_by", [""])[0].split(",")]
+        unknown = [x for x in ordered if x and x not in field_names]
+        if unknown:
+            return {
+                "error": "ERROR_ORDER_BY_FIELD_NOT_FOUND",
+                "detail": f"The fields {unknown} were not found.",
+            }
+        return None
+
+    def row_filter(self, fields: list, query: dict):
+        """compiles the `filter__<field>__<type>`, `filters` and `filter_type` query\
+        parameters into a function telling if a row matches"""
+        field_names = self.field_names(fields)
+        checks = []
+        for key, values in query.items():
+            if not key.startswith("filter__"):
+                continue
+            field, lookup_type = key[len("filter__") :].rsplit("__", 1)  # noqa
+            checks.append(
+                self.field_check(
+                    field_names.get(field, field), FILTERS[lookup_type], values[0]
+                )
+            )
+        if "filters" in query:
+            checks.append(
+                self.group_check(field_names, json.loads(query["filters"][0]))
+            )
+        if not checks:
+            return lambda row: True
+        if len(checks) == 1:
+            return checks[0]
+        combine = any if query.get("filter_type", ["AND"])[0] == "OR" else all
+        return lambda row: combine(check(row) for check in checks)
+
+    def field_check(self, field_name: str, lookup, wanted: str):
+        return lambda row: lookup(row.get(field_name), wanted)
+
+    def group_check(self, field_names: dict, group: dict):
+        checks = [
+            self.field_check(
+                field_names.get(str(x["field"]), x["field"]),
+                FILTERS[x["type"]],
+                f"{x['value']}",
+            )
+            for x in group.get("filters", [])
+        ]
+        checks += [self.group_check(field_names, x) for x in group.get("groups", [])]
+        combine = any if group.get("filter_type", "AND") == "OR" else all
+        return lambda row: combine(check(row) for check in checks)
+
+    def project(self, row: dict, query: dict) -> dict:
+        """applies the `include` and `exclude` query parameters to a row; "id" and\
+        "order" are always kept"""
+        keep = set(row)
+        if "include" in query:
+            keep = {"id", "order", *self.split_field_names(query["include"][0])}
+        if "exclude" in query:
+            keep -= set(self.split_field_names(query["exclude"][0])) - {"id", "order"}
+        return {key: value for key, value in row.items() if key in keep}
+
+    def split_field_names(self, value: str) -> list:
+        """splits a comma separated list of field names, names may be put in double quotes\
+        and double quotes escaped with a backslash"""
+        names = []
+        for quoted, plain in FIELD_NAMES.findall(value):
+            names.append((quoted or plain).replace('\\"', '"'))
+        return names
+
+    def token_auth(self, query, body):
+        with self.lock:
+            self.token_auth_count += 1
+        if self.jwt_lifetime is None:
+            return 200, {"token": "stub-jwt-token"}
+        token = self.issue_jwt()
+        refresh_token = f"refresh-{self.new_id()}"
+        with self.lock:
+            self.refresh_tokens.add(refresh_token)
+        return 200, {
+            "token": token,
+            "access_token": token,
+            "refresh_token": refresh_token,
+        }
+
+    def token_refresh(self, query, body):
+        with self.lock:
+            self.token_refresh_count += 1
+            known = (body or {}).get("refresh_token") in self.refresh_tokens
+        if self.jwt_lifetime is None or not known:
+            return 401, {"error": "ERROR_INVALID_REFRESH_TOKEN"}
+        token = self.issue_jwt()
+        return 200, {"token": token, "access_token": token}
+
+    def list_tables(self, database_id, query, body):
+        return 200, [
+            {
+                key: value
+                for key, value in table.items()
+                if key in ("id", "name", "order", "database_id")
+            }
+            for table in self.tables.values()
+            if table["database_id"] == int(database_id)
+        ]
+
+    def create_table(self, database_id, query, body):
+        """creates a table, with the fields (and rows) of `data` if `first_row_header`\
+        is set, otherwise with Baserow's default fields"""
+        data = body.get("data")
+        if data and body.get("first_row_header"):
+            field_names = data[0]
+            rows = [dict(zip(field_names, x)) for x in data[1:]]
+        else:
+            field_names, rows = ["Name", "Notes", "Active"], []
+        table_id = self.add_table(body["name"], field_names, rows)
+        table = self.tables[table_id]
+        return 200, {k: table[k] for k in ("id", "name", "order", "database_id")}
+
+    def delete_table(self, table_id, query, body):
+        with self.lock:
+            if self.tables.pop(int(table_id), None) is None:
+                return 404, {"error": "ERROR_TABLE_DOES_NOT_EXIST"}
+        return 204, None
+
+    def find_field(self, field_id) -> tuple:
+        for table in self.tables.values():
+            for field in table["fields"]:
+                if field["id"] == int(field_id):
+                    return table, field
+        return None, None
+
+    def _add_field(self, table: dict, field: dict):
+        table["fields"].append(field)
+        for row in table["rows"].values():
+            row[field["name"]] = None
+        table["version"] += 1
+
+    def _remove_field(self, table: dict, field: dict):
+        table["fields"].remove(field)
+        for row in table["rows"].values():
+            row.pop(field["name"], None)
+        table["version"] += 1
+
+    def create_field(self, table_id, query, body):
+        """creates a field; a link_row field gets a related field in the linked table\
+        (named after the table) unless `has_related_field` is false"""
+        field_id, related_id = self.new_id(), self.new_id()
+        with self.lock:
+            table = self.tables.get(int(table_id))
+            if table is None:
+                return 404, {"error": "ERROR_TABLE_DOES_NOT_EXIST"}
+            if body["name"] in [x["name"] for x in table["fields"]]:
+                return 400, {"error": "ERROR_FIELD_WITH_SAME_NAME_ALREADY_EXISTS"}
+            field = {
+                **body,
+                "id": field_id,
+                "table_id": table["id"],
+                "order": len(table["fields"]),
+                "primary": False,
+            }
+            field.pop("has_related_field", None)
+            if body["type"] == "link_row":
+                target = self.tables.get(body.get("link_row_table_id"))
+                if target is None:
+                    return 400, {"error": "ERROR_LINK_ROW_TABLE_NOT_PROVIDED"}
+                if body.get("has_related_field", True) and target is not table:
+                    names = [x["name"] for x in target["fields"]]
+                    name, i = table["name"], 1
+                    while name in names:
+                        i += 1
+                        name = f"{table['name']} - {i}"
+                    field["link_row_related_field_id"] = related_id
+                    related = {
+                        "id": related_id,
+                        "table_id": target["id"],
+                        "name": name,
+                        "order": len(target["fields"]),
+                        "type": "link_row",
+                        "primary": False,
+                        "link_row_table_id": table["id"],
+                        "link_row_related_field_id": field_id,
+                    }
+                    self._add_field(target, related)
+            self._add_field(table, field)
+        return 200, field
+
+    def update_field(self, field_id, query, body):
+        with self.lock:
+            table, field = self.find_field(field_id)
+            if field is None:
+                return 404, {"error": "ERROR_FIELD_DOES_NOT_EXIST"}
+            name = body.get("name", field["name"])
+            if name != field["name"]:
+                if name in [x["name"] for x in table["fields"]]:
+                    return 400, {"error": "ERROR_FIELD_WITH_SAME_NAME_ALREADY_EXISTS"}
+                for row in table["rows"].values():
+                    row[name] = row.pop(field["name"], None)
+            field.update(body)
+            table["version"] += 1
+        return 200, field
+
+    def delete_field(self, field_id, query, body):
+        with self.lock:
+            table, field = self.find_field(field_id)
+            if field is None:
+                return 404, {"error": "ERROR_FIELD_DOES_NOT_EXIST"}
+            if field["primary"]:
+                return 400, {"error": "ERROR_CANNOT_DELETE_PRIMARY_FIELD"}
+            self._remove_field(table, field)
+            related_fields = []
+            related_table, related = self.find_field(
+                field.get("link_row_related_field_id") or 0
+            )
+            if related is not None:
+                self._remove_field(related_table, related)
+                related_fields.append(related)
+        return 200, {"related_fields": related_fields}
+
+    def list_fields(self, table_id, query, body):
+        table = self.tables.get(int(table_id))
+        if table is None:
+            return 404, {"error": "ERROR_TABLE_DOES_NOT_EXIST"}
+        return 200, table["fields"]
+
+    def list_rows(self, table_id, query, body):
+        table = self.tables.get(int(table_id))
+        if table is None:
+            return 404, {"error": "ERROR_TABLE_DOES_NOT_EXIST"}
+        page = int(query.get("page", ["1"])[0])
+        size = int(query.get("size", [self.page_size])[0])
+        if size > 200:
+            return 400, {"error": "ERROR_PAGE_SIZE_LIMIT"}
+        error = self.query_error(table["fields"], query)
+        if error is not None:
+            return 400, error
+        rows = self.row_list(table, query)
+        results = rows[(page - 1) * size : page * size]  # noqa
+        if "include" in query or "exclude" in query:
+            results = [self.project(row, query) for row in results]
+        next_url = None
+        if page * size < len(rows):
+            next_query = urlencode(
+                {**query, "page": [page + 1], "size": [size]}, doseq=True
+            )
+            next_url = f"{self.base_url}database/rows/table/{table_id}/?{next_query}"
+        return 200, {
+            "count": len(rows),
+            "next": next_url,
+            "previous": None,
+            "results": results,
+        }
+
+    def create_row(self, table_id, query, body):
+        table = self.tables.get(int(table_id))
+        if table is None:
+            return 404, {"error": "ERROR_TABLE_DOES_NOT_EXIST"}
+        with self.lock:
+            row = self.insert_row(table, body)
+        return 200, row
+
+    def update_row(self, table_id, row_id, query, body):
+        table = self.tables.get(int(table_id))
+        if table is None:
+            return 404, {"error": "ERROR_TABLE_DOES_NOT_EXIST"}
+        row = table["rows"].get(int(row_id))
+        if row is None:
+            return 404, {"error": "ERROR_ROW_DOES_NOT_EXIST"}
+        row.update(body)
+        self.touch(table, row)
+        return 200, row
+
+    def update_rows(self, table_id, query, body):
+        table = self.tables.get(int(table_id))
+        if table is None:
+            return 404, {"error": "ERROR_TABLE_DOES_NOT_EXIST"}
+        missing = [x["id"] for x in body["items"] if x["id"] not in table["rows"]]
+        if missing:
+            return 404, {
+                "error": "ERROR_ROW_DOES_NOT_EXIST",
+                "detail": f"The rows {missing} do not exist.",
+            }
+        for item in body["items"]:
+            table["rows"][item["id"]].update(item)
+            self.touch(table, table["rows"][item["id"]])
+        return 200, {"items": [table["rows"][x["id"]] for x in body["items"]]}
+
+    def create_rows(self, table_id, query, body):
+        table = self.tables.get(int(table_id))
+        if table is None:
+            return 404, {"error": "ERROR_TABLE_DOES_NOT_EXIST"}
+        if len(body["items"]) > 200:
+            return 400, {"error": "ERROR_REQUEST_BODY_VALIDATION"}
+        with self.lock:
+            rows = [self.insert_row(table, x) for x in body["items"]]
+        return 200, {"items": rows}
+
+    def delete_rows(self, table_id, query, body):
+        table = self.tables.get(int(table_id))
+        if table is None:
+            return 404, {"error": "ERROR_TABLE_DOES_NOT_EXIST"}
+        missing = [x for x in body["items"] if x not in table["rows"]]
+        if missing:
+            return 404, {
+                "error": "ERROR_ROW_DOES_NOT_EXIST",
+                "detail": f"The rows {missing} do not exist.",
+            }
+        with self.lock:
+            for row_id in body["items"]:
+                del table["rows"][row_id]
+            table["version"] += 1
+        return 204, None
@@ -0,0 +1,247 @@
+import bz2
+import csv
+import gzip
+import io
+import json
+import lzma
+import os
+from typing import Iterable, TextIO, Union
+
+from acdh_baserow_pyutils.jsonlib import dumps
+
+OUTPUT_FORMATS = {
+    "json": ".json",
+    "json_compact": ".json",
+    "ndjson": ".ndjson",
+    "csv": ".csv",
+}
+# suffix, opener and compress function; concatenated compressed chunks are valid files
+COMPRESSIONS = {
+    "gzip": (".gz", gzip.open, gzip.compress),
+    "bz2": (".bz2", bz2.open, bz2.compress),
+    "xz": (".xz", lzma.open, lzma.compress),
+}
+CSV_LIST_SEPARATOR = "|"
+
+
+def write_json(
+    rows: Iterable[dict],
+    fp: TextIO,
+    indent: int = 0,
+    start: int = 0,
+    close: bool = True,
+    compact: bool = False,
+) -> int:
+    """writes rows as one JSON object keyed by row ID, one row at a time
+
+    The output is byte-identical to `json.dump({x["id"]: x for x in rows}, fp, ensure_ascii=False)`\
+    (or with `indent=indent` if given) without holding all rows in memory. With `compact`\
+    it holds no whitespace and is encoded with `jsonlib.dumps` (orjson if installed),\
+    which is several times faster.
+
+    Args:
+        rows (Iterable[dict]): the rows to write, e.g. from `BaseRowClient.yield_rows`
+        fp (TextIO): a file opened for writing
+        indent (int, optional): indentation as in `json.dump`. Defaults to 0 (no indentation).
+        start (int, optional): number of rows already written to `fp` by earlier calls\
+        with `close=False`. Defaults to 0.
+        close (bool, optional): write the end of the object. Defaults to True.
+        compact (bool, optional): leave out all whitespace, `indent` is ignored. Defaults\
+        to False.
+
+    Returns:
+        int: the number of written rows
+    """
+    if compact:
+        count = start
+        for row in rows:
+            key = dumps(str(row["id"]))
+            fp.write(f"{',' if count else '{'}{key}:{dumps(row)}")
+            count += 1
+        if close:
+            fp.write("}" if count else "{}")
+        return count - start
+    if indent:
+        padding = " " * indent
+        separator, item_start, end = ",", f"\n{padding}", "\n}"
+    else:
+        padding = None
+        separator, item_start, end = ", ", "", "}"
+    count = start
+    for row in rows:
+        row_json = json.dumps(row, ensure_ascii=False, indent=indent or None)
+        if padding:
+            row_json = row_json.replace("\n", f"\n{padding}")
+        key = json.dumps(str(row["id"]), ensure_ascii=False)
+        fp.write(f"{separator if count else '{'}{item_start}{key}: {row_json}")
+        count += 1
+    if close:
+        fp.write(end if count else "{}")
+    return count - start
+
+
+def write_ndjson(rows: Iterable[dict], fp: TextIO) -> int:
+    """writes rows as newline delimited JSON, one row per line, encoded with `jsonlib.dumps`
+
+    Args:
+        rows (Iterable[dict]): the rows to write, e.g. from `BaseRowClient.yield_rows`
+        fp (TextIO): a file opened for writing
+
+    Returns:
+        int: the number of written rows
+    """
+    count = 0
+    for row in rows:
+        fp.write(dumps(row))
+        fp.write("\n")
+        count += 1
+    return count
+
+
+def flatten_value(value) -> str:
+    """returns a CSV cell for a Baserow value
+
+    link_row and multiple select values (lists of `{"id": ..., "value": ...}`) become their\
+    values joined by `CSV_LIST_SEPARATOR`, single select values their value; other lists\
+    and dicts are written as JSON, None as empty string.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        if "value" in value:
+            return flatten_value(value["value"])
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, list):
+        if all(isinstance(x, dict) and "value" in x for x in value):
+            return CSV_LIST_SEPARATOR.join(flatten_value(x["value"]) for x in value)
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def write_csv(rows: Iterable[dict], fp: TextIO, header: bool = True) -> int:
+    """writes rows as CSV with a header row, see `flatten_value` for the cells
+
+    The columns are the keys of the first row. `fp` should be opened with `newline=""`.
+
+    Args:
+        rows (Iterable[dict]): the rows to write, e.g. from `BaseRowClient.yield_rows`
+        fp (TextIO): a file opened for writing
+        header (bool, optional): write the header row. Defaults to True.
+
+    Returns:
+        int: the number of written rows
+    """
+    writer = None
+    count = 0
+    for row in rows:
+        if writer is None:
+            writer = csv.writer(fp)
+            columns = list(row)
+            if header:
+                writer.writerow(columns)
+        writer.writerow([flatten_value(row.get(x)) for x in columns])
+        count += 1
+    return count
+
+
+def render_rows(
+    rows: list,
+    output_format: str = "json",
+    indent: int = 0,
+    start: int = 0,
+    close: bool = False,
+) -> str:
+    """returns the given rows in an output format as a chunk that continues the `start`\
+    rows written before, e.g. to append pages to a file one at a time
+
+    Args:
+        rows (list): the rows
+        output_format (str, optional): one of `OUTPUT_FORMATS`. Defaults to "json".
+        indent (int, optional): indentation of "json" as in `json.dump`. Defaults to 0.
+        start (int, optional): the number of rows written before. Defaults to 0.
+        close (bool, optional): end the file after these rows. Defaults to False.
+
+    Returns:
+        str: the chunk
+    """
+    check_output_options(output_format)
+    fp = io.StringIO(newline="")
+    if output_format == "csv":
+        write_csv(rows, fp, header=start == 0)
+    elif output_format == "ndjson":
+        write_ndjson(rows, fp)
+    else:
+        compact = output_format == "json_compact"
+        write_json(rows, fp, indent, start, close, compact)
+    return fp.getvalue()
+
+
+def check_output_options(output_format: str, compression: Union[str, None] = None):
+    """raises a ValueError for unknown output formats or compressions"""
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"output_format must be one of {', '.join(OUTPUT_FORMATS)}")
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f"compression must be one of {', '.join(COMPRESSIONS)}")
+
+
+def open_output(f_name: str, compression: Union[str, None] = None, newline=None):
+    """opens a file for writing text, compressed with "gzip", "bz2" or "xz" if given"""
+    check_output_options("json", compression)
+    if compression is None:
+        return open(f_name, "w", encoding="utf-8", newline=newline)
+    opener = COMPRESSIONS[compression][1]
+    return opener(f_name, "wt", encoding="utf-8", newline=newline)
+
+
+def write_rows(
+    rows: Iterable[dict],
+    f_name: str,
+    output_format: str = "json",
+    compression: Union[str, None] = None,
+    indent: int = 0,
+    start: int = 0,
+    close: bool = True,
+) -> int:
+    """writes rows into a file with `write_json`, `write_ndjson` or `write_csv`
+
+    Args:
+        rows (Iterable[dict]): the rows to write, e.g. from `BaseRowClient.yield_rows`
+        f_name (str): the name of the file
+        output_format (str, optional): "json", "json_compact" (`write_json` with\
+        `compact=True`), "ndjson" or "csv". Defaults to "json".
+        compression (Union[str, None], optional): "gzip", "bz2" or "xz". Defaults to None.
+        indent (int, optional): indentation of "json" as in `json.dump`. Defaults to 0.
+        start (int, optional): number of rows written before (into another file this one\
+        is appended to), see `render_rows`. Defaults to 0.
+        close (bool, optional): end the file after these rows. Defaults to True.
+
+    Returns:
+        int: the number of written rows
+    """
+    check_output_options(output_format, compression)
+    newline = "" if output_format == "csv" else None
+    with open_output(f_name, compression, newline) as fp:
+        if output_format == "csv":
+            return write_csv(rows, fp, header=start == 0)
+        if output_format == "ndjson":
+            return write_ndjson(rows, fp)
+        compact = output_format == "json_compact"
+        return write_json(rows, fp, indent, start, close, compact)
+
+
+def output_file_name(
+    name: str,
+    folder_name: Union[str, None] = None,
+    output_format: str = "json",
+    compression: Union[str, None] = None,
+) -> str:
+    """returns e.g. `out/person.ndjson.gz` for `("person", "out", "ndjson", "gzip")`"""
+    check_output_options(output_format, compression)
+    f_name = f"{name}{OUTPUT_FORMATS[output_format]}"
+    if compression is not None:
+        f_name += COMPRESSIONS[compression][0]
+    if folder_name is not None:
+        f_name = os.path.join(folder_name, f_name)
+    return f_name
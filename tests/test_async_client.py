@@ -0,0 +1,66 @@
+import unittest
+
+from acdh_baserow_pyutils import AsyncBaseRowClient
+from acdh_baserow_pyutils.async_client import httpx
+from acdh_baserow_pyutils.testing import BaserowStub
+
+PERSONS = [{"Name": f"Person {i}"} for i in range(250)]
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class TestAsyncBaseRowClient(unittest.IsolatedAsyncioTestCase):
+    """Tests for `AsyncBaseRowClient` against the local `BaserowStub`."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stub = BaserowStub().start()
+        cls.person_id = cls.stub.add_table("person", ["Name"], PERSONS)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stub.stop()
+
+    async def asyncSetUp(self):
+        self.br_client = AsyncBaseRowClient(
+            "user", "pw", "token", br_base_url=self.stub.base_url, concurrency=4
+        )
+
+    async def asyncTearDown(self):
+        await self.br_client.aclose()
+
+    async def test_001_list_tables_and_fields(self):
+        tables = await self.br_client.list_tables(self.stub.database_id)
+        self.assertEqual(tables[0]["name"], "person")
+        fields = await self.br_client.list_fields(self.person_id)
+        self.assertEqual(fields[0]["primary"], True)
+        self.assertEqual(self.br_client.br_jwt_token, "stub-jwt-token")
+
+    async def test_002_yield_rows(self):
+        rows = [x["id"] async for x in self.br_client.yield_rows(self.person_id)]
+        self.assertEqual(rows, list(range(1, 251)))
+        rows = [
+            x["id"]
+            async for x in self.br_client.yield_rows(self.person_id, size=30, workers=3)
+        ]
+        self.assertEqual(rows, list(range(1, 251)))
+
+    async def test_003_get_or_create_and_update(self):
+        table_dict = await self.br_client.fetch_table_field_dict(self.stub.database_id)
+        row, created = await self.br_client.get_or_create(
+            "person", "Name", table_dict, "Person 3"
+        )
+        self.assertEqual((row["id"], created), (4, False))
+        row, created = await self.br_client.get_or_create(
+            "person", "Name", table_dict, "Hansi4ever"
+        )
+        self.assertTrue(created)
+        patched = await self.br_client.patch_row(
+            self.person_id, row["id"], {"Name": "Hansi"}
+        )
+        self.assertEqual(patched["Name"], "Hansi")
+        items = [{"id": x, "Name": f"Name {x}"} for x in range(1, 251)]
+        result = await self.br_client.batch_update_rows(
+            self.person_id, items + [{"id": 99999, "Name": "nope"}]
+        )
+        self.assertEqual(len(result["updated_rows"]), 199)
+        self.assertEqual(result["errors"], ["ERROR_ROW_DOES_NOT_EXIST"])
@@ -0,0 +1,1234 @@
+import contextlib
+import bz2
+import csv
+import gzip
+import io
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import requests
+
+import acdh_baserow_pyutils
+from acdh_baserow_pyutils import (
+    MAX_URL_LENGTH,
+    BaseRowClient,
+    SchemaRegistry,
+    get_related_table_info,
+    jsonlib,
+)
+from acdh_baserow_pyutils.auth import TokenCache, token_expiry
+from acdh_baserow_pyutils.resultcache import ResultCache
+from acdh_baserow_pyutils.rowstore import RowStore
+from acdh_baserow_pyutils.rowtable import RowTable
+from acdh_baserow_pyutils.scheduler import RequestScheduler
+from acdh_baserow_pyutils.testing import BaserowStub
+from acdh_baserow_pyutils.writers import flatten_value, write_rows
+
+PERSONS = [{"Name": f"Person {i}", "Beruf": "Schriftsteller"} for i in range(250)]
+
+
+class TestBaseRowClientOffline(unittest.TestCase):
+    """Tests for `acdh_baserow_pyutils` against the local `BaserowStub`."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stub = BaserowStub().start()
+        cls.person_id = cls.stub.add_table("person", ["Name", "Beruf"], PERSONS)
+        cls.place_id = cls.stub.add_table(
+            "place", ["Name"], [{"Name": "Wien"}, {"Name": 'Zürich\n"Altstadt"'}]
+        )
+        cls.stub.add_table("profession", ["Name"])
+        cls.br_client = BaseRowClient(
+            "user", "pw", "token", br_base_url=cls.stub.base_url
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.br_client.close()
+        cls.stub.stop()
+
+    def test_001_session_is_reused(self):
+        self.assertEqual(self.br_client.br_jwt_token, "stub-jwt-token")
+        start = self.stub.request_count
+        tables = self.br_client.list_tables(self.stub.database_id)
+        self.assertEqual(len(tables), 3)
+        rows = [x for x in self.br_client.yield_rows(self.person_id)]
+        self.assertEqual(len(rows), len(PERSONS))
+        self.assertEqual(self.stub.request_count - start, 4)
+        self.assertEqual(self.br_client.timeout, 30)
+
+    def test_002_client_as_context_manager(self):
+        with BaseRowClient(
+            "user", "pw", "token", br_base_url=self.stub.base_url, timeout=5
+        ) as br_client:
+            fields = br_client.list_fields(self.place_id)
+        self.assertEqual(fields[0]["primary"], True)
+
+    def test_003_retries_configured(self):
+        br_client = BaseRowClient(
+            "user", "pw", "token", br_base_url=self.stub.base_url, max_retries=5
+        )
+        retry = br_client.session.get_adapter(self.stub.base_url).max_retries
+        self.assertEqual(retry.total, 5)
+        self.assertIn(429, retry.status_forcelist)
+        br_client.close()
+
+    def test_004_yield_rows_concurrently(self):
+        sequential = [x["id"] for x in self.br_client.yield_rows(self.person_id)]
+        start = self.stub.request_count
+        concurrent = [
+            x["id"]
+            for x in self.br_client.yield_rows(self.person_id, size=20, workers=4)
+        ]
+        self.assertEqual(sequential, concurrent)
+        self.assertEqual(self.stub.request_count - start, 13)
+        filters = {"filter__Name__contains": "Person 1"}
+        filtered = [
+            x["Name"]
+            for x in self.br_client.yield_rows(
+                self.person_id, filters=filters, size=5, workers=3
+            )
+        ]
+        self.assertEqual(len(filtered), 111)
+        self.assertTrue(all(x.startswith("Person 1") for x in filtered))
+        with self.assertRaises(ValueError):
+            next(self.br_client.yield_rows(self.person_id, size=500))
+
+    def test_005_dump_tables_as_json(self):
+        out_dir = tempfile.mkdtemp()
+        for indent in (0, 4):
+            for workers in (1, 3):
+                files = self.br_client.dump_tables_as_json(
+                    self.stub.database_id,
+                    folder_name=out_dir,
+                    indent=indent,
+                    workers=workers,
+                )
+                self.assertEqual(
+                    [os.path.basename(x) for x in files],
+                    ["person.json", "place.json", "profession.json"],
+                )
+                for f_name, table_id in zip(files, self.stub.tables):
+                    data = {x["id"]: x for x in self.br_client.yield_rows(table_id)}
+                    with open(f_name, encoding="utf-8") as fp:
+                        written = fp.read()
+                    self.assertEqual(
+                        written,
+                        json.dumps(data, ensure_ascii=False, indent=indent or None),
+                    )
+        shutil.rmtree(out_dir)
+
+    def test_006_lazy_schema_and_schema_cache(self):
+        cache = os.path.join(tempfile.mkdtemp(), "schema.json")
+        start = self.stub.request_count
+        br_client = BaseRowClient(
+            "user",
+            "pw",
+            "token",
+            br_base_url=self.stub.base_url,
+            br_db_id=self.stub.database_id,
+            schema_cache=cache,
+            token_cache=TokenCache(),
+        )
+        self.assertEqual(self.stub.request_count, start)
+        self.assertEqual(br_client.br_table_dict["person"]["id"], self.person_id)
+        self.assertEqual(self.stub.request_count - start, 5)
+        self.assertTrue(os.path.exists(cache))
+
+        start = self.stub.request_count
+        br_client = BaseRowClient(
+            "user",
+            "pw",
+            "token",
+            br_base_url=self.stub.base_url,
+            br_db_id=self.stub.database_id,
+            schema_cache=cache,
+            token_cache=TokenCache(),
+        )
+        self.assertIn("Beruf", br_client.br_table_dict["person"]["fields"])
+        self.assertEqual(self.stub.request_count - start, 2)
+
+        br_client.invalidate_schema_cache()
+        self.assertFalse(os.path.exists(cache))
+        self.assertIn("place", br_client.br_table_dict)
+        table_id = self.stub.add_table("keyword", ["Name"])
+        br_client.br_table_dict = None
+        self.assertIn("keyword", br_client.br_table_dict)
+        del self.stub.tables[table_id]
+        br_client.schema_cache_ttl = 0
+        br_client.br_table_dict = None
+        self.assertNotIn("keyword", br_client.br_table_dict)
+        shutil.rmtree(os.path.dirname(cache))
+
+    def test_007_schema_registry(self):
+        br_client = BaseRowClient(
+            "user",
+            "pw",
+            "token",
+            br_base_url=self.stub.base_url,
+            br_db_id=self.stub.database_id,
+        )
+        # without the schema loaded, the tables are listed only
+        start = self.stub.request_count
+        self.assertEqual(
+            br_client.get_table_by_name(self.stub.database_id, "place"),
+            str(self.place_id),
+        )
+        self.assertEqual(self.stub.request_count, start + 1)
+        schema = br_client.br_table_dict
+        self.assertIsInstance(schema, SchemaRegistry)
+        self.assertEqual(schema.table_by_id(str(self.place_id))["name"], "place")
+        field = schema.field_by_name("person", "Beruf")
+        self.assertEqual(schema.field_by_id(field["id"]), field)
+        start = self.stub.request_count
+        self.assertEqual(
+            br_client.get_table_by_name(self.stub.database_id, "place"),
+            str(self.place_id),
+        )
+        self.assertEqual(self.stub.request_count, start)
+        # unknown names are looked up in Baserow
+        self.assertFalse(br_client.get_table_by_name(self.stub.database_id, "asdf"))
+        self.assertEqual(self.stub.request_count, start + 1)
+        table, created = br_client.create_table("neu")
+        self.assertTrue(created)
+        self.assertEqual(
+            br_client.get_table_by_name(self.stub.database_id, "neu"), str(table["id"])
+        )
+        br_client.delete_table(table["id"])
+        self.assertFalse(br_client.get_table_by_name(self.stub.database_id, "neu"))
+        table_dict = {
+            "person": {
+                "id": 1,
+                "name": "person",
+                "fields": {
+                    "born_in": {"id": 11, "name": "born_in", "link_row_table_id": 2}
+                },
+            },
+            "place": {"id": 2, "name": "place", "fields": {}},
+        }
+        self.assertEqual(
+            get_related_table_info("person", "born_in", table_dict), (2, "place")
+        )
+        registry = SchemaRegistry(table_dict)
+        self.assertEqual(registry.link_row_target("person", "born_in")["name"], "place")
+        self.assertEqual(
+            get_related_table_info("person", "born_in", registry), (2, "place")
+        )
+        self.assertEqual(registry, table_dict)
+
+    def test_008_bulk_get_or_create(self):
+        br_client = BaseRowClient(
+            "user",
+            "pw",
+            "token",
+            br_base_url=self.stub.base_url,
+            br_db_id=self.stub.database_id,
+        )
+        br_client.br_table_dict
+        values = ["Person 7", "Person 8", "Neu & Co", "Person 7"] + [
+            f"Bulk {i}" for i in range(300)
+        ]
+        urls = []
+        br_client.pre_request_hooks.append(lambda info: urls.append(info["url"]))
+        result = br_client.bulk_get_or_create("person", "Name", values, chunk_size=50)
+        self.assertEqual(len(urls), 9)
+        self.assertEqual(list(result)[:3], ["Person 7", "Person 8", "Neu & Co"])
+        self.assertEqual(result["Person 7"][0]["id"], 8)
+        self.assertFalse(result["Person 8"][1])
+        row, created = result["Neu & Co"]
+        self.assertTrue(created)
+        self.assertEqual(row["Name"], "Neu & Co")
+        start = self.stub.request_count
+        again = br_client.bulk_get_or_create("person", "Name", values, scan=True)
+        self.assertEqual(self.stub.request_count - start, 3)
+        self.assertFalse(any(created for _, created in again.values()))
+        self.assertEqual(again["Bulk 299"][0]["id"], result["Bulk 299"][0]["id"])
+        # long values: the lookups are split so that no URL gets too long
+        values = [f"Langer Name Nr. {i:04d}" for i in range(100)]
+        urls.clear()
+        result = br_client.bulk_get_or_create("person", "Name", values)
+        self.assertEqual(len(result), 100)
+        self.assertLessEqual(max(len(x) for x in urls), MAX_URL_LENGTH)
+        lookups = [x for x in urls if "filters=" in x]
+        self.assertEqual(len(lookups), 3)
+        again = br_client.bulk_get_or_create("person", "Name", values)
+        self.assertFalse(any(created for _, created in again.values()))
+
+    def test_009_batch_create_and_delete_rows(self):
+        table_id = self.stub.add_table("batch", ["Name"])
+        rows = ({"Name": f"Row {i}"} for i in range(500))
+        result = self.br_client.batch_create_rows(
+            table_id, rows, batch_size=50, workers=4
+        )
+        self.assertEqual(result["errors"], [])
+        self.assertEqual(
+            [x["Name"] for x in result["created_rows"]],
+            [f"Row {i}" for i in range(500)],
+        )
+        updates = ({"id": x, "Name": f"Updated {x}"} for x in range(1, 501))
+        result = self.br_client.batch_update_rows(table_id, updates, workers=3)
+        self.assertEqual(len(result["updated_rows"]), 500)
+        self.assertEqual(result["updated_rows"][-1]["Name"], "Updated 500")
+        result = self.br_client.batch_delete_rows(
+            table_id, list(range(1, 301)) + [9999], batch_size=100, workers=2
+        )
+        self.assertEqual(result["deleted_rows"], list(range(1, 301)))
+        self.assertEqual(result["errors"], ["ERROR_ROW_DOES_NOT_EXIST"])
+        self.assertEqual(len(self.stub.tables[table_id]["rows"]), 200)
+        del self.stub.tables[table_id]
+
+    def test_010_stream_batch_update_rows(self):
+        updates = ({"id": x, "Beruf": "Dichter"} for x in range(1, 251))
+        results = list(
+            self.br_client.iter_batch_update_rows(
+                self.person_id, updates, batch_size=100, ids_only=True
+            )
+        )
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0]["updated_rows"], list(range(1, 101)))
+        self.assertEqual(results[2]["errors"], [])
+        seen = []
+        updates = [{"id": x, "Beruf": "Dichterin"} for x in (1, 2, 99999)]
+        result = self.br_client.batch_update_rows(
+            self.person_id, updates, batch_size=2, callback=seen.append
+        )
+        self.assertEqual(result["updated_rows"], [])
+        self.assertEqual(result["errors"], ["ERROR_ROW_DOES_NOT_EXIST"])
+        self.assertEqual(seen[0]["updated_rows"][1]["Beruf"], "Dichterin")
+        self.assertEqual(seen[1], {"updated_rows": [], "errors": result["errors"]})
+
+    def test_011_row_store(self):
+        self.stub.clock = lambda: "2026-01-01T10:00:00Z"
+        table_id = self.stub.add_table(
+            "synced",
+            ["Name"],
+            [{"Name": f"Row {i}"} for i in range(450)],
+            last_modified="Last modified",
+        )
+        self.stub.clock = lambda: "2026-02-01T10:00:00Z"
+        self.br_client.patch_row(table_id, 5, {"Name": "Row 4"})
+        path = os.path.join(tempfile.mkdtemp(), "rows.sqlite")
+        with RowStore(self.br_client, path) as store:
+            result = store.sync(table_id, modified_field="Last modified")
+            self.assertEqual(result["fetched"], 450)
+            self.assertTrue(result["full"])
+            self.assertEqual(store.get(table_id, 3)["Name"], "Row 2")
+            self.stub.clock = lambda: "2026-12-24T18:00:00Z"
+            self.br_client.patch_row(table_id, 3, {"Name": "Changed"})
+            result = store.sync(table_id, modified_field="Last modified")
+            self.assertEqual(result["fetched"], 2)
+            self.assertEqual(result["high_water_mark"], "2026-12-24T18:00:00Z")
+            self.assertEqual(store.search_rows(table_id, "Name", "Changed")["count"], 1)
+            start = self.stub.request_count
+            lookup_dict = {"synced": {"id": table_id}}
+            row, created = store.get_or_create("synced", "Name", lookup_dict, "Row 7")
+            self.assertEqual((row["id"], created), (8, False))
+            self.assertEqual(self.stub.request_count, start)
+            row, created = store.get_or_create("synced", "Name", lookup_dict, "Neu")
+            self.assertTrue(created)
+            self.assertEqual(store.get(table_id, row["id"])["Name"], "Neu")
+            self.assertEqual(len(list(store.yield_rows(table_id))), 451)
+            state = store.sync_state(table_id)
+
+            def fail_third_page(info):
+                if "page=3" in info["url"]:
+                    self.stub.fail_next(1, status=500)
+
+            self.br_client.pre_request_hooks.append(fail_third_page)
+            try:
+                with self.assertRaises(requests.exceptions.HTTPError):
+                    store.sync(table_id, modified_field="Last modified", full=True)
+            finally:
+                self.br_client.pre_request_hooks.remove(fail_third_page)
+            store.store_rows(table_id, [row])
+            self.assertEqual(len(list(store.yield_rows(table_id))), 451)
+            self.assertEqual(store.sync_state(table_id), state)
+        del self.stub.tables[table_id]
+        shutil.rmtree(os.path.dirname(path))
+
+    def test_012_stub_error_injection_and_retries(self):
+        br_client = BaseRowClient(
+            "user", "pw", "token", br_base_url=self.stub.base_url, backoff_factor=0
+        )
+        self.stub.fail_next(2, status=503)
+        errors = self.stub.error_count
+        fields = br_client.list_fields(self.place_id)
+        self.assertEqual(fields[0]["name"], "Name")
+        self.assertEqual(self.stub.error_count - errors, 2)
+        br_client = BaseRowClient(
+            "user", "pw", "token", br_base_url=self.stub.base_url, max_retries=0
+        )
+        self.stub.fail_next(1, status=429)
+        r = br_client._request("GET", br_client.fields_url(self.place_id))
+        self.assertEqual(r.status_code, 429)
+        stub = BaserowStub(page_size=7, latency=0.01, error_rate=1, seed=1).start()
+        table_id = stub.add_table("t", ["Name"], [{"Name": x} for x in "abcdefghij"])
+        stub.error_rate = 0
+        br_client = BaseRowClient("user", "pw", "token", br_base_url=stub.base_url)
+        self.assertEqual(len(list(br_client.yield_rows(table_id))), 10)
+        self.assertEqual(stub.request_count, 2)
+        stub.stop()
+
+    def test_013_request_hooks_and_metrics(self):
+        br_client = BaseRowClient("user", "pw", "token", br_base_url=self.stub.base_url)
+        seen = []
+        br_client.pre_request_hooks.append(lambda info: seen.append(dict(info)))
+        br_client.post_request_hooks.append(lambda info: seen.append(dict(info)))
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            rows = list(br_client.yield_rows(self.place_id, size=1))
+            br_client.patch_row(self.person_id, 10**6, {"Name": "x"})
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(stdout.getvalue(), "")
+        self.assertEqual(seen[0]["endpoint"], "database/rows/table/{id}/")
+        self.assertNotIn("status", seen[0])
+        self.assertEqual(seen[1]["status"], 200)
+        self.assertGreater(seen[1]["bytes"], 0)
+        metrics = br_client.metrics.snapshot()
+        pages = metrics["GET database/rows/table/{id}/"]
+        self.assertEqual((pages["count"], pages["errors"]), (2, 0))
+        self.assertEqual(sum(pages["histogram"].values()), 2)
+        self.assertGreaterEqual(pages["max_seconds"], 0)
+        self.assertEqual(metrics["PATCH database/rows/table/{id}/{id}/"]["errors"], 1)
+        br_client.metrics.reset()
+        self.assertEqual(br_client.metrics.snapshot(), {})
+
+    def test_014_expanded_rows(self):
+        country_id = self.stub.add_table("country", ["Name"], [{"Name": "Österreich"}])
+        city_id = self.stub.add_table(
+            "city",
+            ["Name"],
+            [{"Name": "Wien", "country": [{"id": 1, "value": "Österreich"}]}],
+            link_rows={"country": country_id},
+        )
+        writer_id = self.stub.add_table(
+            "writer",
+            ["Name"],
+            [
+                {
+                    "Name": "Ingeborg",
+                    "born_in": [{"id": 1, "value": "Wien"}],
+                    "died_in": [{"id": 1, "value": "Wien"}, {"id": 9, "value": "x"}],
+                },
+                {"Name": "Thomas", "born_in": []},
+            ],
+            link_rows={"born_in": city_id, "died_in": city_id},
+        )
+        lookup_dict = self.br_client.fetch_table_field_dict(self.stub.database_id)
+        start = self.stub.request_count
+        rows = list(self.br_client.yield_expanded_rows("writer", 1, lookup_dict))
+        self.assertEqual(self.stub.request_count - start, 2)
+        self.assertEqual(rows[0]["born_in"][0]["Name"], "Wien")
+        self.assertEqual(
+            rows[0]["born_in"][0]["country"], [{"id": 1, "value": "Österreich"}]
+        )
+        self.assertIs(rows[0]["born_in"][0], rows[0]["died_in"][0])
+        self.assertEqual(rows[0]["died_in"][1], {"id": 9, "value": "x"})
+        self.assertEqual(rows[1]["born_in"], [])
+        start = self.stub.request_count
+        rows = list(self.br_client.yield_expanded_rows("writer", 2, lookup_dict))
+        self.assertEqual(self.stub.request_count - start, 3)
+        self.assertEqual(rows[0]["born_in"][0]["country"][0]["Name"], "Österreich")
+        rows = list(self.br_client.yield_expanded_rows("writer", 0, lookup_dict))
+        self.assertEqual(rows[0]["born_in"], [{"id": 1, "value": "Wien"}])
+        folder_name = tempfile.mkdtemp()
+        f_name = self.br_client.dump_expanded_table_as_json(
+            "writer", folder_name, lookup_dict=lookup_dict
+        )
+        with open(f_name, encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(data["1"]["died_in"][0]["country"][0]["value"], "Österreich")
+        shutil.rmtree(folder_name)
+        for x in (country_id, city_id, writer_id):
+            del self.stub.tables[x]
+
+    def test_015_dump_formats(self):
+        out_dir = tempfile.mkdtemp()
+        places = list(self.br_client.yield_rows(self.place_id))
+        files = self.br_client.dump_tables_as_json(
+            self.stub.database_id,
+            folder_name=out_dir,
+            output_format="ndjson",
+            compression="gzip",
+        )
+        self.assertEqual(os.path.basename(files[1]), "place.ndjson.gz")
+        with gzip.open(files[1], "rt", encoding="utf-8") as fp:
+            self.assertEqual([json.loads(x) for x in fp], places)
+        files = self.br_client.dump_tables_as_json(
+            self.stub.database_id, folder_name=out_dir, output_format="csv"
+        )
+        with open(files[1], encoding="utf-8", newline="") as fp:
+            written = list(csv.DictReader(fp))
+        self.assertEqual(written[1]["Name"], 'Zürich\n"Altstadt"')
+        self.assertEqual(written[1]["id"], "2")
+        with open(files[2], encoding="utf-8") as fp:
+            self.assertEqual(fp.read(), "")
+        with self.assertRaises(ValueError):
+            self.br_client.dump_tables_as_json(
+                self.stub.database_id, folder_name=out_dir, compression="zip"
+            )
+        shutil.rmtree(out_dir)
+        self.assertEqual(
+            flatten_value([{"id": 1, "value": "a"}, {"id": 2, "value": "b"}]), "a|b"
+        )
+        self.assertEqual(
+            flatten_value({"id": 3, "value": "rot", "color": "red"}), "rot"
+        )
+        self.assertEqual(flatten_value([1, 2]), "[1, 2]")
+        self.assertEqual((flatten_value(None), flatten_value(True)), ("", "true"))
+
+    def test_016_resumable_dump(self):
+        stub = BaserowStub(page_size=7).start()
+        stub.clock = lambda: "2026-01-01T10:00:00Z"
+        log_id = stub.add_table(
+            "log",
+            ["Name"],
+            [{"Name": f"Entry {i}"} for i in range(450)],
+            last_modified="Last modified",
+        )
+        stub.add_table("empty", ["Name"])
+        br_client = BaseRowClient("user", "pw", "token", br_base_url=stub.base_url)
+        out_dir = tempfile.mkdtemp()
+
+        def fail_on_page_3(info):
+            if "&page=3" in info["url"]:
+                raise ConnectionError("VPN is down")
+
+        for output_format, compression in (("json", None), ("ndjson", "gzip")):
+            br_client.post_request_hooks.append(fail_on_page_3)
+            with self.assertRaises(ConnectionError):
+                br_client.dump_tables_as_json(
+                    stub.database_id,
+                    folder_name=out_dir,
+                    output_format=output_format,
+                    compression=compression,
+                    checkpoint=True,
+                )
+            br_client.post_request_hooks.remove(fail_on_page_3)
+            checkpoint = os.path.join(out_dir, ".baserow_dump_checkpoint.json")
+            with open(checkpoint, encoding="utf-8") as f:
+                state = json.load(f)[str(log_id)]
+            self.assertEqual((state["page"], state["rows"]), (2, 400))
+            start = stub.request_count
+            files = br_client.dump_tables_as_json(
+                stub.database_id,
+                folder_name=out_dir,
+                output_format=output_format,
+                compression=compression,
+                checkpoint=True,
+            )
+            # list_tables, 2 x (list_fields, marker), page 3 of "log", "empty"
+            self.assertEqual(stub.request_count - start, 7)
+            rows = list(br_client.yield_rows(log_id))
+            if compression:
+                with gzip.open(files[0], "rt", encoding="utf-8") as fp:
+                    self.assertEqual([json.loads(x) for x in fp], rows)
+            else:
+                with open(files[0], encoding="utf-8") as fp:
+                    expected = json.dumps(
+                        {x["id"]: x for x in rows}, ensure_ascii=False
+                    )
+                    self.assertEqual(fp.read(), expected)
+                with open(files[1], encoding="utf-8") as fp:
+                    self.assertEqual(fp.read(), "{}")
+        # other options: all tables are written anew, then skipped while unchanged
+        for count in (9, 5):
+            start = stub.request_count
+            br_client.dump_tables_as_json(stub.database_id, out_dir, checkpoint=True)
+            self.assertEqual(stub.request_count - start, count)
+        stub.clock = lambda: "2026-02-01T10:00:00Z"
+        br_client.patch_row(log_id, 3, {"Name": "Changed"})
+        start = stub.request_count
+        files = br_client.dump_tables_as_json(
+            stub.database_id, out_dir, checkpoint=True
+        )
+        self.assertEqual(stub.request_count - start, 8)
+        with open(files[0], encoding="utf-8") as fp:
+            self.assertEqual(json.load(fp)["3"]["Name"], "Changed")
+        shutil.rmtree(out_dir)
+        stub.stop()
+
+    def test_017_field_projection(self):
+        with BaserowStub(page_size=2) as stub:
+            fields = ["Titel", "Ort, Land", 'Zitat "x"', "Notiz"]
+            rows = [{x: f"{x} {i}" for x in fields} for i in range(5)]
+            book_id = stub.add_table("book", fields, rows)
+            br_client = BaseRowClient(
+                "user", "pw", "token", br_base_url=stub.base_url, br_db_id=1
+            )
+            notiz_id = br_client.br_table_dict.field_by_name("book", "Notiz")["id"]
+            rows = list(
+                br_client.yield_rows(book_id, include=["Ort, Land", 'Zitat "x"'])
+            )
+            self.assertEqual(len(rows), 5)
+            self.assertEqual(list(rows[4]), ["id", "order", "Ort, Land", 'Zitat "x"'])
+            rows = list(
+                br_client.yield_rows(book_id, exclude=[notiz_id], size=2, workers=2)
+            )
+            self.assertEqual(
+                list(rows[4]), ["id", "order", "Titel", "Ort, Land", 'Zitat "x"']
+            )
+            titel_id = br_client.br_table_dict.field_by_name("book", "Titel")["id"]
+            result = br_client.search_rows(
+                book_id, "Titel 3", titel_id, "equal", include=[f"field_{notiz_id}"]
+            )
+            self.assertEqual(
+                result["results"],
+                [{"id": 4, "order": "4.00000000000000000000", "Notiz": "Notiz 3"}],
+            )
+            with self.assertRaises(ValueError):
+                next(br_client.yield_rows(book_id, include=["Autor"]))
+            with self.assertRaises(ValueError):
+                next(br_client.yield_rows(book_id, exclude=[10**6]))
+            # without br_db_id, IDs are looked up with one list_fields request
+            with BaseRowClient("user", "pw", "token", br_base_url=stub.base_url) as c:
+                start = stub.request_count
+                rows = list(c.yield_rows(book_id, exclude=["Titel", notiz_id]))
+                self.assertEqual(
+                    list(rows[0]), ["id", "order", "Ort, Land", 'Zitat "x"']
+                )
+                self.assertEqual(stub.request_count - start, 1 + 3)
+                with self.assertRaises(ValueError):
+                    next(c.yield_rows(book_id, exclude=[10**6]))
+            out_dir = tempfile.mkdtemp()
+            files = br_client.dump_tables_as_json(
+                1, out_dir, output_format="ndjson", include={"book": ["Titel"]}
+            )
+            with open(files[0], encoding="utf-8") as fp:
+                self.assertEqual(json.loads(fp.readline())["Titel"], "Titel 0")
+                fp.seek(0)
+                self.assertEqual(len(fp.read().splitlines()), 5)
+            with self.assertRaises(ValueError):
+                br_client.dump_tables_as_json(1, out_dir, include={"books": ["Titel"]})
+            shutil.rmtree(out_dir)
+
+    def test_018_request_scheduler(self):
+        scheduler = RequestScheduler(max_concurrency=4, target_latency=0.5)
+        scheduler.throttle()
+        self.assertEqual(scheduler.stats()["limit"], 2)
+        for _ in range(2):
+            scheduler.record(200, 0.01)
+        self.assertEqual(scheduler.stats()["limit"], 3)
+        scheduler.record(200, 1)
+        self.assertEqual(scheduler.stats()["limit"], 2)
+        scheduler.record(None, 0.01)
+        self.assertEqual(scheduler.stats()["limit"], 1)
+        scheduler = RequestScheduler(rate_limit=20, burst=1)
+        start = time.monotonic()
+        for _ in range(5):
+            with scheduler.slot():
+                pass
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+        with BaserowStub(page_size=10, retry_after=1) as stub:
+            table_id = stub.add_table("t", ["Name"], [{"Name": i} for i in range(100)])
+            br_client = BaseRowClient("user", "pw", "token", br_base_url=stub.base_url)
+            stub.fail_next(1, status=429)
+            start = time.monotonic()
+            rows = list(br_client.yield_rows(table_id, size=10, workers=4))
+            self.assertEqual(len(rows), 100)
+            self.assertGreaterEqual(time.monotonic() - start, 1)
+            stats = br_client.scheduler.stats()
+            self.assertEqual((stats["throttled"], stats["in_flight"]), (1, 0))
+            br_client = BaseRowClient(
+                "user", "pw", "token", br_base_url=stub.base_url, max_retries=0
+            )
+            stub.fail_next(1, status=429)
+            with self.assertRaises(requests.HTTPError):
+                list(br_client.yield_rows(table_id))
+
+    def test_019_sync_table(self):
+        table_id = self.stub.add_table(
+            "city",
+            ["Name", "GND", "Land"],
+            [
+                {
+                    "Name": "Wien",
+                    "GND": "4066009-6",
+                    "Land": [{"id": 1, "value": "AT"}],
+                },
+                {
+                    "Name": "Graz",
+                    "GND": "4022273-1",
+                    "Land": [{"id": 1, "value": "AT"}],
+                },
+                {"Name": "Bern", "GND": "4005749-5", "Land": []},
+                {"Name": "Wien", "GND": "4066009-6", "Land": []},
+            ],
+        )
+        desired = [
+            {"Name": "Wien", "GND": "4066009-6", "Land": [1]},
+            {"Name": "Graz", "GND": "4022273-1", "Land": [1]},
+            {"Name": "Bern", "GND": "4005749-5", "Land": [2]},
+            {"Name": "Linz", "GND": "4035876-8", "Land": [1]},
+        ]
+        result = self.br_client.sync_table(table_id, desired, key="GND", dry_run=True)
+        self.assertEqual(result["created"], [desired[3]])
+        self.assertEqual((result["updated"], result["unchanged"]), ([3], 2))
+        result = self.br_client.sync_table(table_id, desired, key="GND", delete=True)
+        self.assertEqual(
+            [result[x] for x in ("created", "updated", "deleted", "unchanged")],
+            [[5], [3], [4], 2],
+        )
+        self.assertEqual(result["errors"], [])
+        self.br_client.metrics.reset()
+        result = self.br_client.sync_table(table_id, desired, key="GND", delete=True)
+        self.assertEqual(result["unchanged"], 4)
+        self.assertEqual(
+            sorted(self.br_client.metrics.snapshot()),
+            ["GET database/fields/table/{id}/", "GET database/rows/table/{id}/"],
+        )
+        result = self.br_client.sync_table(table_id, [{"id": "2", "Name": "Graz"}])
+        self.assertEqual((result["updated"], result["unchanged"]), ([], 1))
+        result = self.br_client.sync_table(table_id, [{"id": 2, "Name": "Gratz"}])
+        self.assertEqual(result["updated"], [2])
+        self.assertEqual(self.stub.tables[table_id]["rows"][2]["GND"], "4022273-1")
+        methods = [x.split()[0] for x in self.br_client.metrics.snapshot()]
+        self.assertEqual(sorted(methods), ["GET", "GET", "PATCH"])
+        # Baserow returns number fields as strings and date-times in UTC
+        fields = self.stub.tables[table_id]["fields"]
+        fields[1]["type"], fields[2]["type"] = "number", "date"
+        self.stub.tables[table_id]["rows"][2].update(
+            {"GND": "2000000", "Land": "2024-05-01T10:00:00Z"}
+        )
+        self.stub.tables[table_id]["version"] += 1
+        desired = [{"id": 2, "GND": 2000000, "Land": "2024-05-01T12:00:00+02:00"}]
+        result = self.br_client.sync_table(table_id, desired, dry_run=True)
+        self.assertEqual((result["updated"], result["unchanged"]), ([], 1))
+        desired = [{"id": 2, "GND": 2000000.5, "Land": "2024-05-01T10:00:00Z"}]
+        result = self.br_client.sync_table(table_id, desired, dry_run=True)
+        self.assertEqual(result["updated"], [2])
+        del self.stub.tables[table_id]
+
+    def test_020_json_backend(self):
+        data = {
+            "id": 1,
+            "Name": 'Zürich\n"Altstadt"',
+            "Land": [{"id": 2, "value": "ä"}],
+        }
+        encoded = jsonlib.dumps(data)
+        self.assertEqual(
+            encoded, json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        )
+        self.assertEqual(jsonlib.loads(jsonlib.dumpb(data)), data)
+        self.assertTrue(math.isnan(jsonlib.loads(b'{"x": NaN}')["x"]))
+        with mock.patch.object(jsonlib, "orjson", None):
+            self.assertEqual(jsonlib.dumps(data), encoded)
+            self.assertEqual(jsonlib.loads(encoded.encode("utf-8")), data)
+        page = {"count": 12345, "next": None, "previous": None, "results": [data] * 3}
+        body = json.dumps(page, ensure_ascii=False, indent=1).encode("utf-8")
+        for chunk_size in (1, 2, 7, len(body)):
+            chunks = [body[i : i + chunk_size] for i in range(0, len(body), chunk_size)]  # noqa
+            streamed = jsonlib.StreamingPage(chunks)
+            self.assertEqual(list(streamed), page["results"])
+            self.assertEqual((streamed["count"], streamed["next"]), (12345, None))
+        with self.assertRaises(ValueError):
+            list(jsonlib.StreamingPage([b'{"count": 1, "results": [{"id": 1}']))
+        rows = list(self.br_client.yield_rows(self.place_id, size=1))
+        self.assertEqual(
+            list(self.br_client.yield_rows(self.place_id, size=1, stream=True)), rows
+        )
+        out_dir = tempfile.mkdtemp()
+        files = self.br_client.dump_tables_as_json(
+            self.stub.database_id, out_dir, output_format="json_compact"
+        )
+        with open(files[1], encoding="utf-8") as fp:
+            written = fp.read()
+        self.assertEqual(
+            written,
+            json.dumps(
+                {x["id"]: x for x in rows}, ensure_ascii=False, separators=(",", ":")
+            ),
+        )
+        with open(files[2], encoding="utf-8") as fp:
+            self.assertEqual(fp.read(), "{}")
+        shutil.rmtree(out_dir)
+
+    def test_021_row_table(self):
+        rows = list(self.br_client.yield_rows(self.person_id))
+        start = self.stub.request_count
+        table = self.br_client.load_row_table(self.person_id, workers=2)
+        self.assertEqual(self.stub.request_count - start, 1 + len(rows) // 200 + 1)
+        self.assertEqual(len(table), len(rows))
+        self.assertEqual(table.field_names()[:4], ["id", "order", "Name", "Beruf"])
+        self.assertIs(table.field_names()[2], sys.intern("Name"))
+        for row in rows:
+            self.assertEqual(table[row["id"]], row)
+            self.assertEqual(table[row["id"]].to_dict(), row)
+        self.assertEqual([dict(x) for x in table], rows)
+        self.assertEqual(table.column("Name"), [x["Name"] for x in rows])
+        self.assertEqual(table[rows[1]["id"]]["Beruf"], rows[1]["Beruf"])
+        self.assertIn(rows[0]["id"], table)
+        self.assertIsNone(table.get(999999))
+        with self.assertRaises(KeyError):
+            table[999999]
+        table = self.br_client.load_row_table(self.person_id, include=["Name"])
+        self.assertEqual(table.field_names(), ["id", "order", "Name"])
+        self.assertEqual(
+            dict(table[rows[0]["id"]]), {k: rows[0][k] for k in table.field_names()}
+        )
+        table = RowTable.from_rows([{"id": 1, "a": 1}], ["a"])
+        table.append({"id": 2, "a": 2, "b": "x"})
+        table.append({"id": 1, "a": 3})
+        self.assertEqual(len(table), 2)
+        self.assertEqual(dict(table[1]), {"id": 1, "order": None, "a": 3, "b": None})
+        self.assertEqual(table.column("b"), [None, "x"])
+
+    def test_022_shared_jwt_cache(self):
+        def errors(client):
+            return sum(x["errors"] for x in client.metrics.snapshot().values())
+
+        folder_name = tempfile.mkdtemp()
+        path = os.path.join(folder_name, "jwt.json")
+        with BaserowStub(jwt_lifetime=2) as stub:
+            table_id = stub.add_table("place", ["Name"], [{"Name": "Wien"}])
+            clients = [
+                BaseRowClient(
+                    "user",
+                    "pw",
+                    "token",
+                    br_base_url=stub.base_url,
+                    token_cache=TokenCache(path, margin=0),
+                )
+                for _ in range(2)
+            ]
+            self.assertEqual(len(clients[0].list_tables(stub.database_id)), 1)
+            self.assertEqual(len(clients[1].list_fields(table_id)), 1)
+            self.assertEqual(stub.token_auth_count, 1)
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+            self.assertIsNotNone(token_expiry(clients[0].br_jwt_token))
+            stub.revoke_jwts()
+            self.assertEqual(len(clients[0].list_tables(stub.database_id)), 1)
+            self.assertEqual((stub.token_auth_count, stub.token_refresh_count), (1, 1))
+            self.assertEqual(errors(clients[0]), 1)
+            # the other client gets a 401 as well, then finds the renewed token
+            self.assertEqual(len(clients[1].list_fields(table_id)), 1)
+            self.assertEqual((stub.token_auth_count, stub.token_refresh_count), (1, 1))
+            self.assertEqual(clients[0].br_jwt_token, clients[1].br_jwt_token)
+            time.sleep(2.1)
+            self.assertEqual(len(clients[1].list_fields(table_id)), 1)
+            self.assertEqual(stub.token_refresh_count, 2)
+            self.assertEqual(errors(clients[1]), 1)
+            stub.refresh_tokens.clear()
+            stub.revoke_jwts()
+            self.assertEqual(len(clients[1].list_fields(table_id)), 1)
+            self.assertEqual((stub.token_auth_count, stub.token_refresh_count), (2, 3))
+            shared = [
+                BaseRowClient("user", "pw", "token", br_base_url=stub.base_url)
+                for _ in range(2)
+            ]
+            for client in shared:
+                client.list_tables(stub.database_id)
+            self.assertEqual(stub.token_auth_count, 3)
+            # another password does not get the cached token
+            shared.append(
+                BaseRowClient("user", "wrong", "token", br_base_url=stub.base_url)
+            )
+            shared[-1].list_tables(stub.database_id)
+            self.assertEqual(stub.token_auth_count, 4)
+            for client in clients + shared:
+                client.close()
+        self.assertIsNone(token_expiry("stub-jwt-token"))
+        shutil.rmtree(folder_name)
+
+    def test_023_sharded_dump(self):
+        out_dir = tempfile.mkdtemp()
+        rows = list(self.br_client.yield_rows(self.person_id))
+        self.br_client.batch_delete_rows(self.person_id, [rows.pop(3)["id"]])
+        decompress = {None: bytes, "gzip": gzip.decompress, "bz2": bz2.decompress}
+        files = ["expected"]
+        for output_format, compression in (
+            ("json", None),
+            ("json_compact", "gzip"),
+            ("ndjson", "bz2"),
+            ("csv", None),
+        ):
+            options = {"output_format": output_format, "compression": compression}
+            f_name = self.br_client.dump_table_sharded(
+                self.person_id, "person", out_dir, processes=2, shards=5, **options
+            )
+            files.append(os.path.basename(f_name))
+            expected = os.path.join(out_dir, "expected")
+            write_rows(rows, expected, indent=0, **options)
+            with open(f_name, "rb") as f, open(expected, "rb") as f_expected:
+                self.assertEqual(
+                    decompress[compression](f.read()),
+                    decompress[compression](f_expected.read()),
+                )
+        # the part files are merged and removed
+        self.assertEqual(sorted(os.listdir(out_dir)), sorted(files))
+        f_name = self.br_client.dump_table_sharded(
+            self.person_id,
+            "nobody",
+            out_dir,
+            processes=2,
+            filters={"filter__Name__equal": "nobody"},
+        )
+        with open(f_name, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "{}")
+        # the user's filters are not combined with filters of the shards
+        filters = {
+            "filter_type": "OR",
+            "filter__Name__contains": "Person 1",
+            "filter__Name__equal": "Person 7",
+        }
+        f_name = self.br_client.dump_table_sharded(
+            self.person_id, "some", out_dir, processes=2, filters=filters
+        )
+        with open(f_name, encoding="utf-8") as f:
+            dumped = json.load(f)
+        expected = self.br_client.yield_rows(self.person_id, filters=filters)
+        self.assertEqual(list(dumped), [f"{x['id']}" for x in expected])
+        self.assertEqual(len(dumped), 112)
+        # like Baserow, the stub rejects filters on the row ID, which is no field
+        url = self.br_client.page_url(self.person_id, {"filter__id__higher_than": 3})
+        r = requests.get(url, headers=self.br_client.headers)
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(r.json()["error"], "ERROR_FILTER_FIELD_NOT_FOUND")
+        # the workers' clients are throttled like the client, sharing its rate limit
+        br_client = BaseRowClient(
+            "user",
+            "pw",
+            "token",
+            br_base_url=self.stub.base_url,
+            pool_size=3,
+            rate_limit=100,
+            target_latency=2,
+        )
+        with (
+            mock.patch("acdh_baserow_pyutils.ProcessPoolExecutor", ThreadPoolExecutor),
+            mock.patch(
+                "acdh_baserow_pyutils._export_shard",
+                wraps=acdh_baserow_pyutils._export_shard,
+            ) as export_shard,
+        ):
+            br_client.dump_table_sharded(
+                self.person_id, "limited", out_dir, processes=4
+            )
+        client_options = export_shard.call_args[0][0]
+        self.assertEqual(client_options["pool_size"], 3)
+        self.assertEqual(client_options["rate_limit"], 25)
+        self.assertEqual(client_options["target_latency"], 2)
+        br_client.close()
+        shutil.rmtree(out_dir)
+
+    def test_024_result_cache(self):
+        cache = ResultCache(max_size=3)
+        br_client = BaseRowClient(
+            "user", "pw", "token", br_base_url=self.stub.base_url, result_cache=cache
+        )
+        lookup_dict = br_client.fetch_table_field_dict(self.stub.database_id)
+        start = self.stub.request_count
+        results = [
+            br_client.get_or_create("place", "Name", lookup_dict, "Wien")
+            for _ in range(5)
+        ]
+        self.assertEqual(self.stub.request_count - start, 1)
+        self.assertEqual({x[0]["id"] for x in results}, {results[0][0]["id"]})
+        self.assertFalse(any(x[1] for x in results))
+        results[0][0]["Name"] = "changed by the caller"
+        self.assertEqual(
+            br_client.get_or_create("place", "Name", lookup_dict, "Wien")[0]["Name"],
+            "Wien",
+        )
+        start = self.stub.request_count
+        graz, created = br_client.get_or_create("place", "Name", lookup_dict, "Graz")
+        self.assertTrue(created)
+        self.assertEqual(
+            br_client.get_or_create("place", "Name", lookup_dict, "Graz"), (graz, False)
+        )
+        self.assertEqual(self.stub.request_count - start, 2)
+        self.assertEqual(cache.stats()["invalidations"], 1)
+        # a write by the client drops the table's entries
+        br_client.patch_row(self.place_id, graz["id"], {"Name": "Linz"})
+        start = self.stub.request_count
+        row, created = br_client.get_or_create("place", "Name", lookup_dict, "Graz")
+        self.assertTrue(created)
+        self.assertEqual(self.stub.request_count - start, 2)
+        br_client.batch_update_rows(self.place_id, [{"id": row["id"], "Name": "Graz"}])
+        self.assertEqual(cache.stats()["size"], 0)
+        name_id = lookup_dict["place"]["fields"]["Name"]["id"]
+        for q in ("a", "b", "c", "d"):
+            br_client.search_rows(self.place_id, q, name_id)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        # concurrent identical lookups send one request
+        self.stub.latency = 0.2
+        start = self.stub.request_count
+        try:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                found = list(
+                    executor.map(
+                        lambda _: br_client.search_rows(self.place_id, "Wi", name_id),
+                        range(4),
+                    )
+                )
+        finally:
+            self.stub.latency = 0
+        self.assertEqual(self.stub.request_count - start, 1)
+        self.assertEqual(cache.stats()["coalesced"], 3)
+        self.assertEqual([x["count"] for x in found], [1] * 4)
+        cache.ttl = 0
+        start = self.stub.request_count
+        for _ in range(2):
+            br_client.search_rows(self.place_id, "Wie", name_id)
+        self.assertEqual(self.stub.request_count - start, 2)
+        br_client.batch_delete_rows(self.place_id, [graz["id"], row["id"]])
+        br_client.close()
+
+    def test_025_migrate_schema(self):
+        br_client = BaseRowClient(
+            "user",
+            "pw",
+            "token",
+            br_base_url=self.stub.base_url,
+            br_db_id=self.stub.database_id,
+        )
+        schema = {
+            "country": [
+                {"name": "Name", "type": "text"},
+                {"name": "ISO", "type": "text"},
+            ],
+            "city": [
+                {"name": "Name", "type": "text"},
+                {"name": "Einwohner", "type": "number", "number_decimal_places": 0},
+                {"name": "country", "type": "link_row", "link_row_table": "country"},
+                {
+                    "name": "Land",
+                    "type": "lookup",
+                    "through_field_name": "country",
+                    "target_field_name": "Name",
+                },
+                {
+                    "name": "Typ",
+                    "type": "single_select",
+                    "select_options": [{"value": "Stadt", "color": "blue"}],
+                },
+            ],
+            "place": [
+                {"name": "Name", "type": "text"},
+                {"name": "Lage", "type": "text"},
+            ],
+        }
+        n_tables = len(self.stub.tables)
+        plan = br_client.migrate_schema(schema, dry_run=True)
+        self.assertEqual(plan["created_tables"], ["country", "city"])
+        self.assertIn(("place", "Lage"), plan["created_fields"])
+        self.assertEqual(len(self.stub.tables), n_tables)
+        result = br_client.migrate_schema(schema, workers=8)
+        self.assertEqual(result["errors"], [])
+        self.assertEqual(result["created_tables"], ["country", "city"])
+        self.assertEqual(
+            sorted(result["created_fields"]),
+            [
+                ("city", "Einwohner"),
+                ("city", "Land"),
+                ("city", "Typ"),
+                ("city", "country"),
+                ("country", "ISO"),
+                ("place", "Lage"),
+            ],
+        )
+        tables = br_client.br_table_dict
+        self.assertEqual(
+            tables["city"]["fields"]["country"]["link_row_table_id"],
+            tables["country"]["id"],
+        )
+        self.assertEqual(tables["country"]["fields"]["city"]["type"], "link_row")
+        # a second run finds nothing to do and only reads the schema
+        start = self.stub.request_count
+        result = br_client.migrate_schema(schema, delete=True)
+        self.assertEqual(
+            result,
+            {
+                "created_tables": [],
+                "created_fields": [],
+                "updated_fields": [],
+                "deleted_fields": [],
+                "errors": [],
+                "table_ids": {name: tables[name]["id"] for name in schema},
+            },
+        )
+        self.assertEqual(self.stub.request_count - start, 1 + n_tables + 2)
+        schema["city"][1]["number_decimal_places"] = 2
+        schema["city"][4]["select_options"].append({"value": "Dorf", "color": "red"})
+        schema["country"].pop(1)
+        result = br_client.migrate_schema(schema, delete=True)
+        self.assertEqual(result["errors"], [])
+        self.assertEqual(
+            sorted(result["updated_fields"]), [("city", "Einwohner"), ("city", "Typ")]
+        )
+        self.assertEqual(result["deleted_fields"], [("country", "ISO")])
+        field = br_client.br_table_dict["city"]["fields"]["Einwohner"]
+        self.assertEqual(field["number_decimal_places"], 2)
+        with self.assertRaises(KeyError):
+            br_client.migrate_schema({"city": [{"name": "Name", "type": "unknown"}]})
+        with self.assertRaises(ValueError):
+            br_client.migrate_schema(
+                {"city": [{"name": "x", "type": "link_row", "link_row_table": "nix"}]}
+            )
+        # only migrate_schema resolves the names of linked tables
+        with self.assertRaises(KeyError):
+            br_client.create_table_fields(
+                self.place_id,
+                [{"name": "x", "type": "link_row", "link_row_table": "city"}],
+            )
+        br_client.delete_table_fields(self.place_id, ["Lage"])
+        for table_name in ("city", "country"):
+            br_client.delete_table(br_client.br_table_dict[table_name]["id"])
+        self.assertEqual(len(self.stub.tables), n_tables)
+        br_client.close()
+
+    def test_026_import_file(self):
+        br_client = BaseRowClient(
+            "user",
+            "pw",
+            "token",
+            br_base_url=self.stub.base_url,
+            br_db_id=self.stub.database_id,
+        )
+        with tempfile.TemporaryDirectory() as folder_name:
+            csv_name = os.path.join(folder_name, "import_person.csv.gz")
+            with gzip.open(csv_name, "wt", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["Name", "Geburtsjahr", "Größe", "Aktiv", "Geboren"])
+                for i in range(450):
+                    born = f"{1900 + i % 100}-01-{1 + i % 28:02d}"
+                    active = "true" if i % 2 else "false"
+                    writer.writerow([f"Person {i}", 1900 + i, "1.75", active, born])
+                writer.writerow(["Person 450", "", "", "", ""])
+            progress = []
+            schema_reads = []
+            br_client.pre_request_hooks.append(
+                lambda x: schema_reads.append(x["method"] + " " + x["endpoint"])
+            )
+            result = br_client.import_file(
+                csv_name, batch_size=100, workers=3, progress=progress.append
+            )
+            # the tables of the database are listed only once
+            self.assertEqual(
+                schema_reads.count("GET database/tables/database/{id}/"), 1
+            )
+            self.assertEqual(result["errors"], [])
+            self.assertEqual((result["rows"], result["created"]), (451, 451))
+            self.assertEqual(result["failed"], 0)
+            self.assertGreater(result["rows_per_second"], 0)
+            self.assertEqual([x["rows"] for x in progress], [100, 200, 300, 400, 451])
+            fields = br_client.br_table_dict["import_person"]["fields"]
+            self.assertEqual(fields["Name"]["type"], "text")
+            self.assertEqual(fields["Geburtsjahr"]["number_decimal_places"], 0)
+            self.assertEqual(fields["Größe"]["number_decimal_places"], 2)
+            self.assertEqual(fields["Aktiv"]["type"], "boolean")
+            self.assertEqual(fields["Geboren"]["type"], "date")
+            table_id = result["table_id"]
+            # concurrent batches: the row IDs need not follow the input order
+            rows = {x["Name"]: x for x in br_client.yield_rows(table_id)}
+            self.assertEqual(rows["Person 1"]["Aktiv"], True)
+            self.assertEqual(rows["Person 1"]["Geburtsjahr"], "1901")
+            self.assertIsNone(rows["Person 450"]["Geburtsjahr"])
+            # into the existing table: a new field is created, existing ones are kept
+            jsonl_name = os.path.join(folder_name, "more.jsonl")
+            with open(jsonl_name, "w", encoding="utf-8") as f:
+                for i in range(3):
+                    row = {"Name": f"Neu {i}", "Geburtsjahr": 2000, "Notiz": {"i": i}}
+                    # as in dumps of the table, which are imported without them
+                    row.update({"id": 1000 + i, "order": f"{1000 + i}.000"})
+                    f.write(json.dumps(row) + "\n")
+                f.write("\n")
+            result = br_client.import_file(
+                jsonl_name,
+                "import_person",
+                fields=[{"name": "Geburtsjahr", "type": "text"}],
+                sample_size=2,
+            )
+            self.assertEqual(result["created_fields"], ["Notiz"])
+            self.assertEqual((result["table_id"], result["created"]), (table_id, 3))
+            fields = br_client.br_table_dict["import_person"]["fields"]
+            self.assertEqual(fields["Geburtsjahr"]["type"], "number")
+            self.assertEqual(fields["Notiz"]["type"], "long_text")
+            rows = {x["Name"]: x for x in br_client.yield_rows(table_id)}
+            self.assertEqual(rows["Neu 2"]["Notiz"], '{"i":2}')
+            with self.assertRaises(ValueError):
+                br_client.import_file(os.path.join(folder_name, "persons.xlsx"))
+            # a header line only: the table is created with text fields for its columns
+            header_name = os.path.join(folder_name, "import_header.csv")
+            with open(header_name, "w", encoding="utf-8") as f:
+                f.write("id,Name,Ort\n")
+            result = br_client.import_file(header_name)
+            self.assertEqual((result["rows"], result["errors"]), (0, []))
+            fields = br_client.br_table_dict["import_header"]["fields"]
+            self.assertEqual(sorted(fields), ["Name", "Ort"])
+            self.assertEqual(fields["Ort"]["type"], "text")
+            br_client.delete_table(result["table_id"])
+            empty_name = os.path.join(folder_name, "import_empty.jsonl")
+            with open(empty_name, "w", encoding="utf-8") as f:
+                f.write("\n")
+            with self.assertRaises(ValueError):
+                br_client.import_file(empty_name)
+            self.assertNotIn("import_empty", br_client.br_table_dict)
+        br_client.delete_table(table_id)
+        br_client.close()
+
+    def test_027_writes_not_resent_after_timeout(self):
+        with BaserowStub(latency=0.5) as stub:
+            table_id = stub.add_table("place", ["Name"])
+            br_client = BaseRowClient(
+                "user", "pw", "token", br_base_url=stub.base_url, timeout=0.3
+            )
+            br_client.br_jwt_token = "stub-jwt-token"
+            payload = [{"Name": f"Ort {i}"} for i in range(5)]
+            with self.assertRaises(requests.exceptions.ReadTimeout):
+                br_client.batch_create_rows(table_id, payload)
+            # requests without a response are counted as errors
+            metrics = br_client.metrics.snapshot()
+            stats = metrics["POST database/rows/table/{id}/batch/"]
+            self.assertEqual(
+                (stats["count"], stats["errors"], stats["bytes"]), (1, 1, 0)
+            )
+            self.assertGreaterEqual(stats["max_seconds"], 0.3)
+            # the timed out request is processed by the server nevertheless
+            time.sleep(0.5)
+            self.assertEqual(len(stub.tables[table_id]["rows"]), 5)
+            stub.latency = 0
+            stub.fail_next(1, status=503)
+            result = br_client.batch_create_rows(table_id, payload)
+            self.assertEqual(len(result["errors"]), 1)
+            stub.fail_next(1, status=429)
+            result = br_client.batch_create_rows(table_id, payload)
+            self.assertEqual(len(result["created_rows"]), 5)
+            self.assertEqual(len(stub.tables[table_id]["rows"]), 10)
+            stub.fail_next(1, status=503)
+            self.assertEqual(len(br_client.list_fields(table_id)), 1)
+            br_client.close()
+
+    def test_028_get_or_create_concurrently(self):
+        br_client = BaseRowClient(
+            "user", "pw", "token", br_base_url=self.stub.base_url, result_cache=True
+        )
+        lookup_dict = br_client.fetch_table_field_dict(self.stub.database_id)
+        self.stub.latency = 0.02
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(
+                    executor.map(
+                        lambda x: br_client.get_or_create(
+                            "place", "Name", lookup_dict, "Wiener Neustadt"
+                        ),
+                        range(8),
+                    )
+                )
+        finally:
+            self.stub.latency = 0
+        self.assertEqual(sum(created for _, created in results), 1)
+        self.assertEqual(len({row["id"] for row, _ in results}), 1)
+        rows = self.stub.tables[self.place_id]["rows"].values()
+        self.assertEqual(len([x for x in rows if x["Name"] == "Wiener Neustadt"]), 1)
+        self.assertEqual(br_client.result_cache.key_locks, {})
+        br_client.batch_delete_rows(self.place_id, [results[0][0]["id"]])
+        br_client.close()